@@ -0,0 +1,90 @@
+#! /usr/bin/env python3
+
+"""Сравнение декодирования сырых записей через ctypes и через кодеки
+struct.Struct из fbus.codec.
+
+Для каждой структуры декодируется буфер из COUNT записей: ctypes -
+from_buffer_copy и чтение всех полей, кодек - iter_unpack.
+"""
+
+from ctypes import Array, Structure, sizeof
+from os import urandom
+from timeit import repeat
+
+from fbus.codec import codec_of
+from fbus.device.aim724 import AIM724_INPUTS
+from fbus.device.dim764 import DIM764_INPUTS
+from fbus.device.nim74x import NIM74X_INPUTS, NIM74X_OUTPUTS
+
+COUNT = 1000
+
+
+def decode_ctypes(layout: type[Structure], data: bytes) -> list[tuple]:
+    """Декодирование через ctypes с копированием значений полей."""
+
+    size = sizeof(layout)
+    names = [name for name, *_ in layout._fields_]
+    records = []
+    for offset in range(0, len(data), size):
+        record = layout.from_buffer_copy(data, offset)
+        values = []
+        for name in names:
+            value = getattr(record, name)
+            if not isinstance(value, Array):
+                values.append(value)
+            elif sizeof(value._type_) == 1:
+                values.append(bytes(value))
+            else:
+                values.extend(value)
+        records.append(tuple(values))
+    return records
+
+
+def decode_codec(layout: type[Structure], data: bytes) -> list[tuple]:
+    """Декодирование кодеком struct.Struct."""
+
+    return list(codec_of(layout).iter_unpack(data))
+
+
+def measure(function, layout: type[Structure], data: bytes) -> float:
+    """Время декодирования одной записи, мкс."""
+
+    best = min(repeat(lambda: function(layout, data), number=20, repeat=5))
+    return best / 20 / COUNT * 1e6
+
+
+def measure_pack(layout: type[Structure]) -> tuple[float, float]:
+    """Время записи одной структуры в буфер: ctypes и pack_into, мкс."""
+
+    codec = codec_of(layout)
+    buffer = bytearray(sizeof(layout))
+    values = codec.unpack(urandom(sizeof(layout)))
+    source = layout.from_buffer_copy(bytes(buffer))
+
+    def with_ctypes():
+        target = layout.from_buffer(buffer)
+        for name, *_ in layout._fields_:
+            setattr(target, name, getattr(source, name))
+
+    def with_codec():
+        codec.pack_into(buffer, 0, *values)
+
+    number = 100000
+    return tuple(min(repeat(function, number=number, repeat=5)) / number * 1e6
+                 for function in (with_ctypes, with_codec))
+
+
+if __name__ == "__main__":
+    print(f"{'layout':<16}{'ctypes, us':>12}{'codec, us':>12}{'speedup':>10}")
+    for layout in (AIM724_INPUTS, DIM764_INPUTS, NIM74X_INPUTS):
+        data = bytes(range(256)) * (sizeof(layout) * COUNT // 256 + 1)
+        data = data[:sizeof(layout) * COUNT]
+        # Сравнение через repr: байты данных дают NaN в полях c_float
+        assert repr(decode_codec(layout, data)) == repr(decode_ctypes(layout, data))
+
+        before = measure(decode_ctypes, layout, data)
+        after = measure(decode_codec, layout, data)
+        print(f"{layout.__name__:<16}{before:>12.3f}{after:>12.3f}{before / after:>9.1f}x")
+
+    before, after = measure_pack(NIM74X_OUTPUTS)
+    print(f"{'pack_into':<16}{before:>12.3f}{after:>12.3f}{before / after:>9.1f}x")
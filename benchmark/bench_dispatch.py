@@ -0,0 +1,56 @@
+#! /usr/bin/env python3
+
+"""Замер накладных расходов на вызов функции libfbus через FBusDevice.
+
+Сравнивается прежний способ вызова (поиск символа и создание partial на каждый
+вызов) с таблицей заранее связанных функций.
+"""
+
+from ctypes import byref, c_int
+from functools import partial
+from timeit import repeat
+
+from fbus.client import FBusDevice, FBusError, _library_path, _load_lib
+from fbus.protocol import FBUS_RESULT
+
+_lib = _load_lib(_library_path())
+
+
+class LegacyFBusDevice(FBusDevice):
+    """Прежняя реализация диспетчеризации вызовов."""
+
+    def __init__(self) -> None:
+        pass
+
+    def __call__(self, prototype, *arguments):
+        if result := prototype((self.name, _lib))(*arguments):
+            msg = f"{self.name} error {result} ({FBUS_RESULT(result).name})"
+            raise FBusError(msg)
+
+        return True
+
+    def __getattr__(self, name):
+        self.name = name
+        return partial(self.__call__, self._functions_[name])
+
+
+def measure(device: FBusDevice, number: int = 100000) -> float:
+    """Среднее время одного вызова fbusGetVersion в микросекундах."""
+
+    major = c_int()
+    minor = c_int()
+    pmajor = byref(major)
+    pminor = byref(minor)
+
+    best = min(repeat(lambda: device.fbusGetVersion(pmajor, pminor),
+                      number=number, repeat=5))
+    return best / number * 1e6
+
+
+if __name__ == "__main__":
+    before = measure(LegacyFBusDevice())
+    after = measure(FBusDevice())
+
+    print(f"before: {before:.3f} us/call")
+    print(f"after:  {after:.3f} us/call")
+    print(f"speedup: {before / after:.1f}x")
@@ -0,0 +1,88 @@
+#! /usr/bin/env python3
+
+"""Время цикла обмена ProcessImage с виртуальной сетью при внесенных ошибках
+и задержках (fbus.faults).
+
+Для каждого сценария выполняется CYCLES циклов. Цикл, в котором вызов
+завершился ошибкой FBusError, прерывается и считается неуспешным. Выводятся
+перцентили времени цикла, доля неуспешных циклов и внесенные ошибки.
+"""
+
+from time import perf_counter
+
+from fbus.client import FBUS, FBusError
+from fbus.faults import Fault, FaultInjector, Latency, Outage, lognormal, uniform
+from fbus.image import ProcessImage
+from fbus.models import generate_networks
+from fbus.protocol import FBUS_ADAPTER, FBUS_RESULT
+from fbus.simulator import Simulator
+
+CYCLES = 2000
+SEED = 1
+
+SCENARIOS = {
+    "no faults": {},
+    "node 5 not answering 1%": {
+        "faults": [Fault(FBUS_RESULT.MODULE_NOT_ANSWER, 0.01, nodes=[5])],
+    },
+    "bad CRC 0.5% per group": {
+        "faults": [Fault(FBUS_RESULT.BAD_CRC, 0.005, functions=["fbusProcessGroup"])],
+    },
+    "module busy 2% per node": {
+        "faults": [Fault(FBUS_RESULT.MODULE_BUSY, 0.02, functions=["fbusGroup_getNodeInputs"])],
+    },
+    "adapter jitter 50..150 us": {
+        "latencies": [Latency(uniform(50e-6, 150e-6), functions=["fbusProcessGroup"])],
+    },
+    "adapter jitter lognormal 100 us": {
+        "latencies": [Latency(lognormal(100e-6, 0.8), functions=["fbusProcessGroup"])],
+    },
+    "timeout bursts of 20 calls": {
+        "outages": [Outage(FBUS_RESULT.TIMEOUT, 0.001, 20, functions=["fbusProcessGroup"])],
+    },
+}
+
+
+def percentile(values: list[float], q: float) -> float:
+    return values[min(int(q * len(values)), len(values) - 1)]
+
+
+def run(scenario: dict) -> None:
+    injector = FaultInjector(Simulator(generate_networks(1, seed=SEED)), seed=SEED, **scenario)
+    injector.enabled = False
+    bus = FBUS(injector)
+    bus.fbusInitialize()
+    bus.fbusOpen(adapter=FBUS_ADAPTER.TCP, port=1)
+
+    # Ошибки вносятся только в циклы обмена
+    image = ProcessImage.from_rescan(bus)
+    injector.enabled = True
+    injector.reset(SEED)
+
+    times = []
+    failed = 0
+    for _ in range(CYCLES):
+        start = perf_counter()
+        try:
+            image.exchange()
+        except FBusError:
+            failed += 1
+        times.append(perf_counter() - start)
+
+    bus.fbusClose()
+    bus.fbusDeInitialize()
+
+    times.sort()
+    injected = ", ".join(f"{name} {result.name} x{count}"
+                         for (name, result), count in injector.injected.most_common())
+    print(f"  p50 {percentile(times, 0.5) * 1e6:8.1f} us  "
+          f"p90 {percentile(times, 0.9) * 1e6:8.1f} us  "
+          f"p99 {percentile(times, 0.99) * 1e6:8.1f} us  "
+          f"max {times[-1] * 1e6:8.1f} us")
+    print(f"  failed cycles {failed / CYCLES:.2%}" + (f" ({injected})" if injected else ""))
+
+
+if __name__ == "__main__":
+    for name, scenario in SCENARIOS.items():
+        print(name)
+        run(scenario)
@@ -0,0 +1,38 @@
+#! /usr/bin/env python3
+
+"""Замер времени импорта fbus.client и первого вызова FBUS API.
+
+Библиотека libfbus загружается при первом вызове, поэтому импорт модуля
+не включает время загрузки библиотеки.
+"""
+
+import subprocess
+import sys
+
+IMPORT = """
+from time import perf_counter
+start = perf_counter()
+import fbus.client
+print(perf_counter() - start)
+"""
+
+FIRST_CALL = """
+from time import perf_counter
+from fbus.client import FBUS
+bus = FBUS()
+start = perf_counter()
+bus.fbusGetVersion()
+print(perf_counter() - start)
+"""
+
+
+def measure(code: str, repeat: int = 10) -> float:
+    """Минимальное время выполнения фрагмента в отдельном процессе, мс."""
+
+    return min(float(subprocess.check_output([sys.executable, "-c", code]))
+               for _ in range(repeat)) * 1e3
+
+
+if __name__ == "__main__":
+    print(f"import fbus.client: {measure(IMPORT):.2f} ms")
+    print(f"first call (library load): {measure(FIRST_CALL):.2f} ms")
@@ -0,0 +1,118 @@
+#! /usr/bin/env python3
+
+"""Стоимость записи вызовов FBUS API и проверка воспроизведения трассы.
+
+Цикл обмена ProcessImage с виртуальной сетью выполняется без записи и с
+записью в трассу (Recorder), время цикла - лучшее из REPEATS серий. Затем та
+же последовательность вызовов выполняется с бэкендом Replay, и входные
+данные каждого цикла сравниваются с полученными при записи. Для бэкенда
+"native" замеряется время отдельных вызовов, не требующих адаптера.
+"""
+
+from ctypes import byref, c_int, c_size_t, sizeof
+from io import BytesIO
+from time import perf_counter
+from typing import Callable
+
+from fbus.client import FBUS, FBusError, get_backend
+from fbus.image import ProcessImage
+from fbus.models import generate_networks
+from fbus.protocol import FBUS_ADAPTER
+from fbus.recorder import Recorder, Replay
+from fbus.simulator import Simulator
+
+CYCLES = 2000
+CALLS = 20000
+REPEATS = 5
+
+
+def run(bus: FBUS, cycles: int) -> tuple[float, list[bytes]]:
+    """Выполнить cycles циклов обмена. Возвращает время цикла (с) и входные
+    данные каждого цикла.
+    """
+
+    bus.fbusInitialize()
+    bus.fbusOpen(adapter=FBUS_ADAPTER.TCP, port=1)
+    image = ProcessImage.from_rescan(bus)
+
+    snapshots = []
+    start = perf_counter()
+    for number in range(cycles):
+        image.outputs[:] = bytes([number & 0xFF]) * len(image.outputs)
+        image.exchange()
+        snapshots.append(bytes(image.inputs))
+    elapsed = (perf_counter() - start) / cycles
+
+    bus.fbusClose()
+    bus.fbusDeInitialize()
+    return elapsed, snapshots
+
+
+def per_call(func: Callable[..., bool], arguments: tuple) -> float:
+    """Лучшее из REPEATS серий среднее время вызова func, с. Ошибки FBusError
+    (например, для неоткрытой сети) входят во время вызова.
+    """
+
+    best = float("inf")
+    for _ in range(REPEATS):
+        start = perf_counter()
+        for _ in range(CALLS):
+            try:
+                func(*arguments)
+            except FBusError:
+                pass
+        best = min(best, (perf_counter() - start) / CALLS)
+
+    return best
+
+
+def native() -> None:
+    """Время вызовов библиотеки libfbus без записи и с записью."""
+
+    try:
+        backend = get_backend("native")
+        plain = backend.functions()
+    except FBusError as err:
+        print(f"native: {err}")
+        return
+
+    recorded = Recorder(BytesIO(), backend).functions()
+    cases = {
+        "fbusGetVersion": (byref(c_int()), byref(c_int())),
+        "fbusProcessGroup (no network)": (c_size_t(0), 0x80),
+        "fbusReadInputs (no network)": (c_size_t(0), 1, byref(c_int()), 0, sizeof(c_int)),
+    }
+    for case, arguments in cases.items():
+        name = case.split()[0]
+        bare, traced = per_call(plain[name], arguments), per_call(recorded[name], arguments)
+        print(f"native {case:30s} {bare * 1e6:6.2f} us, recorded {traced * 1e6:6.2f} us "
+              f"(+{(traced - bare) * 1e6:.2f} us)")
+
+
+if __name__ == "__main__":
+    plain = min(run(FBUS(Simulator(generate_networks(1, seed=1))), CYCLES)[0]
+                for _ in range(REPEATS))
+    print(f"simulator:           {plain * 1e6:8.1f} us/cycle")
+
+    recorded = float("inf")
+    for _ in range(REPEATS):
+        trace = BytesIO()
+        recorder = Recorder(trace, Simulator(generate_networks(1, seed=1)))
+        elapsed, expected = run(FBUS(recorder), CYCLES)
+        recorded = min(recorded, elapsed)
+    recorder.flush()
+    size = len(trace.getvalue())
+    calls = recorder.calls / CYCLES
+    print(f"simulator + recorder: {recorded * 1e6:7.1f} us/cycle "
+          f"(+{(recorded - plain) / plain:.0%}, {(recorded - plain) / calls * 1e6:.2f} us/call), "
+          f"{recorder.calls} calls, {size / 1e6:.1f} MB, {size / recorder.calls:.0f} B/call")
+
+    replay = Replay(trace.getvalue())
+    replayed, actual = run(FBUS(replay), CYCLES)
+    print(f"replay:              {replayed * 1e6:8.1f} us/cycle")
+
+    assert replay.done, "trace is not fully replayed"
+    assert actual == expected, "replayed inputs differ from recorded"
+    print("replayed inputs match recorded")
+
+    native()
@@ -0,0 +1,73 @@
+#! /usr/bin/env python3
+
+"""Замер публикации образа процесса в разделяемую память одним процессом
+записи и чтения его N процессами-читателями.
+"""
+
+from __future__ import annotations
+
+import argparse
+from multiprocessing import Event, Process, Queue
+from time import perf_counter
+
+from fbus.image import NodeLayout, ProcessImage
+from fbus.shm import SharedImageReader, SharedImageWriter
+
+
+def reader(name: str, start: Event, stop: Event, results: Queue) -> None:
+    """Процесс чтения согласованных копий входного образа."""
+
+    shm = SharedImageReader(name)
+    reads = torn = 0
+    start.wait()
+
+    begin = perf_counter()
+    while not stop.is_set():
+        _, _, data = shm.read()
+        reads += 1
+        if data.count(data[0]) != len(data):
+            torn += 1
+    elapsed = perf_counter() - begin
+
+    shm.close()
+    results.put((reads / elapsed, torn))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--readers", type=int, default=4, help="число читателей")
+    parser.add_argument("--nodes", type=int, default=32, help="число модулей")
+    parser.add_argument("--size", type=int, default=36, help="размер входных данных модуля")
+    parser.add_argument("--seconds", type=float, default=2.0, help="длительность замера")
+    args = parser.parse_args()
+
+    layout = [NodeLayout(net_id, 0x80, net_id * args.size, args.size, 0, 0)
+              for net_id in range(args.nodes)]
+    image = ProcessImage(None, layout)
+    writer = SharedImageWriter(image)
+
+    start, stop, results = Event(), Event(), Queue()
+    readers = [Process(target=reader, args=(writer.name, start, stop, results))
+               for _ in range(args.readers)]
+    for process in readers:
+        process.start()
+
+    start.set()
+    begin = perf_counter()
+    cycles = 0
+    while perf_counter() - begin < args.seconds:
+        cycles += 1
+        image.inputs[:] = bytes([cycles % 256]) * len(image.inputs)
+        writer.publish()
+    elapsed = perf_counter() - begin
+    stop.set()
+
+    rates = [results.get() for _ in readers]
+    for process in readers:
+        process.join()
+    writer.close()
+
+    print(f"image: {len(image.inputs)} bytes, {args.readers} readers")
+    print(f"writer: {cycles / elapsed:.0f} publish/s ({elapsed / cycles * 1e6:.2f} us)")
+    for index, (rate, torn) in enumerate(rates):
+        print(f"reader {index}: {rate:.0f} reads/s, torn: {torn}")
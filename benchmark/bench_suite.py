@@ -0,0 +1,295 @@
+#! /usr/bin/env python3
+
+"""Набор замеров горячих путей клиента FBUS без оборудования (бэкенд
+fbus.simulator).
+
+Замеряются:
+  call.*     - накладные расходы вызова каждого метода FBUS;
+  inputs.*   - fbusReadInputs с созданием структуры и fbusReadInputsInto
+               в существующую структуру;
+  poll.*     - опрос всей сети: по одному модулю и групповой обмен
+               ProcessImage (в том числе со сбором статистики fbus.metrics);
+  decode.*   - декодирование записей AIM724, DIM764 и NIM74X через ctypes
+               и через кодеки fbus.codec.
+
+Результаты (мкс на операцию, лучшее из повторов) выводятся в виде таблицы
+и могут быть сохранены в JSON (--output). С ключом --baseline результаты
+сравниваются с сохраненными ранее, при замедлении больше --threshold
+скрипт завершается с кодом 1.
+"""
+
+import argparse
+import json
+import platform
+import sys
+from ctypes import Array, Structure, c_size_t, sizeof
+from datetime import datetime, timezone
+from random import Random
+from timeit import Timer
+from typing import Callable
+
+from fbus.client import FBUS
+from fbus.codec import codec_of
+from fbus.device.aim724 import AIM724_CONFIGURATION, AIM724_INPUTS
+from fbus.device.dim764 import DIM764_INPUTS
+from fbus.device.nim74x import NIM74X_INPUTS, NIM74X_OUTPUTS
+from fbus.image import ProcessImage
+from fbus.models import model_for
+from fbus.protocol import FBUS_ADAPTER, FIO_MODULE_DESC, FIO_MODULE_TYPE
+from fbus.simulator import SIM_CALIBRATION_SIZE, Simulator
+
+# Состав сети: модуль 0 - AIM724, 1 - DIM764, 2 - NIM741, 3 - DIM718 и т.д.
+RACK = [FIO_MODULE_TYPE.AIM724, FIO_MODULE_TYPE.DIM764, FIO_MODULE_TYPE.NIM741,
+        FIO_MODULE_TYPE.DIM718] * 16
+
+AIM724, DIM764, NIM741 = 0, 1, 2
+
+Case = Callable[[FBUS, ProcessImage, Simulator], Callable[[], object]]
+
+
+def open_bus() -> tuple[FBUS, ProcessImage, Simulator]:
+    """Виртуальная сеть с построенными группами обмена."""
+
+    random = Random(1)
+    simulator = Simulator({1: [model_for(module_type, random, serial)
+                               for serial, module_type in enumerate(RACK, 1)],
+                           2: []})
+    bus = FBUS(simulator)
+    bus.fbusInitialize()
+    bus.fbusOpen(adapter=FBUS_ADAPTER.TCP, port=1)
+    return bus, ProcessImage.from_rescan(bus), simulator
+
+
+def call_cases() -> dict[str, Case]:
+    """Вызовы методов FBUS. Методы, меняющие состояние сети, замеряются
+    парами, возвращающими ее в исходное состояние.
+    """
+
+    inputs = AIM724_INPUTS()
+    outputs = NIM74X_OUTPUTS()
+    descr = FIO_MODULE_DESC()
+    calibration = (c_size_t * (SIM_CALIBRATION_SIZE // sizeof(c_size_t)))()
+    buffer = bytearray(sizeof(AIM724_INPUTS))
+
+    def open_close(bus, image, simulator):
+        other = FBUS(simulator)
+        return lambda: (other.fbusOpen(adapter=FBUS_ADAPTER.TCP, port=2), other.fbusClose())
+
+    def assign_build(bus, image, simulator):
+        node = image.nodes[AIM724]
+        return lambda: (bus.fbusAssignNodeToGroup(AIM724, node.group_id, 0, node.input_length,
+                                                  0, node.output_length),
+                        bus.fbusBuildGroups())
+
+    def delete_build(bus, image, simulator):
+        node = image.nodes[AIM724]
+
+        def call():
+            bus.fbusDeleteGroup(node.group_id)
+            image.assign(write_config=False)
+
+        return call
+
+    def delete_all_build(bus, image, simulator):
+        def call():
+            bus.fbusDeleteAllGroups()
+            image.assign(write_config=False)
+
+        return call
+
+    def calibration_mode(bus, image, simulator):
+        return lambda: (bus.fbusModuleEnterCalibrationMode(AIM724),
+                        bus.fbusModuleLeaveCalibrationMode(AIM724))
+
+    def set_calibration(bus, image, simulator):
+        bus.fbusModuleEnterCalibrationMode(AIM724)
+        return lambda: bus.fbusModuleSetCalibrationData(AIM724, 0, sizeof(calibration),
+                                                        calibration)
+
+    def load_calibration(bus, image, simulator):
+        bus.fbusModuleSaveCalibrationData(AIM724, 0)
+        return lambda: bus.fbusModuleLoadCalibrationData(AIM724, 0)
+
+    return {
+        "fbusGetVersion": lambda bus, image, sim: bus.fbusGetVersion,
+        "fbusInitialize+fbusDeInitialize": lambda bus, image, sim: lambda: (
+            bus.fbusInitialize(), bus.fbusDeInitialize()),
+        "fbusOpen+fbusClose": open_close,
+        "fbusRescan": lambda bus, image, sim: bus.fbusRescan,
+        "fbusGetNodesCount": lambda bus, image, sim: bus.fbusGetNodesCount,
+        "fbusGetNodeDescription": lambda bus, image, sim: lambda: bus.fbusGetNodeDescription(AIM724),
+        "fbusGetNodeDescriptionInto": lambda bus, image, sim: lambda: bus.fbusGetNodeDescriptionInto(
+            AIM724, descr),
+        "fbusReset": lambda bus, image, sim: lambda: bus.fbusReset(AIM724),
+        "fbusSendSync": lambda bus, image, sim: lambda: bus.fbusSendSync(0),
+        "fbusGetNodeCommonParameters": lambda bus, image, sim: lambda: (
+            bus.fbusGetNodeCommonParameters(AIM724)),
+        "fbusGetNodeCommonParametersInto": lambda bus, image, sim: (
+            lambda conf: lambda: bus.fbusGetNodeCommonParametersInto(AIM724, conf))(
+            bus.fbusGetNodeCommonParameters(AIM724)),
+        "fbusSetNodeCommonParameters": lambda bus, image, sim: (
+            lambda conf: lambda: bus.fbusSetNodeCommonParameters(AIM724, conf))(
+            bus.fbusGetNodeCommonParameters(AIM724)),
+        "fbusGetNodeSpecificParameters": lambda bus, image, sim: lambda: (
+            bus.fbusGetNodeSpecificParameters(AIM724, AIM724_CONFIGURATION)),
+        "fbusSetNodeSpecificParameters": lambda bus, image, sim: (
+            lambda conf: lambda: bus.fbusSetNodeSpecificParameters(AIM724, conf))(
+            bus.fbusGetNodeSpecificParameters(AIM724, AIM724_CONFIGURATION)),
+        "fbusDeleteGroup+assign": delete_build,
+        "fbusDeleteAllGroups+assign": delete_all_build,
+        "fbusAssignNodeToGroup+fbusBuildGroups": assign_build,
+        "fbusReadConfig": lambda bus, image, sim: lambda: bus.fbusReadConfig(AIM724),
+        "fbusWriteConfig": lambda bus, image, sim: lambda: bus.fbusWriteConfig(AIM724),
+        "fbusSaveConfig": lambda bus, image, sim: lambda: bus.fbusSaveConfig(AIM724),
+        "fbusReadInputs": lambda bus, image, sim: lambda: bus.fbusReadInputs(AIM724, AIM724_INPUTS),
+        "fbusReadInputsInto": lambda bus, image, sim: lambda: bus.fbusReadInputsInto(AIM724, buffer),
+        "fbusWriteOutputs": lambda bus, image, sim: lambda: bus.fbusWriteOutputs(NIM741, outputs),
+        "fbusWriteOutputsFrom": lambda bus, image, sim: lambda: bus.fbusWriteOutputsFrom(
+            NIM741, outputs),
+        "fbusGetNodeLayouts": lambda bus, image, sim: lambda: bus.fbusGetNodeLayouts(AIM724),
+        "fbusReadNodeInputs": lambda bus, image, sim: lambda: bus.fbusReadNodeInputs(AIM724),
+        "fbusProcessGroup": lambda bus, image, sim: lambda: bus.fbusProcessGroup(
+            image.nodes[AIM724].group_id),
+        "fbusGroupSetNodeOutputs": lambda bus, image, sim: lambda: bus.fbusGroupSetNodeOutputs(
+            image.nodes[NIM741].group_id, NIM741, outputs),
+        "fbusGroupGetNodeInputs": lambda bus, image, sim: lambda: bus.fbusGroupGetNodeInputs(
+            image.nodes[AIM724].group_id, AIM724, AIM724_INPUTS),
+        "fbusGroupSetNodeOutputsFrom": lambda bus, image, sim: lambda: (
+            bus.fbusGroupSetNodeOutputsFrom(image.nodes[NIM741].group_id, NIM741, outputs)),
+        "fbusGroupGetNodeInputsInto": lambda bus, image, sim: lambda: (
+            bus.fbusGroupGetNodeInputsInto(image.nodes[AIM724].group_id, AIM724, inputs)),
+        "fbusGroupScatterOutputs": lambda bus, image, sim: lambda: bus.fbusGroupScatterOutputs(
+            image.groups[0], image._exchange[image.groups[0]][0], image.outputs),
+        "fbusGroupGatherInputs": lambda bus, image, sim: lambda: bus.fbusGroupGatherInputs(
+            image.groups[0], image._exchange[image.groups[0]][1], image.inputs),
+        "fbusModuleGetCalibrationData": lambda bus, image, sim: lambda: (
+            bus.fbusModuleGetCalibrationData(AIM724, 0, sizeof(calibration), calibration)),
+        "fbusModuleSetCalibrationData": set_calibration,
+        "fbusModuleEnterCalibrationMode+Leave": calibration_mode,
+        "fbusModuleSaveCalibrationData": lambda bus, image, sim: lambda: (
+            bus.fbusModuleSaveCalibrationData(AIM724, 0)),
+        "fbusModuleLoadCalibrationData": load_calibration,
+        "fbusGetAdapterInfo": lambda bus, image, sim: bus.fbusGetAdapterInfo,
+    }
+
+
+def poll_individual(bus: FBUS, image: ProcessImage, simulator: Simulator) -> Callable[[], None]:
+    """Опрос сети по одному модулю: запись выходов и чтение входов каждого
+    модуля отдельными вызовами.
+    """
+
+    nodes = image.layout
+
+    def call():
+        for node in nodes:
+            if node.output_length:
+                bus.fbusWriteOutputsFrom(node.net_id, image.outputs, node.output_offset,
+                                         node.output_length)
+            if node.input_length:
+                bus.fbusReadInputsInto(node.net_id, image.inputs, node.input_offset,
+                                       node.input_length)
+
+    return call
+
+
+def decode_ctypes(layout: type[Structure], data: bytes) -> Callable[[], list]:
+    names = [name for name, *_ in layout._fields_]
+
+    def call():
+        record = layout.from_buffer_copy(data)
+        return [bytes(value) if isinstance(value, Array) else value
+                for value in (getattr(record, name) for name in names)]
+
+    return call
+
+
+def decode_codec(layout: type[Structure], data: bytes) -> Callable[[], tuple]:
+    return lambda: codec_of(layout).unpack(data)
+
+
+def cases() -> dict[str, Case]:
+    result = {f"call.{name}": case for name, case in call_cases().items()}
+    result["inputs.alloc"] = lambda bus, image, sim: lambda: bus.fbusReadInputs(
+        AIM724, AIM724_INPUTS)
+    result["inputs.reuse"] = lambda bus, image, sim: (
+        lambda dest: lambda: bus.fbusReadInputsInto(AIM724, dest))(AIM724_INPUTS())
+    result["poll.individual"] = poll_individual
+    result["poll.group"] = lambda bus, image, sim: image.exchange
+    result["poll.group.instrumented"] = lambda bus, image, sim: (bus.instrument(),
+                                                                image.exchange)[1]
+
+    for layout in (AIM724_INPUTS, DIM764_INPUTS, NIM74X_INPUTS):
+        data = bytes(range(256)) * (sizeof(layout) // 256 + 1)
+        data = data[:sizeof(layout)]
+        result[f"decode.ctypes.{layout.__name__}"] = (
+            lambda layout, data: lambda bus, image, sim: decode_ctypes(layout, data))(layout, data)
+        result[f"decode.codec.{layout.__name__}"] = (
+            lambda layout, data: lambda bus, image, sim: decode_codec(layout, data))(layout, data)
+
+    return result
+
+
+def measure(case: Case, repeat: int) -> float:
+    """Лучшее время одной операции из repeat повторов, мкс."""
+
+    bus, image, simulator = open_bus()
+    timer = Timer(case(bus, image, simulator))
+    number, _ = timer.autorange()
+    return min(timer.repeat(repeat, number)) / number * 1e6
+
+
+def compare(results: dict[str, float], baseline: dict[str, float], threshold: float) -> bool:
+    """Вывести сравнение с базовыми результатами. Возвращает True, если нет
+    замедлений больше threshold.
+    """
+
+    ok = True
+    print(f"\n{'case':<48}{'baseline':>10}{'current':>10}{'change':>9}")
+    for name, value in results.items():
+        if name not in baseline:
+            continue
+        change = value / baseline[name] - 1
+        mark = ""
+        if change > threshold:
+            mark = "  REGRESSION"
+            ok = False
+        print(f"{name:<48}{baseline[name]:>10.2f}{value:>10.2f}{change:>+9.1%}{mark}")
+
+    return ok
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--filter", default="",
+                        help="замерять только случаи, имена которых содержат строку")
+    parser.add_argument("--repeat", type=int, default=5,
+                        help="число повторов каждого замера")
+    parser.add_argument("--output", help="файл JSON для сохранения результатов")
+    parser.add_argument("--baseline", help="файл JSON с базовыми результатами")
+    parser.add_argument("--threshold", type=float, default=0.10,
+                        help="допустимое замедление относительно базовых результатов")
+    args = parser.parse_args()
+
+    results = {}
+    for name, case in cases().items():
+        if args.filter in name:
+            results[name] = measure(case, args.repeat)
+            print(f"{name:<48}{results[name]:>10.2f} us")
+
+    if args.output:
+        report = {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "date": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "unit": "us",
+            "results": results,
+        }
+        with open(args.output, "w") as file:
+            json.dump(report, file, indent=2)
+
+    if args.baseline:
+        with open(args.baseline) as file:
+            baseline = json.load(file)["results"]
+        if not compare(results, baseline, args.threshold):
+            sys.exit(1)
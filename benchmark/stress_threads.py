@@ -0,0 +1,83 @@
+#! /usr/bin/env python3
+
+"""Нагрузочная проверка многопоточного доступа к клиенту FBUS.
+
+Несколько потоков на каждую сеть одновременно вызывают разные функции клиента
+и проверяют, что ошибка содержит имя именно вызванной функции. Без указания
+портов используются неоткрытые сети: каждый вызов завершается ошибкой
+libfbus, что позволяет проверить диспетчеризацию без оборудования.
+"""
+
+from __future__ import annotations
+
+import argparse
+from threading import Barrier, Thread
+from time import perf_counter
+
+from fbus.client import FBUS, FBusError
+from fbus.protocol import FBUS_ADAPTER
+
+
+def worker(bus: FBUS, barrier: Barrier, calls: int, failures: list[str]) -> None:
+    """Поток, выполняющий чередующиеся вызовы одного клиента."""
+
+    requests = [("fbusGetNodesCount", bus.fbusGetNodesCount),
+                ("fbusReset", lambda: bus.fbusReset(0)),
+                ("fbusReadConfig", lambda: bus.fbusReadConfig(0)),
+                ("fbusGetAdapterInfo", bus.fbusGetAdapterInfo),
+               ]
+
+    barrier.wait()
+    for index in range(calls):
+        name, request = requests[index % len(requests)]
+        try:
+            request()
+        except FBusError as err:
+            if not str(err).startswith(name):
+                failures.append(f"{name}: {err}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--ports", type=int, nargs="*", default=[],
+                        help="номера TCP-портов открываемых сетей")
+    parser.add_argument("--nets", type=int, default=4,
+                        help="число сетей без оборудования")
+    parser.add_argument("--threads", type=int, default=8,
+                        help="число потоков на сеть")
+    parser.add_argument("--calls", type=int, default=20000,
+                        help="число вызовов на поток")
+    args = parser.parse_args()
+
+    FBUS().fbusInitialize()
+
+    buses = []
+    for port in args.ports or range(args.nets):
+        bus = FBUS()
+        if args.ports:
+            bus.fbusOpen(adapter=FBUS_ADAPTER.TCP, port=port)
+            bus.fbusRescan()
+        buses.append(bus)
+
+    failures: list[str] = []
+    barrier = Barrier(len(buses) * args.threads)
+    threads = [Thread(target=worker, args=(bus, barrier, args.calls, failures))
+               for bus in buses for _ in range(args.threads)]
+
+    start = perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = perf_counter() - start
+
+    total = len(threads) * args.calls
+    print(f"{len(buses)} nets x {args.threads} threads: {total} calls in "
+          f"{elapsed:.2f} s ({total / elapsed:.0f} calls/s)")
+    print(f"mismatched errors: {len(failures)}")
+
+    for bus in buses if args.ports else ():
+        bus.fbusClose()
+    FBUS().fbusDeInitialize()
+
+    raise SystemExit(1 if failures else 0)
@@ -0,0 +1,31 @@
+#! /usr/bin/env python3
+
+"""Пример использования библиотеки (NIM745 + групповой обмен через образ процесса)."""
+
+import contextlib
+from time import perf_counter, sleep
+
+from fbus.client import FBUS
+from fbus.image import ProcessImage
+from fbus.protocol import FBUS_ADAPTER
+
+if __name__ == "__main__":
+    bus = FBUS()
+
+    print(f"fbusInitialize {bus.fbusInitialize()}")
+    print(f"fbusOpen {bus.fbusOpen(adapter=FBUS_ADAPTER.TCP, port=1)}")
+
+    image = ProcessImage.from_rescan(bus)
+    for node in image.layout:
+        print(f"    {node}")
+    print(f"inputs: {len(image.inputs)} bytes, outputs: {len(image.outputs)} bytes")
+
+    with contextlib.suppress(KeyboardInterrupt):
+        while True:
+            start = perf_counter()
+            image.exchange()
+            print(f"cycle {(perf_counter() - start) * 1e3:.2f} ms: {image.inputs.hex()}")
+            sleep(1.0)
+
+    print(f"fbusClose {bus.fbusClose()}")
+    print(f"fbusDeInitialize {bus.fbusDeInitialize()}")
@@ -0,0 +1,42 @@
+#! /usr/bin/env python3
+
+"""Пример использования библиотеки без оборудования (виртуальная сеть +
+групповой обмен через образ процесса).
+
+Остальные примеры также можно запустить с виртуальной сетью, задав
+переменную окружения FBUS_BACKEND=sim. Первый модуль сети по умолчанию -
+AIM724; для других примеров состав сети задается переменной
+FBUS_SIM_NETWORKS, например:
+
+    FBUS_BACKEND=sim FBUS_SIM_NETWORKS="1=DIM718" python example_nim745_dim718.py
+    FBUS_BACKEND=sim FBUS_SIM_NETWORKS="1=NIM741" python example_nim745_nim741.py
+"""
+
+from time import perf_counter
+
+from fbus.client import FBUS
+from fbus.image import ProcessImage
+from fbus.protocol import FBUS_ADAPTER, FIO_MODULE_TYPE
+from fbus.simulator import Simulator
+
+RACK = [FIO_MODULE_TYPE.AIM724, FIO_MODULE_TYPE.DIM764, FIO_MODULE_TYPE.DIM718,
+        FIO_MODULE_TYPE.NIM741] * 8
+
+if __name__ == "__main__":
+    bus = FBUS(Simulator({1: RACK}))
+
+    print(f"fbusInitialize {bus.fbusInitialize()}")
+    print(f"fbusOpen {bus.fbusOpen(adapter=FBUS_ADAPTER.TCP, port=1)}")
+
+    image = ProcessImage.from_rescan(bus)
+    print(f"nodes: {len(image.layout)}, groups: {len(image.groups)}")
+    print(f"inputs: {len(image.inputs)} bytes, outputs: {len(image.outputs)} bytes")
+
+    cycles = 10000
+    start = perf_counter()
+    for _ in range(cycles):
+        image.exchange()
+    print(f"cycle {(perf_counter() - start) / cycles * 1e6:.1f} us")
+
+    print(f"fbusClose {bus.fbusClose()}")
+    print(f"fbusDeInitialize {bus.fbusDeInitialize()}")
@@ -0,0 +1,160 @@
+#! /usr/bin/env python3
+
+"""Пакетная распаковка состояний дискретных каналов модулей DIM.
+Fastwel FBUS SDK Версия 2.4.
+
+Требуется пакет numpy.
+"""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, NamedTuple
+
+import numpy as np
+
+from fbus.client import FBusError
+from fbus.protocol import FIO_MODULE_TYPE
+from fbus.registry import layouts_of
+
+if TYPE_CHECKING:
+    from fbus.client import FBUS, Buffer
+    from fbus.image import ProcessImage
+
+
+class BitField(NamedTuple):
+    """Упакованное поле состояний каналов во входных данных модуля."""
+
+    field: str      # Имя поля структуры *_INPUTS
+    count: int      # Число значащих младших разрядов
+
+
+_bit_fields: dict[int, tuple[BitField, ...]] = {
+    FIO_MODULE_TYPE.DIM711: (BitField("channelsStates", 8),),
+    FIO_MODULE_TYPE.DIM712: (BitField("inputStates", 2),),
+    FIO_MODULE_TYPE.DIM713: (BitField("inputStates", 2),),
+    FIO_MODULE_TYPE.DIM714: (BitField("inputStates", 4),),
+    FIO_MODULE_TYPE.DIM715: (BitField("inputStates", 2),),
+    FIO_MODULE_TYPE.DIM716: (BitField("inputStates", 2),),
+    FIO_MODULE_TYPE.DIM717: (BitField("inputStates", 8),),
+    FIO_MODULE_TYPE.DIM718: (BitField("channelsStates", 8),),
+    FIO_MODULE_TYPE.DIM719: (BitField("channelsStates", 8),),
+    FIO_MODULE_TYPE.DIM760: (BitField("inputStates", 4),),
+    FIO_MODULE_TYPE.DIM761: (BitField("inputStates", 4),),
+    FIO_MODULE_TYPE.DIM762: (BitField("inputStates", 8),),
+    FIO_MODULE_TYPE.DIM763: (BitField("channelsStates", 8),),
+    FIO_MODULE_TYPE.DIM764: (BitField("channelsState", 8), BitField("inputsState", 8)),
+    FIO_MODULE_TYPE.DIM765: (BitField("channelsState", 8), BitField("wireBreaks", 8)),
+    FIO_MODULE_TYPE.DIM766: (BitField("channelsState", 8), BitField("wireBreaks", 8)),
+    FIO_MODULE_TYPE.DIM812: (BitField("outputsState", 4),),
+    FIO_MODULE_TYPE.DIM813: (BitField("outputsState", 4),),
+    FIO_MODULE_TYPE.DIM814: (BitField("inputsState", 16),),
+    FIO_MODULE_TYPE.DIM815: (BitField("inputsState", 8),),
+    FIO_MODULE_TYPE.DIM816: (BitField("inputsState", 8),),
+    FIO_MODULE_TYPE.DIM817: (BitField("inputsState", 16),),
+    FIO_MODULE_TYPE.DIM818: (BitField("outputsState", 16),),
+    FIO_MODULE_TYPE.DIM819: (BitField("outputsState", 16),),
+    FIO_MODULE_TYPE.DIM860: (BitField("inputsState", 16),),
+    FIO_MODULE_TYPE.DIM862: (BitField("inputsState", 16),),
+    FIO_MODULE_TYPE.DIM873: (BitField("outputsState", 16),),
+}
+
+
+def register_bits(module_type: int, fields: tuple[BitField, ...]) -> None:
+    """Зарегистрировать (или заменить) упакованные поля типа модуля."""
+
+    _bit_fields[module_type] = fields
+
+
+def _field_offset(module_type: int, field: str) -> tuple[int, int]:
+    descr = getattr(layouts_of(module_type).inputs, field)
+    return descr.offset, descr.size
+
+
+class DigitalImage:
+    """Состояния дискретных каналов всех модулей DIM образа процесса.
+
+    Байты упакованных полей всех модулей выбираются из входного образа одним
+    индексным массивом, распаковываются np.unpackbits и прореживаются до
+    значащих разрядов, поэтому стоимость update() не зависит от числа
+    модулей на уровне интерпретатора. Столбцы матрицы состояний названы
+    "<net_id>.<поле>.<разряд>", индекс имени - в словаре index.
+    """
+
+    def __init__(self, image: ProcessImage, types: dict[int, int]) -> None:
+        self.image = image
+        self.names: list[str] = []
+        self.nodes: dict[int, slice] = {}
+
+        positions: list[int] = []
+        select: list[int] = []
+        for node in image.layout:
+            fields = _bit_fields.get(types.get(node.net_id, FIO_MODULE_TYPE.UNKNOWN))
+            if not fields:
+                continue
+
+            first = len(self.names)
+            for bit_field in fields:
+                offset, size = _field_offset(types[node.net_id], bit_field.field)
+                if bit_field.count > 8 * size:
+                    msg = f"{bit_field.field} has only {8 * size} bits"
+                    raise FBusError(msg)
+
+                base = 8 * len(positions)
+                positions.extend(range(node.input_offset + offset,
+                                       node.input_offset + offset + size))
+                select.extend(range(base, base + bit_field.count))
+                self.names.extend(f"{node.net_id}.{bit_field.field}.{bit}"
+                                  for bit in range(bit_field.count))
+
+            self.nodes[node.net_id] = slice(first, len(self.names))
+
+        self.index = {name: column for column, name in enumerate(self.names)}
+        self._positions = np.array(positions, np.intp)
+        self._select = np.array(select, np.intp)
+        self.states = np.zeros(len(self.names), np.bool_)
+        self.rising = np.zeros_like(self.states)
+        self.falling = np.zeros_like(self.states)
+
+    @classmethod
+    def from_bus(cls, image: ProcessImage, bus: FBUS) -> DigitalImage:
+        """Определить типы модулей образа по fbusGetNodeDescription."""
+
+        types = {node.net_id: bus.fbusGetNodeDescription(node.net_id).Type
+                 for node in image.layout}
+        return cls(image, types)
+
+    def unpack(self, data: Buffer | bytes | np.ndarray) -> np.ndarray:
+        """Состояния каналов из входного образа.
+
+        Для одного образа возвращается вектор (каналы), для двумерного массива
+        байтов (циклы x образ) - матрица (циклы x каналы).
+        """
+
+        raw = data if isinstance(data, np.ndarray) else np.frombuffer(data, np.uint8)
+        packed = raw[..., self._positions]
+        bits = np.unpackbits(packed, axis=-1, bitorder="little")
+        return bits[..., self._select].view(np.bool_)
+
+    def update(self) -> np.ndarray:
+        """Обновить состояния по текущему входному образу и вычислить фронты
+        относительно предыдущего вызова.
+        """
+
+        previous = self.states
+        self.states = states = self.unpack(self.image.inputs)
+        np.greater(states, previous, out=self.rising)
+        np.less(states, previous, out=self.falling)
+        return states
+
+    def channel(self, name: str) -> bool:
+        """Текущее состояние канала по имени."""
+
+        return bool(self.states[self.index[name]])
+
+    def node(self, net_id: int) -> np.ndarray:
+        """Текущие состояния каналов модуля."""
+
+        return self.states[self.nodes[net_id]]
+
+
+__all__ = ["BitField", "DigitalImage", "register_bits"]
@@ -0,0 +1,118 @@
+#! /usr/bin/env python3
+
+"""Обнаружение изменений входных данных модулей между циклами обмена.
+Fastwel FBUS SDK Версия 2.4.
+"""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Callable, Iterable, NamedTuple
+
+if TYPE_CHECKING:
+    from fbus.image import NodeLayout, ProcessImage
+
+
+class Change(NamedTuple):
+    """Изменение входных данных модуля."""
+
+    net_id: int         # Идентификатор модуля в сети
+    start: int          # Смещение первого измененного байта в данных модуля
+    end: int            # Смещение за последним измененным байтом в данных модуля
+
+
+Subscriber = Callable[[Change, memoryview], object]
+
+
+class ChangeDetector:
+    """Сравнение входных данных модулей с предыдущим циклом.
+
+    После каждого обновления буфера входных данных update() сравнивает данные
+    каждого модуля с их копией из предыдущего цикла, формирует битовую маску
+    измененных модулей (бит i соответствует i-му модулю размещения nodes) и
+    диапазоны измененных байт, а подписчикам передаются только изменившиеся
+    модули. Модули без входных данных не изменяются никогда. Данные модулей
+    сравниваются через заранее созданные срезы memoryview, без копирования.
+    """
+
+    def __init__(self, nodes: Iterable[NodeLayout], buffer: bytearray) -> None:
+        self.nodes = list(nodes)
+        self._by_id = {node.net_id: node for node in self.nodes}
+        self.dirty = 0
+        self.changes: list[Change] = []
+        self._buffer = buffer
+        self._view = memoryview(buffer)
+        self._previous = bytearray(buffer)
+        previous = memoryview(self._previous)
+        self._slices: list[tuple[int, NodeLayout, memoryview, memoryview]] = []
+        for index, node in enumerate(self.nodes):
+            if node.input_length:
+                region = slice(node.input_offset, node.input_offset + node.input_length)
+                self._slices.append((index, node, self._view[region], previous[region]))
+        self._subscribers: list[tuple[Subscriber, frozenset[int] | None]] = []
+
+    @classmethod
+    def for_image(cls, image: ProcessImage) -> ChangeDetector:
+        """Обнаружение изменений во входном образе процесса."""
+
+        return cls(image.layout, image.inputs)
+
+    def subscribe(self, callback: Subscriber, net_ids: Iterable[int] | None = None) -> None:
+        """Подписаться на изменения всех модулей или модулей из net_ids.
+
+        callback получает описание изменения и данные модуля текущего цикла.
+        """
+
+        self._subscribers.append((callback, None if net_ids is None else frozenset(net_ids)))
+
+    def unsubscribe(self, callback: Subscriber) -> None:
+        """Отменить подписку."""
+
+        self._subscribers = [item for item in self._subscribers if item[0] != callback]
+
+    def update(self) -> int:
+        """Сравнить текущие входные данные с предыдущим циклом, оповестить
+        подписчиков и вернуть битовую маску измененных модулей.
+        """
+
+        current = self._buffer
+        previous = self._previous
+
+        self.dirty = 0
+        self.changes = []
+        if current == previous:
+            return 0
+
+        for index, node, data, old in self._slices:
+            if data != old:
+                start = 0
+                end = node.input_length
+                while data[start] == old[start]:
+                    start += 1
+                while data[end - 1] == old[end - 1]:
+                    end -= 1
+
+                self.dirty |= 1 << index
+                self.changes.append(Change(node.net_id, start, end))
+
+        previous[:] = current
+        self._notify()
+        return self.dirty
+
+    def _notify(self) -> None:
+        if not self._subscribers:
+            return
+
+        for change in self.changes:
+            node = self._by_id[change.net_id]
+            data = self._view[node.input_offset:node.input_offset + node.input_length]
+            for callback, net_ids in self._subscribers:
+                if net_ids is None or change.net_id in net_ids:
+                    callback(change, data)
+
+    def is_dirty(self, index: int) -> bool:
+        """Изменились ли данные модуля с порядковым номером index в nodes."""
+
+        return bool(self.dirty >> index & 1)
+
+
+__all__ = ["Change", "ChangeDetector"]
@@ -7,32 +7,144 @@ Fastwel FBUS SDK Версия 2.4.
 from __future__ import annotations
 
 import os
-from ctypes import (CDLL, CFUNCTYPE, POINTER, Structure, byref, c_int, c_size_t,
-                    c_uint, c_uint8, c_uint32, c_void_p, cdll, sizeof)
-from functools import partial
+from ctypes import (CDLL, CFUNCTYPE, POINTER, Structure, addressof, byref, c_char,
+                    c_int, c_size_t, c_uint, c_uint8, c_uint32, c_void_p, cast, cdll,
+                    sizeof)
+from functools import lru_cache, wraps
+from importlib import import_module
 from platform import architecture
-from typing import TYPE_CHECKING, Callable
+from threading import Lock, RLock
+from typing import TYPE_CHECKING, Callable, Sequence, TypeVar, Union
 
 from fbus.protocol import (FBUS_ADAPTER, FBUS_ADAPTER_INFO, FBUS_RESULT,
                            FIO_MODULE_COMMON_CONF, FIO_MODULE_DESC)
 
 if TYPE_CHECKING:
-    from _ctypes import _CData, _PyCFuncPtrType
+    from _ctypes import CFuncPtr, _CData
 
+    from fbus.metrics import Metrics
+    from fbus.registry import DeviceLayouts
 
-def _load_lib(arch: str, name: str) -> CDLL:
-    return cdll.LoadLibrary(os.path.join(os.path.dirname(__file__), "libs", arch, name))
+    Buffer = Union[_CData, bytearray, memoryview]
 
+    # (node_id, buffer_offset, length) или (node_id, buffer_offset, length, node_offset)
+    RegionSpec = Union[tuple[int, int, int], tuple[int, int, int, int]]
 
-arch = {"posix": {"32bit": ("linux32", "libfbus.so"),
-                  "64bit": ("linux64", "libfbus.so")},
-        "nt":    {"32bit": ("win32", "fbuslibw.dll")},
-       }[os.name][architecture()[0]]
-_lib = _load_lib(*arch)
+FBUS_BACKEND_ENV = "FBUS_BACKEND"
+
+_service_lock = Lock()
+
+_T = TypeVar("_T", bound=Callable)
 
 
 class FBusError(Exception):
-    pass
+    result: FBUS_RESULT | None = None   # Код возврата функции FBUS API, вызвавшей ошибку
+
+
+def _raise_result(name: str, result: int) -> None:
+    msg = f"{name} error {result} ({FBUS_RESULT(result).name})"
+    error = FBusError(msg)
+    error.result = FBUS_RESULT(result)
+    raise error
+
+
+class Backend:
+    """Источник реализаций функций FBUS API.
+
+    Реализация по умолчанию собирает методы объекта, имена которых совпадают
+    с функциями из FBusDevice._functions_. Методы принимают те же аргументы,
+    что и функции libfbus, и возвращают код FBUS_RESULT.
+    """
+
+    def functions(self) -> dict[str, Callable[..., bool]]:
+        """Таблица функций, вызывающих FBusError при ненулевом коде возврата."""
+
+        return {name: self._checked(name, getattr(self, name))
+                for name in FBusDevice._functions_ if hasattr(self, name)}
+
+    @staticmethod
+    def _checked(name: str, func: Callable[..., int]) -> Callable[..., bool]:
+        def call(*arguments: object) -> bool:
+            if result := func(*arguments):
+                _raise_result(name, result)
+
+            return True
+
+        call.__name__ = name
+        return call
+
+
+class NativeBackend(Backend):
+    """Вызов функций библиотеки libfbus через ctypes."""
+
+    def __init__(self, path: str | None = None) -> None:
+        self.path = path
+
+    def functions(self) -> dict[str, Callable[..., bool]]:
+        return _bind_functions(_load_lib(self.path or _library_path()))
+
+
+def _library_path() -> str:
+    libs = {"posix": {"32bit": ("linux32", "libfbus.so"),
+                      "64bit": ("linux64", "libfbus.so")},
+            "nt":    {"32bit": ("win32", "fbuslibw.dll")},
+           }
+    bits = architecture()[0]
+
+    try:
+        arch, name = libs[os.name][bits]
+    except KeyError:
+        msg = f"libfbus is not available for {os.name} {bits}"
+        raise FBusError(msg) from None
+
+    return os.path.join(os.path.dirname(__file__), "libs", arch, name)
+
+
+@lru_cache(maxsize=None)
+def _load_lib(path: str) -> CDLL:
+    try:
+        return cdll.LoadLibrary(path)
+    except OSError as err:
+        msg = f"Cannot load {path}: {err}"
+        raise FBusError(msg) from err
+
+
+_backends: dict[str, str | Callable[[], Backend]] = {
+    "native": NativeBackend,
+    "sim": "fbus.simulator:shared_simulator",
+}
+
+
+def register_backend(name: str, factory: str | Callable[[], Backend]) -> None:
+    """Зарегистрировать бэкенд под именем.
+
+    Фабрика задается вызываемым объектом или строкой "модуль:имя", в этом
+    случае модуль импортируется только при первом выборе бэкенда.
+    """
+
+    _backends[name] = factory
+
+
+def get_backend(backend: str | Backend | None = None) -> Backend:
+    """Получить бэкенд по имени. Без имени используется значение переменной
+    окружения FBUS_BACKEND, а при ее отсутствии - бэкенд "native".
+    """
+
+    if isinstance(backend, Backend):
+        return backend
+
+    name = backend or os.environ.get(FBUS_BACKEND_ENV) or "native"
+    try:
+        factory = _backends[name]
+    except KeyError:
+        msg = f"Unknown backend {name!r}"
+        raise FBusError(msg) from None
+
+    if isinstance(factory, str):
+        module, _, attr = factory.partition(":")
+        factory = getattr(import_module(module), attr)
+
+    return factory()
 
 
 class FBusDevice(c_void_p):
@@ -63,8 +175,8 @@ class FBusDevice(c_void_p):
         "fbusReadInputs": CFUNCTYPE(c_uint, c_size_t, c_uint8, c_void_p, c_size_t, c_size_t),
         "fbusWriteOutputs": CFUNCTYPE(c_uint, c_size_t, c_uint8, c_void_p, c_size_t, c_size_t),
         "fbusProcessGroup": CFUNCTYPE(c_uint, c_size_t, c_uint8),
-        "fbusGroupSetNodeOutputs": CFUNCTYPE(c_uint, c_size_t, c_uint8, c_uint8, c_size_t, c_size_t, c_void_p),
-        "fbusGroupGetNodeInputs": CFUNCTYPE(c_uint, c_size_t, c_uint8, c_uint8, c_size_t, c_size_t, c_void_p),
+        "fbusGroup_setNodeOutputs": CFUNCTYPE(c_uint, c_size_t, c_uint8, c_uint8, c_size_t, c_size_t, c_void_p),
+        "fbusGroup_getNodeInputs": CFUNCTYPE(c_uint, c_size_t, c_uint8, c_uint8, c_size_t, c_size_t, c_void_p),
         "fbusModuleGetCalibrationData": CFUNCTYPE(c_uint, c_size_t, c_uint8, c_size_t, c_size_t, c_void_p),
         "fbusModuleSetCalibrationData": CFUNCTYPE(c_uint, c_size_t, c_uint8, c_size_t, c_size_t, c_void_p),
         "fbusModuleEnterCalibrationMode": CFUNCTYPE(c_uint, c_size_t, c_uint8),
@@ -74,26 +186,223 @@ class FBusDevice(c_void_p):
         "fbusGetAdapterInfo": CFUNCTYPE(c_uint, c_size_t, c_void_p, c_size_t),
     }
 
-    def __call__(self, prototype: _PyCFuncPtrType, *arguments: tuple[_CData, ...]) -> bool:
-        if result := prototype((self.name, _lib))(*arguments):
-            msg = f"{self.name} error {result} ({FBUS_RESULT(result).name})"
-            raise FBusError(msg)
+    # Индекс аргумента с номером модуля для функций, адресующих модуль
+    _node_arguments_ = {
+        "fbusGetNodeDescription": 1,
+        "fbusReset": 1,
+        "fbusGetNodeCommonParameters": 1,
+        "fbusSetNodeCommonParameters": 1,
+        "fbusGetNodeSpecificParameters": 1,
+        "fbusSetNodeSpecificParameters": 1,
+        "fbusAssignNodeToGroup": 1,
+        "fbusReadConfig": 1,
+        "fbusWriteConfig": 1,
+        "fbusSaveConfig": 1,
+        "fbusReadInputs": 1,
+        "fbusWriteOutputs": 1,
+        "fbusGroup_setNodeOutputs": 2,
+        "fbusGroup_getNodeInputs": 2,
+        "fbusModuleGetCalibrationData": 1,
+        "fbusModuleSetCalibrationData": 1,
+        "fbusModuleEnterCalibrationMode": 1,
+        "fbusModuleLeaveCalibrationMode": 1,
+        "fbusModuleSaveCalibrationData": 1,
+        "fbusModuleLoadCalibrationData": 1,
+    }
+
+    def __init__(self, backend: str | Backend | None = None) -> None:
+        super().__init__()
+        self._backend = get_backend(backend)
+        self._table: dict[str, Callable[..., bool]] | None = None
+
+    def _bind(self) -> dict[str, Callable[..., bool]]:
+        if self._table is None:
+            self._table = self._backend.functions()
+            self.__dict__.update(self._table)
+
+        return self._table
+
+    def __getattr__(self, name: str) -> Callable[..., bool]:
+        if name not in self._functions_:
+            msg = f"{name} is not a FBUS function"
+            raise AttributeError(msg)
+
+        if self._table is None and name in self._bind():
+            return self.__dict__[name]
+
+        msg = f"{name} is not available in the backend"
+        raise FBusError(msg)
+
+    def instrument(self, metrics: Metrics | None) -> None:
+        """Вызывать функции через обертки, записывающие статистику в metrics,
+        или, при None, напрямую.
+        """
+
+        table = self._bind()
+        self.__dict__.update(metrics.wrap(table) if metrics is not None else table)
+
+
+def _errcheck(result: int, func: CFuncPtr, arguments: tuple) -> bool:
+    if result:
+        _raise_result(func.__name__, result)
+
+    return True
+
+
+@lru_cache(maxsize=None)
+def _bind_functions(lib: CDLL) -> dict[str, CFuncPtr]:
+    """Однократное связывание функций библиотеки с их прототипами."""
+
+    table = {}
+    for name, prototype in FBusDevice._functions_.items():
+        if not hasattr(lib, name):
+            continue
+
+        func = prototype((name, lib))
+        func.__name__ = name
+        func.errcheck = _errcheck
+        table[name] = func
+
+    return table
+
+
+def _synchronized(method: _T) -> _T:
+    """Выполнение метода под блокировкой сетевого идентификатора клиента."""
+
+    @wraps(method)
+    def wrapper(self: FBUS, *args: object, **kwargs: object) -> object:
+        with self._lock:
+            return method(self, *args, **kwargs)
+
+    return wrapper    # type: ignore
+
+
+def _buffer_address(buffer: Buffer, offset: int, length: int | None) -> tuple[int, int]:
+    """Адрес и длина области изменяемого буфера начиная со смещения offset.
+
+    Буфером может быть объект ctypes (структура, массив) или любой непрерывный
+    изменяемый объект с поддержкой протокола буфера (bytearray, memoryview,
+    array). Неизменяемые буферы-источники предварительно передаются через
+    _source_buffer().
+    """
+
+    try:
+        address, size = addressof(buffer), sizeof(buffer)
+    except TypeError:
+        try:
+            size = memoryview(buffer).nbytes
+            address = addressof(c_char.from_buffer(buffer)) if size else 0
+        except (TypeError, ValueError) as err:
+            msg = f"Buffer {type(buffer).__name__} must be writable and contiguous: {err}"
+            raise FBusError(msg) from None
+
+    if length is None:
+        length = size - offset
+    if offset < 0 or length < 0 or offset + length > size:
+        msg = f"Region {offset}:{offset + length} is out of buffer size {size}"
+        raise FBusError(msg)
+
+    return address + offset, length
+
 
-        return True
+def _source_buffer(buffer: Buffer) -> Buffer:
+    """Буфер-источник данных, адрес которого можно передать в libfbus.
 
-    def __getattr__(self, name: str) -> Callable[..., bool]:    # type: ignore
-        self.name = name
-        return partial(self.__call__, self._functions_[name])
+    Изменяемые буферы возвращаются без изменений, неизменяемые (bytes,
+    memoryview только для чтения, Snapshot.data) копируются в массив ctypes.
+    Копия должна существовать до завершения вызова функции FBUS API.
+    """
+
+    try:
+        addressof(buffer)
+        return buffer
+    except TypeError:
+        pass
+
+    try:
+        view = memoryview(buffer)
+        if not view.readonly:
+            return buffer
+        return (c_char * view.nbytes).from_buffer_copy(view)
+    except (TypeError, ValueError) as err:
+        msg = f"Buffer {type(buffer).__name__} must be contiguous: {err}"
+        raise FBusError(msg) from None
+
+
+def _address(pointer: object) -> int:
+    """Адрес из аргумента-указателя функции FBUS API: числа, объекта ctypes
+    или byref().
+    """
+
+    if pointer is None or isinstance(pointer, int):
+        return pointer or 0
+    try:
+        return addressof(pointer)
+    except TypeError:
+        return cast(pointer, c_void_p).value or 0
+
+
+def _value(argument: object) -> int:
+    """Значение скалярного аргумента функции FBUS API: числа или объекта ctypes."""
+
+    return getattr(argument, "value", argument)
 
 
 class FBUS:
-    """Класс клиента для работы с приборами Fastwel по шине FBUS."""
+    """Класс клиента для работы с приборами Fastwel по шине FBUS.
 
-    def __init__(self) -> None:
-        """Инициализация класса клиента с указанными параметрами."""
+    Один объект клиента соответствует одной открытой сети. Вызовы, относящиеся
+    к сети, выполняются под собственной блокировкой объекта, поэтому клиент
+    можно использовать из нескольких потоков, а разные сети опрашиваются
+    параллельно (ctypes освобождает GIL на время вызова libfbus).
+    """
 
-        self._fbus = FBusDevice()
+    def __init__(self, backend: str | Backend | None = None) -> None:
+        """Инициализация класса клиента с указанными параметрами.
+
+        backend - имя зарегистрированного бэкенда или его экземпляр. Библиотека
+        загружается при первом вызове функции FBUS API.
+        """
+
+        self._fbus = FBusDevice(backend)
         self._hnet = c_size_t()
+        self._lock = RLock()
+        self._layouts: dict[int, DeviceLayouts] = {}
+        self._metrics: Metrics | None = None
+
+    @property
+    def lock(self) -> RLock:
+        """Блокировка сети для выполнения нескольких вызовов как одной операции."""
+
+        return self._lock
+
+    @property
+    def metrics(self) -> Metrics | None:
+        """Статистика вызовов функций FBUS API или None, если ее сбор выключен."""
+
+        return self._metrics
+
+    @_synchronized
+    def instrument(self, metrics: Metrics | None = None) -> Metrics:
+        """Включить сбор статистики вызовов функций FBUS API в metrics (по
+        умолчанию - в новый объект Metrics).
+        """
+
+        if metrics is None:
+            from fbus.metrics import Metrics
+
+            metrics = Metrics()
+
+        self._fbus.instrument(metrics)
+        self._metrics = metrics
+        return metrics
+
+    @_synchronized
+    def uninstrument(self) -> None:
+        """Выключить сбор статистики вызовов."""
+
+        self._fbus.instrument(None)
+        self._metrics = None
 
     def fbusGetVersion(self) -> str:
         """Функция возвращает номер версии ПО FBUS API."""
@@ -109,15 +418,18 @@ class FBUS:
     def fbusInitialize(self) -> bool:
         """Инициализировать внутренние структуры сервиса FBUS."""
 
-        return self._fbus.fbusInitialize()
+        with _service_lock:
+            return self._fbus.fbusInitialize()
 
     def fbusDeInitialize(self) -> bool:
         """Завершить работу с сервисом FBUS."""
 
-        return self._fbus.fbusDeInitialize()
+        with _service_lock:
+            return self._fbus.fbusDeInitialize()
 
 # Функции управления сетью
 
+    @_synchronized
     def fbusOpen(self, adapter: FBUS_ADAPTER, port: int) -> bool:
         """Открыть сеть и получить ее системный идентификатор."""
 
@@ -129,13 +441,17 @@ class FBUS:
                       FBUS_ADAPTER.TCP: port,
                      }[adapter]
 
-        return self._fbus.fbusOpen(c_size_t(net_number), byref(self._hnet))
+        self._layouts.clear()
+        return self._fbus.fbusOpen(net_number, byref(self._hnet))
 
+    @_synchronized
     def fbusClose(self) -> bool:
         """Закрыть открытую сеть."""
 
+        self._layouts.clear()
         return self._fbus.fbusClose(self._hnet)
 
+    @_synchronized
     def fbusRescan(self) -> int:
         """Сканирование сети, назначение обнаруженным модулям идентификаторов и
         считывание текущей конфигурации из модулей.
@@ -143,9 +459,11 @@ class FBUS:
 
         nodes = c_size_t()
 
+        self._layouts.clear()
         self._fbus.fbusRescan(self._hnet, byref(nodes))
         return nodes.value
 
+    @_synchronized
     def fbusGetNodesCount(self) -> int:
         """Получить количество узлов в сети."""
 
@@ -154,27 +472,38 @@ class FBUS:
         self._fbus.fbusGetNodesCount(self._hnet, byref(nodes))
         return nodes.value
 
+    @_synchronized
     def fbusGetNodeDescription(self, net_id: int) -> FIO_MODULE_DESC:
         """Получить описание модуля."""
 
         descr = FIO_MODULE_DESC()
 
-        self._fbus.fbusGetNodeDescription(self._hnet, c_uint8(net_id), byref(descr),
+        self._fbus.fbusGetNodeDescription(self._hnet, net_id, byref(descr),
                                           sizeof(descr))
         return descr
 
+    @_synchronized
+    def fbusGetNodeDescriptionInto(self, net_id: int, dest: FIO_MODULE_DESC) -> FIO_MODULE_DESC:
+        """Получить описание модуля в существующую структуру dest."""
+
+        self._fbus.fbusGetNodeDescription(self._hnet, net_id, dest, sizeof(dest))
+        return dest
+
+    @_synchronized
     def fbusReset(self, net_id: int) -> bool:
         """Сброс одного или всех модулей сети."""
 
-        return self._fbus.fbusReset(self._hnet, c_uint8(net_id))
+        return self._fbus.fbusReset(self._hnet, net_id)
 
+    @_synchronized
     def fbusSendSync(self, sync_id: int) -> bool:
         """Послать синхронизирующий пакет."""
 
-        return self._fbus.fbusSendSync(self._hnet, c_uint8(sync_id))
+        return self._fbus.fbusSendSync(self._hnet, sync_id)
 
 # Функции конфигурирования
 
+    @_synchronized
     def fbusGetNodeCommonParameters(self, net_id: int) -> FIO_MODULE_COMMON_CONF:
         """Получить значения общих изменяемых параметров модуля из конфигурации
         сети.
@@ -182,19 +511,31 @@ class FBUS:
 
         conf = FIO_MODULE_COMMON_CONF()
 
-        self._fbus.fbusGetNodeCommonParameters(self._hnet, c_uint8(net_id),
+        self._fbus.fbusGetNodeCommonParameters(self._hnet, net_id,
                                                byref(conf), sizeof(conf))
         return conf
 
+    @_synchronized
+    def fbusGetNodeCommonParametersInto(self, net_id: int,
+                                              dest: FIO_MODULE_COMMON_CONF) -> FIO_MODULE_COMMON_CONF:
+        """Получить значения общих изменяемых параметров модуля в существующую
+        структуру dest.
+        """
+
+        self._fbus.fbusGetNodeCommonParameters(self._hnet, net_id, dest, sizeof(dest))
+        return dest
+
+    @_synchronized
     def fbusSetNodeCommonParameters(self, net_id: int,
                                           src: FIO_MODULE_COMMON_CONF) -> bool:
         """Установить значения общих изменяемых параметров модуля в конфигурации
         сети.
         """
 
-        return self._fbus.fbusSetNodeCommonParameters(self._hnet, c_uint8(net_id),
+        return self._fbus.fbusSetNodeCommonParameters(self._hnet, net_id,
                                                       byref(src), sizeof(src))
 
+    @_synchronized
     def fbusGetNodeSpecificParameters(self, net_id: int,
                                             dest: type[Structure]) -> Structure:
         """Получить значения специфических изменяемых параметров модуля из
@@ -202,37 +543,41 @@ class FBUS:
         """
 
         config = dest()
-        self._fbus.fbusGetNodeSpecificParameters(self._hnet, c_uint8(net_id),
+        self._fbus.fbusGetNodeSpecificParameters(self._hnet, net_id,
                                                  byref(config), 0, sizeof(config))
         return config
 
+    @_synchronized
     def fbusSetNodeSpecificParameters(self, net_id: int, src: Structure) -> bool:
         """Установить значения специфических изменяемых параметров модуля в
         конфигурации сети.
         """
 
-        return self._fbus.fbusSetNodeSpecificParameters(self._hnet, c_uint8(net_id),
+        return self._fbus.fbusSetNodeSpecificParameters(self._hnet, net_id,
                                                         byref(src), 0, sizeof(src))
 
+    @_synchronized
     def fbusDeleteGroup(self, group_id: int) -> bool:
         """Удалить группу из конфигурации сети."""
 
-        return self._fbus.fbusDeleteGroup(self._hnet, c_uint8(group_id))
+        return self._fbus.fbusDeleteGroup(self._hnet, group_id)
 
+    @_synchronized
     def fbusDeleteAllGroups(self) -> bool:
         """Удалить все группы из конфигурации сети."""
 
         return self._fbus.fbusDeleteAllGroups(self._hnet)
 
+    @_synchronized
     def fbusAssignNodeToGroup(self, node_id: int, group_id: int,
                                     input_offset: int, input_length: int,
                                     output_offset: int, output_length: int) -> bool:
         """Присоединить модуль к группе в конфигурации сети."""
 
-        return self._fbus.fbusAssignNodeToGroup(self._hnet, c_uint8(node_id),
-                    c_uint8(group_id), c_size_t(input_offset), c_size_t(input_length),
-                    c_size_t(output_offset), c_size_t(output_length))
+        return self._fbus.fbusAssignNodeToGroup(self._hnet, node_id, group_id,
+                    input_offset, input_length, output_offset, output_length)
 
+    @_synchronized
     def fbusBuildGroups(self) -> bool:
         """Инициализировать параметры группового обмена всех модулей в
         конфигурации сети.
@@ -240,104 +585,285 @@ class FBUS:
 
         return self._fbus.fbusBuildGroups(self._hnet)
 
+    @_synchronized
     def fbusReadConfig(self, net_id: int) -> bool:
         """Прочитать значения конфигурационных параметров из модуля (модулей) в
         конфигурацию сети.
         """
 
-        return self._fbus.fbusReadConfig(self._hnet, c_uint8(net_id))
+        return self._fbus.fbusReadConfig(self._hnet, net_id)
 
+    @_synchronized
     def fbusWriteConfig(self, net_id: int) -> bool:
         """Записать значения конфигурационных параметров из конфигурации сети в
         модуль (модули).
         """
 
-        return self._fbus.fbusWriteConfig(self._hnet, c_uint8(net_id))
+        return self._fbus.fbusWriteConfig(self._hnet, net_id)
 
+    @_synchronized
     def fbusSaveConfig(self, net_id: int) -> bool:
         """Сохранить конфигурацию в энергонезависимой памяти модуля (модулей)."""
 
-        return self._fbus.fbusSaveConfig(self._hnet, c_uint8(net_id))
+        return self._fbus.fbusSaveConfig(self._hnet, net_id)
 
 # Функции индивидуальных запросов
 
+    @_synchronized
     def fbusReadInputs(self, net_id: int, dest: type[Structure]) -> Structure:
         """Чтение области входных данных из модуля."""
 
         inputs = dest()
-        self._fbus.fbusReadInputs(self._hnet, c_uint8(net_id), byref(inputs),
+        self._fbus.fbusReadInputs(self._hnet, net_id, byref(inputs),
                                   0, sizeof(inputs))
         return inputs
 
+    @_synchronized
+    def fbusReadInputsInto(self, net_id: int, dest: Buffer, buffer_offset: int = 0,
+                                 length: int | None = None, node_offset: int = 0) -> int:
+        """Чтение области входных данных модуля в буфер dest без создания
+        промежуточных объектов. Возвращает число прочитанных байт.
+
+        length байт (по умолчанию до конца буфера) со смещения node_offset в
+        области данных модуля записываются в dest со смещения buffer_offset.
+        Буфер dest должен быть изменяемым (bytearray, объект ctypes и т.п.).
+        """
+
+        address, length = _buffer_address(dest, buffer_offset, length)
+        self._fbus.fbusReadInputs(self._hnet, net_id, address, node_offset, length)
+        return length
+
+    @_synchronized
     def fbusWriteOutputs(self, net_id: int, src: Structure) -> bool:
         """Запись в область выходных данных модуля."""
 
-        return self._fbus.fbusWriteOutputs(self._hnet, c_uint8(net_id), byref(src),
+        return self._fbus.fbusWriteOutputs(self._hnet, net_id, byref(src),
                                            0, sizeof(src))
 
+    @_synchronized
+    def fbusWriteOutputsFrom(self, net_id: int, src: Buffer, buffer_offset: int = 0,
+                                   length: int | None = None, node_offset: int = 0) -> int:
+        """Запись в область выходных данных модуля из буфера src. Возвращает
+        число записанных байт.
+
+        length байт (по умолчанию до конца буфера) со смещения buffer_offset в
+        src записываются в область данных модуля со смещения node_offset.
+        Буфер src может быть неизменяемым (bytes, memoryview только для
+        чтения), в этом случае данные копируются.
+        """
+
+        src = _source_buffer(src)
+        address, length = _buffer_address(src, buffer_offset, length)
+        self._fbus.fbusWriteOutputs(self._hnet, net_id, address, node_offset, length)
+        return length
+
+    @_synchronized
+    def fbusGetNodeLayouts(self, net_id: int) -> DeviceLayouts:
+        """Структуры модуля из fbus.device по типу из его описания с проверкой
+        размеров областей данных. Результат сохраняется до повторного
+        сканирования сети.
+        """
+
+        layouts = self._layouts.get(net_id)
+        if layouts is None:
+            from fbus.registry import layouts_for
+
+            layouts = layouts_for(self.fbusGetNodeDescription(net_id))
+            self._layouts[net_id] = layouts
+
+        return layouts
+
+    @_synchronized
+    def fbusReadNodeInputs(self, net_id: int) -> Structure:
+        """Чтение области входных данных модуля в структуру, определяемую по
+        типу модуля.
+        """
+
+        inputs = self.fbusGetNodeLayouts(net_id).inputs
+        if inputs is None:
+            msg = f"Node {net_id} has no inputs layout"
+            raise FBusError(msg)
+
+        return self.fbusReadInputs(net_id, inputs)
+
 # Функции группового обмена
 
+    @_synchronized
     def fbusProcessGroup(self, group_id: int) -> bool:
         """Выполнить групповой обмен с модулями."""
 
-        return self._fbus.fbusProcessGroup(self._hnet, c_uint8(group_id))
+        return self._fbus.fbusProcessGroup(self._hnet, group_id)
 
-    def fbusGroupSetNodeOutputs(self, group_id: int, node_id: int,
-                                      src: Structure) -> bool:
-        """Записать данные выходов модуля в выходной буфер группы."""
+    @_synchronized
+    def fbusGroupSetNodeOutputs(self, group_id: int, node_id: int, src: Structure,
+                                      node_offset: int = 0, length: int | None = None) -> bool:
+        """Записать данные выходов модуля в выходной буфер группы.
 
-        return self._fbus.fbusGroup_setNodeOutputs(self._hnet, c_uint8(group_id),
-                                    c_uint8(node_id), 0, sizeof(src), byref(src))
+        node_offset и length задают часть области выходных данных модуля (и
+        структуры src, повторяющей эту область), по умолчанию записывается
+        вся структура.
+        """
 
-    def fbusGroupGetNodeInputs(self, group_id: int, node_id: int,
-                                     dest: type[Structure]) -> Structure:
-        """Прочитать данные входов модуля из входного буфера группы."""
+        _, length = _buffer_address(src, node_offset, length)
+        return self._fbus.fbusGroup_setNodeOutputs(self._hnet, group_id, node_id, node_offset,
+                                                   length, byref(src, node_offset))
+
+    @_synchronized
+    def fbusGroupGetNodeInputs(self, group_id: int, node_id: int, dest: type[Structure],
+                                     node_offset: int = 0, length: int | None = None) -> Structure:
+        """Прочитать данные входов модуля из входного буфера группы.
+
+        node_offset и length задают часть области входных данных модуля (и
+        структуры dest, повторяющей эту область), по умолчанию читается вся
+        структура.
+        """
 
         inputs = dest()
-        self._fbus.fbusGroup_getNodeInputs(self._hnet, c_uint8(group_id),
-                                c_uint8(node_id), 0, sizeof(inputs), byref(inputs))
+        _, length = _buffer_address(inputs, node_offset, length)
+        self._fbus.fbusGroup_getNodeInputs(self._hnet, group_id, node_id, node_offset,
+                                           length, byref(inputs, node_offset))
         return inputs
 
+    @_synchronized
+    def fbusGroupSetNodeOutputsFrom(self, group_id: int, node_id: int, src: Buffer,
+                                          buffer_offset: int = 0, length: int | None = None,
+                                          node_offset: int = 0) -> int:
+        """Записать данные выходов модуля в выходной буфер группы из буфера src.
+        Возвращает число записанных байт.
+
+        length байт (по умолчанию до конца буфера) со смещения buffer_offset в
+        src записываются со смещения node_offset в области данных модуля.
+        Буфер src может быть неизменяемым, в этом случае данные копируются.
+        """
+
+        src = _source_buffer(src)
+        address, length = _buffer_address(src, buffer_offset, length)
+        self._fbus.fbusGroup_setNodeOutputs(self._hnet, group_id, node_id,
+                                            node_offset, length, address)
+        return length
+
+    @_synchronized
+    def fbusGroupGetNodeInputsInto(self, group_id: int, node_id: int, dest: Buffer,
+                                         buffer_offset: int = 0, length: int | None = None,
+                                         node_offset: int = 0) -> int:
+        """Прочитать данные входов модуля из входного буфера группы в буфер dest.
+        Возвращает число прочитанных байт.
+
+        length байт (по умолчанию до конца буфера) со смещения node_offset в
+        области данных модуля записываются в dest со смещения buffer_offset.
+        Буфер dest должен быть изменяемым.
+        """
+
+        address, length = _buffer_address(dest, buffer_offset, length)
+        self._fbus.fbusGroup_getNodeInputs(self._hnet, group_id, node_id,
+                                           node_offset, length, address)
+        return length
+
+    @_synchronized
+    def fbusGroupScatterOutputs(self, group_id: int, nodes: Sequence[RegionSpec],
+                                      src: Buffer) -> int:
+        """Записать в выходной буфер группы данные выходов нескольких модулей
+        из одного буфера src.
+
+        nodes - последовательность (node_id, buffer_offset, length) или
+        (node_id, buffer_offset, length, node_offset), смещения имеют тот же
+        смысл, что и в fbusGroupSetNodeOutputsFrom. Возвращает число
+        записанных байт. Буфер src может быть неизменяемым, в этом случае
+        данные копируются.
+        """
+
+        src = _source_buffer(src)
+        base, size = _buffer_address(src, 0, None)
+        set_outputs = self._fbus.fbusGroup_setNodeOutputs
+        hnet = self._hnet
+        total = 0
+
+        for region in nodes:
+            node_id, buffer_offset, length = region[:3]
+            if buffer_offset < 0 or buffer_offset + length > size:
+                msg = (f"Region {buffer_offset}:{buffer_offset + length} "
+                       f"is out of buffer size {size}")
+                raise FBusError(msg)
+            set_outputs(hnet, group_id, node_id, region[3] if len(region) > 3 else 0,
+                        length, base + buffer_offset)
+            total += length
+
+        return total
+
+    @_synchronized
+    def fbusGroupGatherInputs(self, group_id: int, nodes: Sequence[RegionSpec],
+                                    dest: Buffer) -> int:
+        """Прочитать из входного буфера группы данные входов нескольких модулей
+        в один буфер dest.
+
+        nodes - последовательность (node_id, buffer_offset, length) или
+        (node_id, buffer_offset, length, node_offset), смещения имеют тот же
+        смысл, что и в fbusGroupGetNodeInputsInto. Возвращает число
+        прочитанных байт.
+        """
+
+        base, size = _buffer_address(dest, 0, None)
+        get_inputs = self._fbus.fbusGroup_getNodeInputs
+        hnet = self._hnet
+        total = 0
+
+        for region in nodes:
+            node_id, buffer_offset, length = region[:3]
+            if buffer_offset < 0 or buffer_offset + length > size:
+                msg = (f"Region {buffer_offset}:{buffer_offset + length} "
+                       f"is out of buffer size {size}")
+                raise FBusError(msg)
+            get_inputs(hnet, group_id, node_id, region[3] if len(region) > 3 else 0,
+                       length, base + buffer_offset)
+            total += length
+
+        return total
+
 # Функции калибровки
 
+    @_synchronized
     def fbusModuleGetCalibrationData(self, net_id: int, offset: int,
                                            length: int, dest: Structure) -> bool:
         """."""
 
-        return self._fbus.fbusModuleGetCalibrationData(self._hnet, c_uint8(net_id),
-                                    c_size_t(offset), c_size_t(length), byref(dest))
+        return self._fbus.fbusModuleGetCalibrationData(self._hnet, net_id, offset,
+                                                       length, byref(dest))
 
+    @_synchronized
     def fbusModuleSetCalibrationData(self, net_id: int, offset: int,
                                            length: int, src: Structure) -> bool:
         """."""
 
-        return self._fbus.fbusModuleSetCalibrationData(self._hnet, c_uint8(net_id),
-                                    c_size_t(offset), c_size_t(length), byref(src))
+        return self._fbus.fbusModuleSetCalibrationData(self._hnet, net_id, offset,
+                                                       length, byref(src))
 
+    @_synchronized
     def fbusModuleEnterCalibrationMode(self, net_id: int) -> bool:
         """."""
 
-        return self._fbus.fbusModuleEnterCalibrationMode(self._hnet, c_uint8(net_id))
+        return self._fbus.fbusModuleEnterCalibrationMode(self._hnet, net_id)
 
+    @_synchronized
     def fbusModuleLeaveCalibrationMode(self, net_id: int) -> bool:
         """."""
 
-        return self._fbus.fbusModuleLeaveCalibrationMode(self._hnet, c_uint8(net_id))
+        return self._fbus.fbusModuleLeaveCalibrationMode(self._hnet, net_id)
 
+    @_synchronized
     def fbusModuleSaveCalibrationData(self, net_id: int, section_code: int) -> bool:
         """."""
 
-        return self._fbus.fbusModuleSaveCalibrationData(self._hnet, c_uint8(net_id),
-                                                        c_uint32(section_code))
+        return self._fbus.fbusModuleSaveCalibrationData(self._hnet, net_id, section_code)
 
+    @_synchronized
     def fbusModuleLoadCalibrationData(self, net_id: int, section_code: int) -> bool:
         """."""
 
-        return self._fbus.fbusModuleLoadCalibrationData(self._hnet, c_uint8(net_id),
-                                                        c_uint32(section_code))
+        return self._fbus.fbusModuleLoadCalibrationData(self._hnet, net_id, section_code)
 
 # Функции -------
 
+    @_synchronized
     def fbusGetAdapterInfo(self) -> FBUS_ADAPTER_INFO:
         """Информация об удаленном адаптере."""
 
@@ -347,4 +873,4 @@ class FBUS:
         return dest
 
 
-__all__ = ["FBUS"]
+__all__ = ["FBUS", "Backend", "NativeBackend", "get_backend", "register_backend"]
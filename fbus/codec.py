@@ -0,0 +1,135 @@
+#! /usr/bin/env python3
+
+"""Кодеки struct.Struct для структур модулей Fastwel.
+Fastwel FBUS SDK Версия 2.4.
+"""
+
+from __future__ import annotations
+
+from ctypes import Array, Structure, c_byte, c_char, c_ubyte, sizeof
+from functools import lru_cache
+from struct import Struct
+from typing import TYPE_CHECKING, Any, Iterator
+
+from fbus.client import FBusError
+
+if TYPE_CHECKING:
+    from fbus.client import Buffer
+
+_BYTES = (c_char, c_ubyte, c_byte)
+
+
+def _simple_code(ctype: type) -> str:
+    code = getattr(ctype, "_type_", None)
+    if not isinstance(code, str):
+        msg = f"Unsupported field type {ctype.__name__}"
+        raise FBusError(msg)
+    if code in "lLnN":  # Размер long и size_t зависит от платформы
+        code = {4: "i", 8: "q"}[sizeof(ctype)]
+        return code.upper() if ctype._type_ in "LN" else code
+    if code == "z":
+        msg = f"Unsupported field type {ctype.__name__}"
+        raise FBusError(msg)
+
+    return code
+
+
+def _compile(layout: type[Structure], prefix: str, base: int,
+                   names: list[str], parts: list[str], position: int) -> int:
+    for name, ctype, *_ in layout._fields_:
+        offset = base + getattr(layout, name).offset
+        if offset > position:
+            parts.append(f"{offset - position}x")
+        position = offset
+
+        if issubclass(ctype, Structure):
+            position = _compile(ctype, f"{prefix}{name}.", offset, names, parts, position)
+        elif issubclass(ctype, Array) and ctype._type_ in _BYTES:
+            parts.append(f"{ctype._length_}s")
+            names.append(f"{prefix}{name}")
+            position += sizeof(ctype)
+        elif issubclass(ctype, Array):
+            element = ctype._type_
+            if issubclass(element, Structure):
+                for index in range(ctype._length_):
+                    position = _compile(element, f"{prefix}{name}[{index}].",
+                                        offset + index * sizeof(element),
+                                        names, parts, position)
+            elif issubclass(element, Array):
+                msg = f"Nested arrays are not supported ({layout.__name__}.{name})"
+                raise FBusError(msg)
+            else:
+                parts.append(f"{ctype._length_}{_simple_code(element)}")
+                names.extend(f"{prefix}{name}[{index}]" for index in range(ctype._length_))
+                position += sizeof(ctype)
+        else:
+            parts.append(_simple_code(ctype))
+            names.append(f"{prefix}{name}")
+            position += sizeof(ctype)
+
+    end = base + sizeof(layout)
+    if end > position:
+        parts.append(f"{end - position}x")
+
+    return end
+
+
+class Codec:
+    """Кодек структуры ctypes на основе struct.Struct.
+
+    Формат строится по смещениям полей структуры (с учетом _pack_) в порядке
+    байтов little-endian. Вложенные структуры разворачиваются, поля получают
+    имена вида "Inputs.channel0", элементы массивов - "values[0]". Массивы
+    байтов (c_uint8, c_char) передаются одним значением bytes.
+    """
+
+    def __init__(self, layout: type[Structure]) -> None:
+        names: list[str] = []
+        parts: list[str] = ["<"]
+        _compile(layout, "", 0, names, parts, 0)
+
+        self.layout = layout
+        self.names = tuple(names)
+        self.format = "".join(parts)
+        self.struct = Struct(self.format)
+        self.size = self.struct.size
+        self.index = {name: position for position, name in enumerate(names)}
+
+        if self.size != sizeof(layout):
+            msg = f"Codec size {self.size} does not match {layout.__name__} size {sizeof(layout)}"
+            raise FBusError(msg)
+
+    def unpack(self, buffer: Buffer | bytes, offset: int = 0) -> tuple[Any, ...]:
+        """Значения полей одной записи, начиная со смещения offset."""
+
+        return self.struct.unpack_from(buffer, offset)
+
+    def iter_unpack(self, buffer: Buffer | bytes) -> Iterator[tuple[Any, ...]]:
+        """Значения полей всех записей буфера, размер которого кратен size."""
+
+        return self.struct.iter_unpack(buffer)
+
+    def unpack_dict(self, buffer: Buffer | bytes, offset: int = 0) -> dict[str, Any]:
+        """Значения полей одной записи по именам."""
+
+        return dict(zip(self.names, self.struct.unpack_from(buffer, offset)))
+
+    def pack(self, *values: Any) -> bytes:
+        """Упаковать значения всех полей в новую запись."""
+
+        return self.struct.pack(*values)
+
+    def pack_into(self, buffer: Buffer, offset: int, *values: Any) -> None:
+        """Упаковать значения всех полей в буфер (например, выходной образ)."""
+
+        self.struct.pack_into(buffer, offset, *values)
+
+
+@lru_cache(maxsize=None)
+def codec_of(layout: type[Structure]) -> Codec:
+    """Кодек структуры (создается один раз для каждой структуры)."""
+
+    return Codec(layout)
+
+
+__all__ = ["Codec", "codec_of"]
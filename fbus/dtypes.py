@@ -0,0 +1,72 @@
+#! /usr/bin/env python3
+
+"""Структурированные типы NumPy для структур ctypes модулей Fastwel.
+Fastwel FBUS SDK Версия 2.4.
+
+Требуется пакет numpy.
+"""
+
+from __future__ import annotations
+
+from ctypes import Array, Structure, c_char, sizeof
+from functools import lru_cache
+from typing import TYPE_CHECKING
+
+import numpy as np
+
+if TYPE_CHECKING:
+    from fbus.client import Buffer
+
+
+def _field_dtype(ctype: type) -> np.dtype | tuple:
+    if issubclass(ctype, Array):
+        if ctype._type_ is c_char:
+            return np.dtype(f"S{ctype._length_}")
+        return (_field_dtype(ctype._type_), (ctype._length_,))
+    if issubclass(ctype, Structure):
+        return dtype_of(ctype)
+
+    return np.dtype(ctype)
+
+
+@lru_cache(maxsize=None)
+def dtype_of(layout: type[Structure]) -> np.dtype:
+    """Структурированный тип NumPy с теми же смещениями полей и размером,
+    что и у структуры ctypes (с учетом _pack_). Вложенные структуры
+    становятся вложенными типами, массивы - подмассивами, массивы c_char -
+    байтовыми строками.
+    """
+
+    names, formats, offsets = [], [], []
+    for name, ctype, *_ in layout._fields_:
+        names.append(name)
+        formats.append(_field_dtype(ctype))
+        offsets.append(getattr(layout, name).offset)
+
+    return np.dtype({"names": names, "formats": formats, "offsets": offsets,
+                     "itemsize": sizeof(layout)})
+
+
+def frombuffer(layout: type[Structure], buffer: Buffer | bytes, offset: int = 0,
+                     count: int = -1) -> np.ndarray:
+    """Массив записей layout поверх буфера без копирования данных.
+
+    При count=-1 используются все целые записи от offset до конца буфера.
+    """
+
+    return np.frombuffer(buffer, dtype_of(layout), count, offset)
+
+
+def to_array(records: list[Structure]) -> np.ndarray:
+    """Копия последовательности структур одного типа в массив NumPy."""
+
+    layout = type(records[0])
+    array = np.empty(len(records), dtype_of(layout))
+    raw = array.view(np.uint8).reshape(len(records), -1)
+    for index, record in enumerate(records):
+        raw[index] = memoryview(record).cast("B")
+
+    return array
+
+
+__all__ = ["dtype_of", "frombuffer", "to_array"]
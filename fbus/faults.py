@@ -0,0 +1,242 @@
+#! /usr/bin/env python3
+
+"""Внесение ошибок и задержек в вызовы FBUS API.
+Fastwel FBUS SDK Версия 2.4.
+
+FaultInjector оборачивает любой бэкенд и по заданным правилам возвращает
+вместо вызова функции код ошибки FBUS_RESULT, добавляет задержку вызова
+или имитирует пакет отказов (серию подряд неуспешных вызовов). Правила
+ограничиваются набором функций и номеров модулей. Ошибка модуля также
+применяется к fbusProcessGroup для групп той же сети, в которые он
+назначен.
+Случайные величины берутся из генератора с заданным начальным значением,
+поэтому при одинаковой последовательности вызовов результат повторяется.
+"""
+
+from __future__ import annotations
+
+import math
+from collections import Counter
+from random import Random
+from time import sleep
+from typing import Callable, Iterable, NamedTuple
+
+from fbus.client import Backend, FBusDevice, _raise_result, _value, get_backend
+from fbus.protocol import FBUS_RESULT
+
+Distribution = Callable[[Random], float]
+
+
+def fixed(delay: float) -> Distribution:
+    """Постоянная задержка delay, с."""
+
+    return lambda random: delay
+
+
+def uniform(low: float, high: float) -> Distribution:
+    """Задержка, равномерно распределенная от low до high, с."""
+
+    return lambda random: random.uniform(low, high)
+
+
+def normal(mean: float, sigma: float) -> Distribution:
+    """Нормально распределенная задержка (отрицательные значения - 0), с."""
+
+    return lambda random: max(random.gauss(mean, sigma), 0.0)
+
+
+def lognormal(median: float, sigma: float) -> Distribution:
+    """Логнормальная задержка с медианой median, с. Длинный правый хвост
+    характерен для джиттера TCP адаптера.
+    """
+
+    mu = math.log(median)
+    return lambda random: random.lognormvariate(mu, sigma)
+
+
+def exponential(mean: float) -> Distribution:
+    """Экспоненциально распределенная задержка со средним mean, с."""
+
+    return lambda random: random.expovariate(1 / mean)
+
+
+class Fault(NamedTuple):
+    """Случайная ошибка вызова."""
+
+    result: FBUS_RESULT                 # Возвращаемый код ошибки
+    probability: float                  # Вероятность ошибки для каждого вызова
+    functions: Iterable[str] | None = None     # Функции (None - все)
+    nodes: Iterable[int] | None = None         # Номера модулей (None - все)
+
+
+class Latency(NamedTuple):
+    """Задержка вызова."""
+
+    distribution: Distribution          # Распределение задержки
+    functions: Iterable[str] | None = None
+    nodes: Iterable[int] | None = None
+
+
+class Outage(NamedTuple):
+    """Пакет отказов: после начала length подряд идущих вызовов завершаются
+    ошибкой result.
+    """
+
+    result: FBUS_RESULT                 # Возвращаемый код ошибки
+    probability: float                  # Вероятность начала пакета для каждого вызова
+    length: int                         # Число неуспешных вызовов в пакете
+    functions: Iterable[str] | None = None
+    nodes: Iterable[int] | None = None
+
+
+class _Rule:
+    """Правило с подготовленными фильтрами и состоянием пакета отказов."""
+
+    __slots__ = ("functions", "nodes", "remaining", "rule")
+
+    def __init__(self, rule: Fault | Latency | Outage) -> None:
+        self.rule = rule
+        self.functions = frozenset(rule.functions) if rule.functions is not None else None
+        self.nodes = frozenset(rule.nodes) if rule.nodes is not None else None
+        self.remaining = 0
+
+    def applies(self, name: str) -> bool:
+        return self.functions is None or name in self.functions
+
+    def matches(self, nodes: frozenset[int] | None) -> bool:
+        if self.nodes is None:
+            return True
+        return nodes is not None and not self.nodes.isdisjoint(nodes)
+
+
+class FaultInjector(Backend):
+    """Бэкенд, вносящий ошибки и задержки в вызовы другого бэкенда.
+
+    Порядок обработки вызова: активный пакет отказов, начало нового пакета,
+    случайная ошибка, затем задержка (она добавляется и к неуспешным
+    вызовам). При ошибке функция бэкенда не вызывается.
+    """
+
+    def __init__(self, backend: str | Backend | None = None,
+                       faults: Iterable[Fault] = (),
+                       latencies: Iterable[Latency] = (),
+                       outages: Iterable[Outage] = (),
+                       seed: int | None = 0,
+                       delay: Callable[[float], None] = sleep) -> None:
+        self.backend = get_backend(backend)
+        self.faults = [_Rule(fault) for fault in faults]
+        self.latencies = [_Rule(latency) for latency in latencies]
+        self.outages = [_Rule(outage) for outage in outages]
+        self.delay = delay
+        self.enabled = True         # Вносить ошибки и задержки
+        self.random = Random(seed)
+        self.injected: Counter[tuple[str, FBUS_RESULT]] = Counter()  # Внесенные ошибки по функциям
+        self.delayed = 0.0          # Суммарная внесенная задержка, с
+        self._groups: dict[tuple[int, int], set[int]] = {}    # (hnet, group_id) -> модули
+
+    def reset(self, seed: int | None = 0) -> None:
+        """Сбросить генератор, пакеты отказов и счетчики."""
+
+        self.random.seed(seed)
+        for rule in self.outages:
+            rule.remaining = 0
+        self.injected.clear()
+        self.delayed = 0.0
+
+    def functions(self) -> dict[str, Callable[..., bool]]:
+        return {name: self._wrap(name, func) for name, func in self.backend.functions().items()}
+
+    def _nodes(self, name: str, arguments: tuple) -> frozenset[int] | None:
+        if name == "fbusProcessGroup":
+            return frozenset(self._groups.get((_value(arguments[0]), _value(arguments[1])), ()))
+
+        index = FBusDevice._node_arguments_.get(name)
+        return frozenset((_value(arguments[index]),)) if index is not None else None
+
+    def _wrap(self, name: str, func: Callable[..., bool]) -> Callable[..., bool]:
+        faults = [rule for rule in self.faults if rule.applies(name)]
+        latencies = [rule for rule in self.latencies if rule.applies(name)]
+        outages = [rule for rule in self.outages if rule.applies(name)]
+
+        if name == "fbusAssignNodeToGroup":
+            func = self._tracking(func)
+        elif name == "fbusDeleteGroup":
+            func = self._deleting(func)
+        elif name in ("fbusDeleteAllGroups", "fbusClose", "fbusRescan"):
+            func = self._clearing(func)
+
+        if not (faults or latencies or outages):
+            return func
+
+        random = self.random
+
+        def call(*arguments: object) -> bool:
+            if not self.enabled:
+                return func(*arguments)
+
+            nodes = self._nodes(name, arguments)
+            result = FBUS_RESULT.OK
+
+            for rule in outages:
+                if not rule.matches(nodes):
+                    continue
+                if not rule.remaining and random.random() < rule.rule.probability:
+                    rule.remaining = rule.rule.length
+                if rule.remaining:
+                    rule.remaining -= 1
+                    result = result or rule.rule.result
+
+            for rule in faults:
+                if rule.matches(nodes) and random.random() < rule.rule.probability:
+                    result = result or rule.rule.result
+
+            for rule in latencies:
+                if rule.matches(nodes):
+                    wait = rule.rule.distribution(random)
+                    self.delayed += wait
+                    self.delay(wait)
+
+            if result:
+                self.injected[name, result] += 1
+                _raise_result(name, result)
+            return func(*arguments)
+
+        call.__name__ = name
+        return call
+
+    def _tracking(self, func: Callable[..., bool]) -> Callable[..., bool]:
+        def call(*arguments: object) -> bool:
+            result = func(*arguments)
+            hnet, net_id, group_id = (_value(argument) for argument in arguments[:3])
+            for (owner, _), members in self._groups.items():
+                if owner == hnet:
+                    members.discard(net_id)
+            self._groups.setdefault((hnet, group_id), set()).add(net_id)
+            return result
+
+        call.__name__ = func.__name__
+        return call
+
+    def _deleting(self, func: Callable[..., bool]) -> Callable[..., bool]:
+        def call(*arguments: object) -> bool:
+            result = func(*arguments)
+            self._groups.pop((_value(arguments[0]), _value(arguments[1])), None)
+            return result
+
+        call.__name__ = func.__name__
+        return call
+
+    def _clearing(self, func: Callable[..., bool]) -> Callable[..., bool]:
+        def call(*arguments: object) -> bool:
+            result = func(*arguments)
+            hnet = _value(arguments[0])
+            for key in [key for key in self._groups if key[0] == hnet]:
+                del self._groups[key]
+            return result
+
+        call.__name__ = func.__name__
+        return call
+
+
+__all__ = ["Distribution", "Fault", "FaultInjector", "Latency", "Outage",
+           "exponential", "fixed", "lognormal", "normal", "uniform"]
@@ -0,0 +1,159 @@
+#! /usr/bin/env python3
+
+"""Кольцевой буфер истории входных данных модулей по каналам.
+Fastwel FBUS SDK Версия 2.4.
+
+Требуется пакет numpy.
+"""
+
+from __future__ import annotations
+
+from ctypes import Structure
+from typing import TYPE_CHECKING
+
+import numpy as np
+
+from fbus.dtypes import dtype_of
+
+if TYPE_CHECKING:
+    from fbus.client import Buffer
+    from fbus.image import ProcessImage
+
+
+class NodeHistory:
+    """История входных данных одного модуля.
+
+    Каждое поле структуры layout хранится в отдельном заранее выделенном
+    столбце, плюс столбец меток времени. Каждая запись пишется в столбец
+    дважды (в позиции i и i + capacity), поэтому любое окно из последних
+    capacity записей является непрерывным срезом, а не копией.
+    """
+
+    def __init__(self, layout: type[Structure], capacity: int) -> None:
+        self.layout = layout
+        self.capacity = capacity
+        self.count = 0          # Общее число добавленных записей
+        self._dtype = dtype_of(layout)
+        self._head = 0          # Позиция следующей записи в кольце
+
+        self.timestamps = np.zeros(2 * capacity, np.float64)
+        self.columns = {name: np.zeros((2 * capacity, *field.shape), field.base)
+                        for name, (field, *_) in self._dtype.fields.items()}
+        self._targets = list(self.columns.items())
+
+    @staticmethod
+    def row_size(layout: type[Structure]) -> int:
+        """Объем памяти на одну запись истории модуля, байт."""
+
+        return dtype_of(layout).itemsize + np.dtype(np.float64).itemsize
+
+    @property
+    def size(self) -> int:
+        """Число доступных записей."""
+
+        return min(self.count, self.capacity)
+
+    @property
+    def nbytes(self) -> int:
+        """Объем памяти, занимаемый столбцами."""
+
+        return self.timestamps.nbytes + sum(column.nbytes for column in self.columns.values())
+
+    def append(self, timestamp: float, data: Buffer | bytes, offset: int = 0) -> None:
+        """Добавить запись из сырых входных данных модуля."""
+
+        record = np.frombuffer(data, self._dtype, 1, offset)[0]
+        head = self._head
+        second = head + self.capacity
+
+        self.timestamps[head] = self.timestamps[second] = timestamp
+        for name, column in self._targets:
+            column[head] = column[second] = record[name]
+
+        self._head = (head + 1) % self.capacity
+        self.count += 1
+
+    def _bounds(self, last: int | None) -> tuple[int, int]:
+        size = self.size if last is None else min(last, self.size)
+        end = self._head + self.capacity
+        return end - size, end
+
+    def times(self, last: int | None = None) -> np.ndarray:
+        """Метки времени последних last записей (всех при last=None)."""
+
+        start, end = self._bounds(last)
+        return self.timestamps[start:end]
+
+    def window(self, channel: str, last: int | None = None) -> np.ndarray:
+        """Значения поля channel для последних last записей без копирования."""
+
+        start, end = self._bounds(last)
+        return self.columns[channel][start:end]
+
+    def since(self, channel: str, timestamp: float) -> tuple[np.ndarray, np.ndarray]:
+        """Метки времени и значения поля channel начиная с момента timestamp."""
+
+        start, end = self._bounds(None)
+        first = start + int(np.searchsorted(self.timestamps[start:end], timestamp))
+        return self.timestamps[first:end], self.columns[channel][first:end]
+
+    def clear(self) -> None:
+        """Удалить все записи."""
+
+        self._head = self.count = 0
+
+
+class History:
+    """История входных данных модулей образа процесса.
+
+    Емкость задается числом записей capacity или бюджетом памяти max_bytes
+    на все модули, по которому емкость вычисляется автоматически.
+    """
+
+    def __init__(self, image: ProcessImage, layouts: dict[int, type[Structure]],
+                       capacity: int | None = None, max_bytes: int | None = None) -> None:
+        if capacity is None:
+            if max_bytes is None:
+                msg = "Either capacity or max_bytes is required"
+                raise ValueError(msg)
+            row = sum(NodeHistory.row_size(layout) for layout in layouts.values())
+            capacity = max_bytes // (2 * row)
+        if capacity < 1:
+            msg = "History capacity must be positive"
+            raise ValueError(msg)
+
+        self.image = image
+        self.capacity = capacity
+        self.nodes = {net_id: NodeHistory(layout, capacity)
+                      for net_id, layout in layouts.items()}
+        self._offsets = [(self.nodes[net_id], image.nodes[net_id].input_offset)
+                         for net_id in layouts]
+
+    @property
+    def nbytes(self) -> int:
+        """Объем памяти, занимаемый историей."""
+
+        return sum(node.nbytes for node in self.nodes.values())
+
+    def append(self, timestamp: float) -> None:
+        """Добавить текущее содержимое входного образа процесса."""
+
+        inputs = self.image.inputs
+        for node, offset in self._offsets:
+            node.append(timestamp, inputs, offset)
+
+    def window(self, net_id: int, channel: str,
+                     last: int | None = None) -> tuple[np.ndarray, np.ndarray]:
+        """Метки времени и значения канала модуля для последних last записей."""
+
+        node = self.nodes[net_id]
+        return node.times(last), node.window(channel, last)
+
+    def since(self, net_id: int, channel: str,
+                    timestamp: float) -> tuple[np.ndarray, np.ndarray]:
+        """Метки времени и значения канала модуля начиная с момента timestamp."""
+
+        return self.nodes[net_id].since(channel, timestamp)
+
+
+__all__ = ["History", "NodeHistory"]
@@ -0,0 +1,179 @@
+#! /usr/bin/env python3
+
+"""Образ процесса: групповой обмен со всеми модулями сети за один цикл.
+Fastwel FBUS SDK Версия 2.4.
+"""
+
+from __future__ import annotations
+
+from ctypes import Structure
+from typing import TYPE_CHECKING, NamedTuple, Sequence, TypeVar
+
+from fbus.client import FBusError
+from fbus.protocol import FBUS_GROUP_ID_MAX, FBUS_GROUP_ID_MIN, FIO_MODULE_DESC
+
+if TYPE_CHECKING:
+    from fbus.client import FBUS
+
+GROUP_DATA_LENGTH_MAX = 255     # Ограничение объема входных или выходных данных группы по умолчанию
+
+_S = TypeVar("_S", bound=Structure)
+
+
+class NodeLayout(NamedTuple):
+    """Размещение данных модуля в группе и в образе процесса."""
+
+    net_id: int             # Идентификатор модуля в сети
+    group_id: int           # Идентификатор группы
+    input_offset: int       # Смещение входных данных модуля во входном образе
+    input_length: int       # Длина входных данных модуля
+    output_offset: int      # Смещение выходных данных модуля в выходном образе
+    output_length: int      # Длина выходных данных модуля
+
+
+def read_node_sizes(bus: FBUS, count: int) -> list[tuple[int, int, int]]:
+    """Прочитать размеры входных и выходных данных модулей сети.
+
+    Возвращает список (net_id, InputsSize, OutputsSize) для модулей, у которых
+    есть входные или выходные данные.
+    """
+
+    descr = FIO_MODULE_DESC()
+    sizes = []
+    for net_id in range(count):
+        bus.fbusGetNodeDescriptionInto(net_id, descr)
+        if descr.InputsSize or descr.OutputsSize:
+            sizes.append((net_id, descr.InputsSize, descr.OutputsSize))
+
+    return sizes
+
+
+def pack_groups(sizes: Sequence[tuple[int, int, int]],
+                max_length: int = GROUP_DATA_LENGTH_MAX) -> list[NodeLayout]:
+    """Последовательное заполнение групп модулями в порядке их расположения
+    в сети так, чтобы объем входных и выходных данных группы не превышал
+    max_length.
+    """
+
+    layout = []
+    group_id = FBUS_GROUP_ID_MIN
+    group_inputs = group_outputs = 0
+    input_offset = output_offset = 0
+
+    for net_id, input_length, output_length in sizes:
+        if max(input_length, output_length) > max_length:
+            msg = f"Node {net_id} data does not fit into a group"
+            raise FBusError(msg)
+
+        if group_inputs + input_length > max_length or \
+           group_outputs + output_length > max_length:
+            group_id += 1
+            group_inputs = group_outputs = 0
+
+        if group_id > FBUS_GROUP_ID_MAX:
+            msg = "Too many groups"
+            raise FBusError(msg)
+
+        layout.append(NodeLayout(net_id, group_id, input_offset, input_length,
+                                 output_offset, output_length))
+        group_inputs += input_length
+        group_outputs += output_length
+        input_offset += input_length
+        output_offset += output_length
+
+    return layout
+
+
+class ProcessImage:
+    """Образ процесса сети.
+
+    Входные данные всех модулей собираются в один непрерывный буфер inputs,
+    выходные данные берутся из буфера outputs. Обмен выполняется одним вызовом
+    fbusProcessGroup на каждую группу.
+    """
+
+    def __init__(self, bus: FBUS, layout: Sequence[NodeLayout]) -> None:
+        """Инициализация образа процесса по готовому размещению модулей."""
+
+        self._bus = bus
+        self.layout = tuple(layout)
+        self.nodes = {node.net_id: node for node in self.layout}
+        self.groups = sorted({node.group_id for node in self.layout})
+        self.inputs = bytearray(sum(node.input_length for node in self.layout))
+        self.outputs = bytearray(sum(node.output_length for node in self.layout))
+
+        self._exchange = {
+            group_id: (
+                [(node.net_id, node.output_offset, node.output_length)
+                 for node in self.layout if node.group_id == group_id and node.output_length],
+                [(node.net_id, node.input_offset, node.input_length)
+                 for node in self.layout if node.group_id == group_id and node.input_length])
+            for group_id in self.groups}
+
+    @classmethod
+    def from_rescan(cls, bus: FBUS, max_length: int = GROUP_DATA_LENGTH_MAX,
+                         write_config: bool = True) -> ProcessImage:
+        """Сканирование сети, построение групп по описаниям модулей и их
+        назначение в конфигурации сети.
+        """
+
+        with bus.lock:
+            count = bus.fbusRescan()
+            image = cls(bus, pack_groups(read_node_sizes(bus, count), max_length))
+            image.assign(write_config)
+
+        return image
+
+    def assign(self, write_config: bool = True) -> None:
+        """Назначить модули группам в конфигурации сети и построить группы."""
+
+        bus = self._bus
+        with bus.lock:
+            for node in self.layout:
+                bus.fbusAssignNodeToGroup(node.net_id, node.group_id,
+                                          0, node.input_length,
+                                          0, node.output_length)
+            bus.fbusBuildGroups()
+
+            if write_config:
+                for node in self.layout:
+                    bus.fbusWriteConfig(node.net_id)
+
+    def exchange(self) -> None:
+        """Выполнить цикл обмена: передать выходной образ и получить входной."""
+
+        bus = self._bus
+
+        with bus.lock:
+            for group_id, (outputs, _) in self._exchange.items():
+                bus.fbusGroupScatterOutputs(group_id, outputs, self.outputs)
+            for group_id in self.groups:
+                bus.fbusProcessGroup(group_id)
+            for group_id, (_, inputs) in self._exchange.items():
+                bus.fbusGroupGatherInputs(group_id, inputs, self.inputs)
+
+    def exchange_group(self, group_id: int) -> None:
+        """Выполнить цикл обмена только с модулями одной группы."""
+
+        bus = self._bus
+        outputs, inputs = self._exchange[group_id]
+
+        with bus.lock:
+            bus.fbusGroupScatterOutputs(group_id, outputs, self.outputs)
+            bus.fbusProcessGroup(group_id)
+            bus.fbusGroupGatherInputs(group_id, inputs, self.inputs)
+
+    def input_view(self, net_id: int, layout: type[_S]) -> _S:
+        """Структура входных данных модуля, отображенная на входной образ."""
+
+        node = self.nodes[net_id]
+        return layout.from_buffer(self.inputs, node.input_offset)
+
+    def output_view(self, net_id: int, layout: type[_S]) -> _S:
+        """Структура выходных данных модуля, отображенная на выходной образ."""
+
+        node = self.nodes[net_id]
+        return layout.from_buffer(self.outputs, node.output_offset)
+
+
+__all__ = ["NodeLayout", "ProcessImage", "pack_groups", "read_node_sizes"]
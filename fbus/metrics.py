@@ -0,0 +1,233 @@
+#! /usr/bin/env python3
+
+"""Статистика вызовов функций FBUS API: гистограммы задержек, число вызовов
+и кодов возврата.
+Fastwel FBUS SDK Версия 2.4.
+
+Сбор включается методом FBUS.instrument(). Без него функции вызываются
+напрямую, без промежуточных оберток.
+"""
+
+from __future__ import annotations
+
+from collections import Counter
+from threading import Lock
+from time import perf_counter_ns
+from typing import Callable, NamedTuple
+
+from fbus.client import FBusDevice, FBusError, _value
+from fbus.protocol import FBUS_RESULT
+
+HISTOGRAM_PRECISION = 7     # Значащих бит значения (относительная погрешность 2^-6)
+
+
+class Histogram:
+    """Гистограмма с логарифмически-линейными интервалами (по схеме HDR).
+
+    Значения (целые, нс) до 2^HISTOGRAM_PRECISION хранятся точно, большие -
+    в интервалах с относительной шириной не больше 2^-(HISTOGRAM_PRECISION-1).
+    Процентили возвращаются как верхняя граница интервала, но не больше
+    максимального значения.
+    """
+
+    __slots__ = ("count", "counts", "max", "min", "total")
+
+    _half = 1 << (HISTOGRAM_PRECISION - 1)
+
+    def __init__(self) -> None:
+        self.counts: list[int] = []     # Число значений по интервалам
+        self.count = 0                  # Число значений
+        self.total = 0                  # Сумма значений
+        self.min = 0
+        self.max = 0
+
+    @classmethod
+    def _highest(cls, index: int) -> int:
+        if index < 2 * cls._half:
+            return index
+        shift = index // cls._half - 1
+        return ((index - shift * cls._half + 1) << shift) - 1
+
+    def record(self, value: int) -> None:
+        """Добавить значение."""
+
+        shift = value.bit_length() - HISTOGRAM_PRECISION
+        index = value if shift <= 0 else shift * self._half + (value >> shift)
+        try:
+            self.counts[index] += 1
+        except IndexError:
+            self.counts.extend([0] * (index + 1 - len(self.counts)))
+            self.counts[index] += 1
+
+        if value > self.max:
+            self.max = value
+        if value < self.min or not self.count:
+            self.min = value
+        self.count += 1
+        self.total += value
+
+    def merge(self, other: Histogram) -> None:
+        """Добавить значения другой гистограммы."""
+
+        if not other.count:
+            return
+        if len(other.counts) > len(self.counts):
+            self.counts.extend([0] * (len(other.counts) - len(self.counts)))
+        for index, count in enumerate(other.counts):
+            self.counts[index] += count
+
+        self.min = min(self.min, other.min) if self.count else other.min
+        self.max = max(self.max, other.max)
+        self.count += other.count
+        self.total += other.total
+
+    def copy(self) -> Histogram:
+        histogram = Histogram()
+        histogram.merge(self)
+        return histogram
+
+    def percentile(self, q: float) -> int:
+        """Значение, не меньше которого q (0...1) всех значений."""
+
+        if not self.count:
+            return 0
+
+        rank = max(int(q * self.count + 0.5), 1)
+        seen = 0
+        for index, count in enumerate(self.counts):
+            seen += count
+            if seen >= rank:
+                return min(self._highest(index), self.max)
+
+        return self.max
+
+    @property
+    def mean(self) -> float:
+        return self.total / self.count if self.count else 0.0
+
+    def summary(self) -> CallStats:
+        return CallStats(self.count, self.percentile(0.5), self.percentile(0.99),
+                         self.max, self.mean)
+
+
+class CallStats(NamedTuple):
+    """Сводка гистограммы задержек."""
+
+    count: int              # Число вызовов
+    p50: int                # Медиана, нс
+    p99: int                # 99-й процентиль, нс
+    max: int                # Максимум, нс
+    mean: float             # Среднее, нс
+
+
+class MetricsSnapshot(NamedTuple):
+    """Копия статистики на момент вызова Metrics.snapshot()."""
+
+    functions: dict[str, Histogram]             # Задержки по функциям
+    nodes: dict[int, Histogram]                 # Задержки по номерам модулей
+    results: dict[str, Counter[FBUS_RESULT]]    # Коды возврата по функциям
+
+    def summary(self) -> dict:
+        """Сводка для экспорта: p50, p99, max и число кодов возврата."""
+
+        return {
+            "functions": {name: histogram.summary()._asdict()
+                          for name, histogram in self.functions.items()},
+            "nodes": {net_id: histogram.summary()._asdict()
+                      for net_id, histogram in self.nodes.items()},
+            "results": {name: {result.name: count for result, count in counter.items()}
+                        for name, counter in self.results.items()},
+        }
+
+
+class Metrics:
+    """Статистика вызовов функций FBUS API.
+
+    Задержки записываются в гистограммы по имени функции и по номеру модуля
+    (для функций, адресующих модуль). Один объект можно разделять между
+    несколькими клиентами. snapshot() и reset() можно вызывать из другого
+    потока во время опроса: блокировка удерживается только на время
+    копирования.
+    """
+
+    def __init__(self, clock: Callable[[], int] = perf_counter_ns) -> None:
+        self.clock = clock
+        self._functions: dict[str, Histogram] = {}
+        self._nodes: dict[int, Histogram] = {}
+        self._results: dict[str, list[int]] = {}     # Число вызовов по кодам возврата
+        self._lock = Lock()
+
+    def record(self, name: str, net_id: int | None, elapsed: int, result: int) -> None:
+        """Записать вызов функции name длительностью elapsed, нс, с кодом
+        возврата result.
+        """
+
+        with self._lock:
+            try:
+                self._functions[name].record(elapsed)
+                self._results[name][result] += 1
+            except KeyError:
+                self._functions[name] = Histogram()
+                self._functions[name].record(elapsed)
+                self._results[name] = [0] * FBUS_RESULT.MAX
+                self._results[name][result] += 1
+
+            if net_id is not None:
+                try:
+                    self._nodes[net_id].record(elapsed)
+                except KeyError:
+                    self._nodes[net_id] = Histogram()
+                    self._nodes[net_id].record(elapsed)
+
+    def snapshot(self, reset: bool = False) -> MetricsSnapshot:
+        """Копия статистики. При reset статистика сбрасывается в том же
+        действии, поэтому ни один вызов не теряется между копией и сбросом.
+        """
+
+        with self._lock:
+            if reset:
+                functions, nodes, results = self._functions, self._nodes, self._results
+                self._functions, self._nodes, self._results = {}, {}, {}
+            else:
+                functions = {name: histogram.copy() for name, histogram in self._functions.items()}
+                nodes = {net_id: histogram.copy() for net_id, histogram in self._nodes.items()}
+                results = {name: counts.copy() for name, counts in self._results.items()}
+
+        return MetricsSnapshot(functions, nodes,
+                               {name: Counter({FBUS_RESULT(result): count
+                                               for result, count in enumerate(counts) if count})
+                                for name, counts in results.items()})
+
+    def reset(self) -> None:
+        """Сбросить статистику."""
+
+        self.snapshot(reset=True)
+
+    def wrap(self, functions: dict[str, Callable[..., bool]]) -> dict[str, Callable[..., bool]]:
+        """Таблица функций, записывающих статистику своих вызовов."""
+
+        return {name: self._wrap(name, func) for name, func in functions.items()}
+
+    def _wrap(self, name: str, func: Callable[..., bool]) -> Callable[..., bool]:
+        index = FBusDevice._node_arguments_.get(name)
+        record = self.record
+        clock = self.clock
+        ok = int(FBUS_RESULT.OK)
+
+        def call(*arguments: object) -> bool:
+            net_id = _value(arguments[index]) if index is not None else None
+            start = clock()
+            try:
+                result = func(*arguments)
+            except FBusError as err:
+                record(name, net_id, clock() - start, err.result or FBUS_RESULT.SYSTEM_ERROR)
+                raise
+
+            record(name, net_id, clock() - start, ok)
+            return result
+
+        call.__name__ = name
+        return call
+
+
+__all__ = ["CallStats", "Histogram", "Metrics", "MetricsSnapshot"]
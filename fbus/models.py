@@ -0,0 +1,383 @@
+#! /usr/bin/env python3
+
+"""Модели поведения модулей для виртуальных сетей fbus.simulator.
+Fastwel FBUS SDK Версия 2.4.
+"""
+
+from __future__ import annotations
+
+import math
+import re
+from ctypes import Array, Structure, c_float
+from random import Random
+from typing import Callable, Sequence
+
+from fbus.protocol import FBUS_MAX_NODE_COUNT, FIO_MODULE_TYPE
+from fbus.registry import layouts_of
+from fbus.simulator import SimNode
+
+Waveform = Callable[[float], float]
+
+SERIAL_WINDOW = 32          # Размер окон tx_Data и rx_Data модулей NIM
+SERIAL_FIFO_SIZE = 1024     # Размер приемного FIFO модуля NIM
+
+_INDEXED = re.compile(r"(\w+)\[(\d+)\]$")
+_CHANNEL = re.compile(r"\w*(input|Input|channel|value)\d+$")
+
+
+def constant(value: float) -> Waveform:
+    """Постоянное значение."""
+
+    return lambda now: value
+
+
+def sine(amplitude: float, frequency: float, offset: float = 0.0,
+               phase: float = 0.0) -> Waveform:
+    """Синусоида с частотой frequency, Гц."""
+
+    omega = 2 * math.pi * frequency
+    return lambda now: offset + amplitude * math.sin(omega * now + phase)
+
+
+def ramp(low: float, high: float, period: float) -> Waveform:
+    """Пила от low до high с периодом period, с."""
+
+    return lambda now: low + (high - low) * (now % period) / period
+
+
+def square(low: float, high: float, period: float) -> Waveform:
+    """Меандр между low и high с периодом period, с."""
+
+    return lambda now: high if now % period < period / 2 else low
+
+
+class _Field:
+    """Доступ к полю структуры или элементу поля-массива по имени "values[3]"."""
+
+    __slots__ = ("index", "name", "target")
+
+    def __init__(self, target: Structure, name: str) -> None:
+        match = _INDEXED.match(name)
+        self.target = getattr(target, match.group(1)) if match else target
+        self.name = None if match else name
+        self.index = int(match.group(2)) if match else None
+
+    def get(self) -> float:
+        return self.target[self.index] if self.name is None else getattr(self.target, self.name)
+
+    def set(self, value: float) -> None:
+        if self.name is None:
+            self.target[self.index] = value
+        else:
+            setattr(self.target, self.name, value)
+
+
+def _is_float(layout: type[Structure], name: str) -> bool:
+    match = _INDEXED.match(name)
+    ctype = dict((field, ctype) for field, ctype, *_ in layout._fields_)[
+        match.group(1) if match else name]
+    if issubclass(ctype, Array):
+        ctype = ctype._type_
+    return ctype is c_float
+
+
+class AnalogInput(SimNode):
+    """Модуль аналогового ввода (AIM72x, AIM79x).
+
+    waveforms задает сигнал для полей входных данных (например, "channel0"
+    или "values[3]") как функцию времени. К сигналу добавляется нормальный
+    шум со СКО noise. Поля c_float получают значение в физических единицах,
+    целочисленные поля - код: при заданной шкале scale = (low, high,
+    full_scale) значение пересчитывается в код, иначе записывается как есть.
+    """
+
+    def __init__(self, module_type: int, waveforms: dict[str, Waveform] | None = None,
+                       noise: float = 0.0, scale: tuple[float, float, int] | None = None,
+                       seed: int | None = None, serial: int = 0) -> None:
+        super().__init__(module_type, serial)
+        self._view = self.layouts.inputs.from_buffer(self.inputs)
+        self._random = Random(seed)
+        self.noise = noise
+        self.scale = scale
+        self.channels = [(_Field(self._view, name), waveform,
+                          _is_float(self.layouts.inputs, name))
+                         for name, waveform in (waveforms or {}).items()]
+
+    def _code(self, value: float) -> int:
+        if self.scale is None:
+            return max(int(round(value)), 0)
+
+        low, high, full_scale = self.scale
+        code = round((value - low) / (high - low) * full_scale)
+        return min(max(code, 0), full_scale)
+
+    def update(self, now: float) -> None:
+        gauss = self._random.gauss
+        noise = self.noise
+        for field, waveform, is_float in self.channels:
+            value = waveform(now)
+            if noise:
+                value += gauss(0.0, noise)
+            field.set(value if is_float else self._code(value))
+
+
+class Counter(SimNode):
+    """Модуль счетных входов (DIM714, DIM716, DIM717, DIM760-DIM762).
+
+    rates - частота импульсов на каждом канале, Гц. Счетчики counter0 и
+    counter1 начинают с presetValue и изменяются в направлении direction из
+    конфигурации countingParameters. При достижении предела счетчик
+    останавливается (CONTINUOUSUPDATE) или переходит через ноль
+    (CYCLICUPDATE). Биты inputStates переключаются с частотой импульсов.
+    """
+
+    COUNTER_MAX = 0xFFFF
+
+    def __init__(self, module_type: int, rates: Sequence[float] = (1.0, 1.0),
+                       serial: int = 0) -> None:
+        super().__init__(module_type, serial)
+        self._view = self.layouts.inputs.from_buffer(self.inputs)
+        self._config = self.layouts.configuration.from_buffer(self.config)
+        self.rates = list(rates)
+        self._start: float | None = None
+        self._presets = [0, 0]
+
+    def configure(self) -> None:
+        self._start = None
+
+    def update(self, now: float) -> None:
+        if self._start is None:
+            self._start = now
+            self._presets = [self._config.countingParameters[channel].presetValue
+                             for channel in range(2)]
+
+        elapsed = now - self._start
+        states = 0
+        for channel, rate in enumerate(self.rates[:2]):
+            pulses = int(elapsed * rate)
+            settings = self._config.countingParameters[channel]
+            if self._config.enableCounting:
+                value = self._presets[channel] + (-pulses if settings.direction else pulses)
+                if settings.countingMode:
+                    value %= self.COUNTER_MAX + 1
+                else:
+                    value = min(max(value, 0), self.COUNTER_MAX)
+                setattr(self._view, f"counter{channel}", value)
+            states |= (int(elapsed * rate * 2) & 1) << channel
+
+        self._view.inputStates = states
+
+
+class PulseCounter(SimNode):
+    """Модуль DIM764: каналы в режиме COUNTER считают импульсы с частотой
+    rates, команда resetCounters выходов обнуляет счетчики, а код control
+    возвращается во входном поле controlState.
+    """
+
+    COUNTER_MODE = 3    # DIM764_INPUT_MODE.COUNTER
+
+    def __init__(self, module_type: int = FIO_MODULE_TYPE.DIM764,
+                       rates: Sequence[float] = (1.0,) * 8, serial: int = 0) -> None:
+        super().__init__(module_type, serial)
+        self._view = self.layouts.inputs.from_buffer(self.inputs)
+        self._outputs = self.layouts.outputs.from_buffer(self.outputs)
+        self._config = self.layouts.configuration.from_buffer(self.config)
+        self.rates = list(rates)
+        self._origin = [None] * len(self._view.values)
+
+    def apply_outputs(self, now: float) -> None:
+        if self._outputs.resetCounters:
+            self._origin = [now] * len(self._origin)
+        self._view.controlState = self._outputs.control
+
+    def update(self, now: float) -> None:
+        values = self._view.values
+        states = 0
+        for channel, rate in enumerate(self.rates[:len(values)]):
+            if self._config.channelsConfig[channel].inputMode != self.COUNTER_MODE:
+                continue
+            if self._origin[channel] is None:
+                self._origin[channel] = now
+
+            elapsed = now - self._origin[channel]
+            values[channel] = int(elapsed * rate) & 0xFFFFFFFF
+            states |= (int(elapsed * rate * 2) & 1) << channel
+
+        self._view.channelsState = self._view.inputsState = states
+
+
+class OutputReadback(SimNode):
+    """Модуль вывода, возвращающий установленные значения выходов в своих
+    входных данных (DIM718, AIM730, AIM731).
+
+    mapping - соответствие полей выходных данных полям входных данных.
+    """
+
+    def __init__(self, module_type: int, mapping: dict[str, str] | None = None,
+                       serial: int = 0) -> None:
+        super().__init__(module_type, serial)
+        self._inputs = self.layouts.inputs.from_buffer(self.inputs)
+        self._outputs = self.layouts.outputs.from_buffer(self.outputs)
+        self.mapping = [(_Field(self._outputs, source), _Field(self._inputs, target))
+                        for source, target in (mapping or _READBACK[module_type]).items()]
+
+    def apply_outputs(self, now: float) -> None:
+        for source, target in self.mapping:
+            target.set(source.get())
+
+    def reset(self) -> None:
+        super().reset()
+        self.apply_outputs(0.0)
+
+
+_READBACK: dict[int, dict[str, str]] = {
+    FIO_MODULE_TYPE.DIM718: {
+        "digitalOutputs": "channelsStates",
+        **{f"{half}HalfDuty_PWM{channel}": f"{half}HalfDutyState_PWM{channel}"
+           for half in ("first", "second") for channel in range(4)},
+    },
+    FIO_MODULE_TYPE.AIM730: {"output0": "outputValue0", "output1": "outputValue1"},
+    FIO_MODULE_TYPE.AIM731: {"output0": "outputValue0", "output1": "outputValue1"},
+}
+
+
+class SerialPort(SimNode):
+    """Модуль последовательного интерфейса (NIM741, NIM742, NIM841).
+
+    Команда в выходных данных выполняется при изменении tx_Control: бит 0
+    Control передает tx_Data[:tx_Length] абоненту, бит 1 копирует до 32
+    байт из приемного FIFO в окно rx_Data и устанавливает rx_Length, а
+    rx_Control принимает значение tx_Control. FIFOLength - число байт,
+    оставшихся в приемном FIFO.
+
+    peer - функция, получающая переданные байты и возвращающая ответ
+    абонента. По умолчанию переданные данные возвращаются в FIFO приема
+    (петля).
+    """
+
+    TRANSMIT = 0x0001
+    RECEIVE = 0x0002
+
+    def __init__(self, module_type: int, peer: Callable[[bytes], bytes] | None = None,
+                       serial: int = 0) -> None:
+        super().__init__(module_type, serial)
+        self._inputs = self.layouts.inputs.from_buffer(self.inputs)
+        self._outputs = self.layouts.outputs.from_buffer(self.outputs)
+        self.peer = peer
+        self.fifo = bytearray()
+        self.transmitted = bytearray()
+        self._sequence = 0
+
+    def apply_outputs(self, now: float) -> None:
+        outputs = self._outputs
+        if outputs.tx_Control == self._sequence:
+            return
+
+        self._sequence = outputs.tx_Control
+        if outputs.Control & self.TRANSMIT:
+            data = bytes(outputs.tx_Data[:min(outputs.tx_Length, SERIAL_WINDOW)])
+            self.transmitted += data
+            answer = data if self.peer is None else self.peer(data)
+            self.fifo += answer[:SERIAL_FIFO_SIZE - len(self.fifo)]
+
+        inputs = self._inputs
+        if outputs.Control & self.RECEIVE:
+            window = self.fifo[:SERIAL_WINDOW]
+            del self.fifo[:SERIAL_WINDOW]
+            inputs.rx_Data[:len(window)] = window
+            inputs.rx_Length = len(window)
+
+        inputs.rx_Control = self._sequence
+        inputs.FIFOLength = len(self.fifo)
+
+    def reset(self) -> None:
+        super().reset()
+        self.fifo.clear()
+        self._sequence = 0
+
+
+_ANALOG = {
+    FIO_MODULE_TYPE.AIM720, FIO_MODULE_TYPE.AIM721, FIO_MODULE_TYPE.AIM722, FIO_MODULE_TYPE.AIM723,
+    FIO_MODULE_TYPE.AIM724, FIO_MODULE_TYPE.AIM725, FIO_MODULE_TYPE.AIM726,
+    FIO_MODULE_TYPE.AIM727, FIO_MODULE_TYPE.AIM728, FIO_MODULE_TYPE.AIM729,
+    FIO_MODULE_TYPE.AIM733, FIO_MODULE_TYPE.AIM72503, FIO_MODULE_TYPE.AIM791,
+    FIO_MODULE_TYPE.AIM792,
+}
+_COUNTERS = {
+    FIO_MODULE_TYPE.DIM714, FIO_MODULE_TYPE.DIM716, FIO_MODULE_TYPE.DIM717,
+    FIO_MODULE_TYPE.DIM760, FIO_MODULE_TYPE.DIM761, FIO_MODULE_TYPE.DIM762,
+}
+_SERIAL = {FIO_MODULE_TYPE.NIM741, FIO_MODULE_TYPE.NIM742, FIO_MODULE_TYPE.NIM841}
+
+
+def _analog_fields(layout: type[Structure]) -> list[str]:
+    names = []
+    for name, ctype, *_ in layout._fields_:
+        if name == "diagnostics":
+            continue
+        if issubclass(ctype, Array):
+            names.extend(f"{name}[{index}]" for index in range(ctype._length_))
+        elif ctype is c_float or _CHANNEL.match(name):
+            names.append(name)
+    return names
+
+
+def model_for(module_type: int, random: Random | None = None, serial: int = 0) -> SimNode:
+    """Модель модуля типа module_type со случайными параметрами сигналов."""
+
+    random = random or Random()
+    if module_type in _ANALOG:
+        waveforms = {name: sine(random.uniform(1, 100), random.uniform(0.1, 10),
+                                random.uniform(0, 1000), random.uniform(0, math.tau))
+                     for name in _analog_fields(layouts_of(module_type).inputs)}
+        return AnalogInput(module_type, waveforms, noise=1.0, seed=random.getrandbits(32),
+                           serial=serial)
+    if module_type in _COUNTERS:
+        node = Counter(module_type, [random.uniform(1, 1000) for _ in range(2)], serial)
+        node._config.enableCounting = 1
+        node._config.countingParameters[1].countingMode = 1
+        node.saved_config = bytes(node.config)
+        return node
+    if module_type == FIO_MODULE_TYPE.DIM764:
+        node = PulseCounter(module_type, [random.uniform(1, 1000) for _ in range(8)], serial)
+        for channel in node._config.channelsConfig:
+            channel.inputMode = PulseCounter.COUNTER_MODE
+        node.saved_config = bytes(node.config)
+        return node
+    if module_type in _READBACK:
+        return OutputReadback(module_type, serial=serial)
+    if module_type in _SERIAL:
+        return SerialPort(module_type, serial=serial)
+
+    return SimNode(module_type, serial)
+
+
+def generate_networks(count: int, nodes: int = FBUS_MAX_NODE_COUNT,
+                            types: Sequence[int] | None = None,
+                            seed: int | None = None) -> dict[int, list[SimNode]]:
+    """Сети для Simulator с номерами 1...count (порты адаптера TCP) по nodes
+    модулей, типы которых выбираются случайно из types (по умолчанию - все
+    типы, для которых определены модели).
+    """
+
+    if not 1 <= count <= 100:
+        msg = "Network count must be within 1...100"
+        raise ValueError(msg)
+
+    random = Random(seed)
+    types = list(types or sorted(_ANALOG | _COUNTERS | _SERIAL | set(_READBACK)
+                                 | {FIO_MODULE_TYPE.DIM764}))
+    serial = 0
+    networks = {}
+    for number in range(1, count + 1):
+        rack = []
+        for _ in range(nodes):
+            serial += 1
+            rack.append(model_for(random.choice(types), random, serial))
+        networks[number] = rack
+
+    return networks
+
+
+__all__ = ["AnalogInput", "Counter", "OutputReadback", "PulseCounter", "SerialPort",
+           "constant", "generate_networks", "model_for", "ramp", "sine", "square"]
@@ -0,0 +1,157 @@
+#! /usr/bin/env python3
+
+"""Кэш выходных данных модулей с объединением записей и пропуском повторов.
+Fastwel FBUS SDK Версия 2.4.
+"""
+
+from __future__ import annotations
+
+from time import monotonic
+from typing import TYPE_CHECKING, Iterator
+
+if TYPE_CHECKING:
+    from fbus.client import FBUS, Buffer
+
+
+class _NodeOutputs:
+    """Выходные данные модуля в кэше."""
+
+    __slots__ = ("committed", "data", "end", "known", "sent", "sent_at", "start", "writes")
+
+    def __init__(self) -> None:
+        self.data = bytearray()         # Записанные данные
+        self.known = bytearray()        # 1 - байт data записан
+        self.sent = bytearray()         # Переданные в модуль данные
+        self.committed = bytearray()    # 1 - байт sent передан в модуль
+        self.start = self.end = 0       # Измененный с последней передачи диапазон
+        self.writes = 0                 # Число записей с последней передачи
+        self.sent_at: float | None = None
+
+    def grow(self, size: int) -> None:
+        extra = size - len(self.data)
+        if extra > 0:
+            for buffer in (self.data, self.known, self.sent, self.committed):
+                buffer.extend(bytes(extra))
+
+    def runs(self, start: int, end: int) -> Iterator[tuple[int, int]]:
+        """Непрерывные участки записанных данных в диапазоне start...end."""
+
+        known = self.known
+        while start < end:
+            start = known.find(1, start, end)
+            if start < 0:
+                return
+            stop = known.find(0, start, end)
+            if stop < 0:
+                stop = end
+            yield start, stop
+            start = stop
+
+    def changed(self, start: int, end: int) -> bool:
+        return 0 in self.committed[start:end] or self.data[start:end] != self.sent[start:end]
+
+
+class OutputCache:
+    """Кэш выходных данных модулей.
+
+    Записи write() в течение цикла накапливаются в буфере модуля, а commit()
+    передает каждому модулю только измененный диапазон данных (со смещением
+    node_offset в fbusWriteOutputsFrom) и только если данные отличаются от
+    переданных ранее. Байты, которые ни разу не записывались, в модуль не
+    передаются: если между записями остаются такие промежутки, участки
+    передаются отдельными транзакциями. Для модулей со сторожевым таймером
+    задается период принудительного обновления refresh, по истечении
+    которого записанные данные передаются даже без изменений.
+    """
+
+    def __init__(self, bus: FBUS, refresh: float | None = None) -> None:
+        self._bus = bus
+        self.refresh = refresh
+        self.writes = 0             # Число вызовов write()
+        self.transactions = 0       # Число выполненных транзакций
+        self.refreshes = 0          # Число транзакций принудительного обновления
+        self.saved = 0              # Число записей, объединенных или пропущенных при commit()
+        self._nodes: dict[int, _NodeOutputs] = {}
+
+    def write(self, net_id: int, src: Buffer | bytes, offset: int = 0) -> None:
+        """Записать данные src в выходную область модуля начиная со смещения
+        offset. Передача в модуль выполняется при вызове commit().
+        """
+
+        data = memoryview(src).cast("B")
+        node = self._nodes.get(net_id)
+        if node is None:
+            node = self._nodes[net_id] = _NodeOutputs()
+
+        end = offset + len(data)
+        node.grow(end)
+        node.data[offset:end] = data
+        node.known[offset:end] = b"\1" * len(data)
+        if node.start < node.end:
+            node.start, node.end = min(node.start, offset), max(node.end, end)
+        else:
+            node.start, node.end = offset, end
+        node.writes += 1
+        self.writes += 1
+
+    def get(self, net_id: int) -> bytes:
+        """Последние переданные в модуль выходные данные (не передававшиеся
+        байты равны 0).
+        """
+
+        node = self._nodes.get(net_id)
+        return bytes(node.sent) if node is not None else b""
+
+    def commit(self) -> int:
+        """Передать измененные данные модулей. Возвращает число транзакций."""
+
+        bus = self._bus
+        now = monotonic()
+        refresh = self.refresh
+        count = 0
+
+        with bus.lock:
+            for net_id, node in self._nodes.items():
+                sent = 0
+                for start, end in node.runs(node.start, node.end):
+                    if node.changed(start, end):
+                        self._send(net_id, node, start, end, now)
+                        sent += 1
+
+                if not sent and refresh is not None and node.sent_at is not None \
+                        and now - node.sent_at >= refresh:
+                    for start, end in node.runs(0, len(node.data)):
+                        self._send(net_id, node, start, end, now)
+                        self.refreshes += 1
+                        count += 1
+
+                self.saved += max(node.writes - sent, 0)
+                node.writes = node.start = node.end = 0
+                count += sent
+
+        self.transactions += count
+        return count
+
+    def _send(self, net_id: int, node: _NodeOutputs, start: int, end: int, now: float) -> None:
+        self._bus.fbusWriteOutputsFrom(net_id, node.data, start, end - start, start)
+        node.sent[start:end] = node.data[start:end]
+        node.committed[start:end] = b"\1" * (end - start)
+        node.sent_at = now
+
+    def invalidate(self, net_id: int | None = None) -> None:
+        """Принудительно передать записанные данные модуля (или всех модулей)
+        при следующем commit(), например после перезапуска модуля.
+        """
+
+        for node in self._nodes.values() if net_id is None else (self._nodes.get(net_id),):
+            if node is not None:
+                node.committed[:] = bytes(len(node.committed))
+                node.start, node.end = 0, len(node.data)
+
+    def reset_statistics(self) -> None:
+        """Сбросить счетчики."""
+
+        self.writes = self.transactions = self.refreshes = self.saved = 0
+
+
+__all__ = ["OutputCache"]
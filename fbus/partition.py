@@ -0,0 +1,235 @@
+#! /usr/bin/env python3
+
+"""Разбиение модулей сети на группы обмена с минимальной загрузкой шины.
+Fastwel FBUS SDK Версия 2.4.
+"""
+
+from __future__ import annotations
+
+import math
+import warnings
+from typing import TYPE_CHECKING, Iterable, NamedTuple
+
+from fbus.client import FBusError
+from fbus.image import GROUP_DATA_LENGTH_MAX, NodeLayout, ProcessImage
+from fbus.protocol import FBUS_GROUP_ID_MAX, FBUS_GROUP_ID_MIN
+
+if TYPE_CHECKING:
+    from fbus.client import FBUS
+
+GROUP_COUNT_MAX = FBUS_GROUP_ID_MAX - FBUS_GROUP_ID_MIN + 1     # Число идентификаторов групп
+TRANSACTION_TIME = 0.5e-3   # Оценка накладных расходов на одну групповую транзакцию, с
+BYTE_TIME = 5e-6            # Оценка времени передачи одного байта данных, с
+
+
+class NodeRequirement(NamedTuple):
+    """Требования модуля к групповому обмену."""
+
+    net_id: int             # Идентификатор модуля в сети
+    input_length: int       # Длина входных данных модуля
+    output_length: int      # Длина выходных данных модуля
+    period: float           # Требуемый период обновления данных, с
+
+
+class GroupInfo(NamedTuple):
+    """Параметры группы в плане обмена."""
+
+    group_id: int               # Идентификатор группы
+    period: float               # Период обмена группы (наименьший из периодов модулей), с
+    net_ids: tuple[int, ...]    # Идентификаторы модулей группы
+    input_length: int           # Объем входных данных группы, байт
+    output_length: int          # Объем выходных данных группы, байт
+    bus_time: float             # Ожидаемое время одной транзакции группы, с
+
+    @property
+    def load(self) -> float:
+        """Доля времени шины, занимаемая группой."""
+
+        return self.bus_time / self.period
+
+
+class GroupPlan:
+    """План группового обмена: размещение модулей и параметры групп."""
+
+    def __init__(self, layout: list[NodeLayout], groups: list[GroupInfo]) -> None:
+        self.layout = layout
+        self.groups = groups
+
+    @property
+    def load(self) -> float:
+        """Ожидаемая суммарная доля времени шины, занимаемая обменом."""
+
+        return sum(group.load for group in self.groups)
+
+    def periods(self) -> dict[int, float]:
+        """Период обмена каждой группы."""
+
+        return {group.group_id: group.period for group in self.groups}
+
+    def report(self) -> str:
+        """Текстовый отчет об ожидаемом объеме данных и загрузке по группам."""
+
+        lines = [f"{'group':>5} {'period, ms':>10} {'nodes':>5} {'in, B':>6} "
+                 f"{'out, B':>6} {'time, ms':>8} {'load, %':>7}"]
+        for group in self.groups:
+            lines.append(f"{group.group_id:#5x} {group.period * 1e3:10.1f} "
+                         f"{len(group.net_ids):5} {group.input_length:6} "
+                         f"{group.output_length:6} {group.bus_time * 1e3:8.3f} "
+                         f"{group.load * 100:7.2f}")
+        lines.append(f"total load: {self.load * 100:.2f} %")
+        return "\n".join(lines)
+
+    def apply(self, bus: FBUS, write_config: bool = True) -> ProcessImage:
+        """Назначить группы плана в открытой сети и вернуть образ процесса."""
+
+        image = ProcessImage(bus, self.layout)
+        image.assign(write_config)
+        return image
+
+
+def _split(segments: list[list[tuple[int, float]]],
+           previous: list[float] | None = None) -> tuple[list[float], list[int]]:
+    """Шаг динамического программирования по допустимым группам segments.
+
+    Возвращает наименьшую загрузку шины для модулей 0...end - 1 и начало
+    последней группы. Без previous число групп не ограничивается, иначе к
+    разбиениям previous добавляется ровно одна группа.
+    """
+
+    count = len(segments) - 1
+    cost = [math.inf] * (count + 1)
+    start = [0] * (count + 1)
+    if previous is None:
+        cost[0] = 0.0
+        previous = cost
+
+    for end in range(1, count + 1):
+        for first, load in segments[end]:
+            total = previous[first] + load
+            if total < cost[end]:
+                cost[end] = total
+                start[end] = first
+
+    return cost, start
+
+
+def _bounds(starts: list[list[int]], count: int) -> list[tuple[int, int]]:
+    """Границы групп по началам последних групп: одна таблица для всех
+    групп или по таблице на каждую группу (в порядке групп).
+    """
+
+    bounds = []
+    end = count
+    layer = len(starts)
+    while end:
+        layer = max(layer - 1, 0)
+        first = starts[layer][end]
+        bounds.append((first, end))
+        end = first
+    bounds.reverse()
+    return bounds
+
+
+def partition(nodes: Iterable[tuple[int, int, int, float]],
+              max_length: int = GROUP_DATA_LENGTH_MAX,
+              transaction_time: float = TRANSACTION_TIME,
+              byte_time: float = BYTE_TIME,
+              max_groups: int = GROUP_COUNT_MAX) -> GroupPlan:
+    """Разбиение модулей на группы с минимальным суммарным временем шины.
+
+    Каждая группа обменивается с периодом самого быстрого из своих модулей,
+    а одна транзакция группы занимает transaction_time + byte_time на каждый
+    байт входных и выходных данных. Модули упорядочиваются по требуемому
+    периоду, и динамическим программированием выбирается разбиение этого
+    списка на последовательные группы с минимальной загрузкой шины при
+    ограничениях max_length на объем данных группы в каждом направлении и
+    max_groups (не больше GROUP_COUNT_MAX) на число групп.
+
+    Если модули не удается разместить в max_groups группах, вызывается
+    FBusError. Если время транзакции группы
+    превышает ее период или суммарная загрузка шины больше 100 %, выдается
+    предупреждение RuntimeWarning: такой план не может выполняться с
+    требуемыми периодами.
+    """
+
+    items = sorted((NodeRequirement(*node) for node in nodes),
+                   key=lambda node: (node.period, node.net_id))
+
+    for node in items:
+        if node.period <= 0:
+            msg = f"Node {node.net_id} period must be positive"
+            raise FBusError(msg)
+        if max(node.input_length, node.output_length) > max_length:
+            msg = f"Node {node.net_id} data does not fit into a group"
+            raise FBusError(msg)
+
+    if not 1 <= max_groups <= GROUP_COUNT_MAX:
+        msg = f"Group count limit must be within 1...{GROUP_COUNT_MAX}"
+        raise FBusError(msg)
+
+    count = len(items)
+
+    # Допустимые группы items[first:end] и доля времени шины каждой из них
+    segments: list[list[tuple[int, float]]] = [[] for _ in range(count + 1)]
+    for end in range(1, count + 1):
+        inputs = outputs = 0
+        for first in range(end - 1, -1, -1):
+            inputs += items[first].input_length
+            outputs += items[first].output_length
+            if inputs > max_length or outputs > max_length:
+                break
+
+            bus_time = transaction_time + (inputs + outputs) * byte_time
+            segments[end].append((first, bus_time / items[first].period))
+
+    _, start = _split(segments)
+    bounds = _bounds([start], count)
+
+    if len(bounds) > max_groups:
+        # Разбиение ровно на k групп для k = 1...max_groups
+        starts = []
+        best = math.inf
+        previous = [0.0] + [math.inf] * count
+        for _ in range(max_groups):
+            previous, start = _split(segments, previous)
+            starts.append(start)
+            if previous[count] < best:
+                best = previous[count]
+                bounds = _bounds(starts, count)
+
+        if math.isinf(best):
+            msg = f"{count} nodes do not fit into {max_groups} groups"
+            raise FBusError(msg)
+
+    layout = []
+    groups = []
+    input_offset = output_offset = 0
+
+    for group_id, (first, end) in enumerate(bounds, FBUS_GROUP_ID_MIN):
+        members = sorted(items[first:end], key=lambda node: node.net_id)
+        for node in members:
+            layout.append(NodeLayout(node.net_id, group_id, input_offset, node.input_length,
+                                     output_offset, node.output_length))
+            input_offset += node.input_length
+            output_offset += node.output_length
+
+        inputs = sum(node.input_length for node in members)
+        outputs = sum(node.output_length for node in members)
+        groups.append(GroupInfo(group_id, items[first].period,
+                                tuple(node.net_id for node in members), inputs, outputs,
+                                transaction_time + (inputs + outputs) * byte_time))
+
+    plan = GroupPlan(layout, groups)
+    for group in groups:
+        if group.load > 1:
+            warnings.warn(f"Group {group.group_id:#x} transaction takes "
+                          f"{group.bus_time * 1e3:.3f} ms with period "
+                          f"{group.period * 1e3:.3f} ms", RuntimeWarning, stacklevel=2)
+    if plan.load > 1:
+        warnings.warn(f"Bus load {plan.load * 100:.1f} % exceeds 100 %", RuntimeWarning,
+                      stacklevel=2)
+
+    return plan
+
+
+__all__ = ["GROUP_COUNT_MAX", "GroupInfo", "GroupPlan", "NodeRequirement", "partition"]
@@ -0,0 +1,388 @@
+#! /usr/bin/env python3
+
+"""Запись вызовов FBUS API в двоичную трассу и воспроизведение трассы.
+Fastwel FBUS SDK Версия 2.4.
+
+Формат трассы: заголовок TRACE_HEADER, имена функций (строки, разделенные
+нулевым байтом), затем записи вызовов. Запись состоит из заголовка
+TRACE_RECORD, значений скалярных аргументов (int64, для указателей -
+длина буфера) и буферов: индекс аргумента (uint8), длина (uint32), данные.
+Сохраняются выходные буферы функции и входные буферы, передаваемые в
+модули (выходные данные, параметры, калибровка).
+"""
+
+from __future__ import annotations
+
+from ctypes import ArgumentError, addressof, c_char, c_int, c_size_t, memmove, sizeof
+from operator import itemgetter
+from struct import Struct
+from struct import error as StructError
+from threading import Lock
+from time import monotonic, sleep
+from typing import IO, Callable, NamedTuple
+
+from fbus.client import (Backend, FBusDevice, FBusError, _address, _raise_result, _value,
+                         get_backend)
+from fbus.protocol import FBUS_RESULT
+
+TRACE_MAGIC = b"FBTR"
+TRACE_VERSION = 1
+TRACE_BUFFER_SIZE = 1 << 20     # Размер буфера записи по умолчанию
+
+TRACE_HEADER = Struct("<4sHH")      # Признак, версия, размер таблицы имен функций
+TRACE_RECORD = Struct("<BBBxIdd")   # Функция, число аргументов, число буферов, код возврата, начало и конец вызова
+TRACE_ARGUMENT = Struct("<q")
+TRACE_BLOB = Struct("<BI")          # Индекс аргумента, длина данных
+
+
+class Pointer(NamedTuple):
+    """Аргумент-указатель функции FBUS API."""
+
+    index: int              # Индекс аргумента
+    length: int | type      # Индекс аргумента с длиной буфера или тип ctypes значения
+    output: bool            # Буфер заполняется функцией
+
+
+_POINTERS: dict[str, tuple[Pointer, ...]] = {
+    "fbusGetVersion": (Pointer(0, c_int, True), Pointer(1, c_int, True)),
+    "fbusOpen": (Pointer(1, c_size_t, True),),
+    "fbusRescan": (Pointer(1, c_size_t, True),),
+    "fbusGetNodesCount": (Pointer(1, c_size_t, True),),
+    "fbusGetNodeDescription": (Pointer(2, 3, True),),
+    "fbusGetNodeCommonParameters": (Pointer(2, 3, True),),
+    "fbusSetNodeCommonParameters": (Pointer(2, 3, False),),
+    "fbusGetNodeSpecificParameters": (Pointer(2, 4, True),),
+    "fbusSetNodeSpecificParameters": (Pointer(2, 4, False),),
+    "fbusReadInputs": (Pointer(2, 4, True),),
+    "fbusWriteOutputs": (Pointer(2, 4, False),),
+    "fbusGroup_setNodeOutputs": (Pointer(5, 4, False),),
+    "fbusGroup_getNodeInputs": (Pointer(5, 4, True),),
+    "fbusModuleGetCalibrationData": (Pointer(4, 3, True),),
+    "fbusModuleSetCalibrationData": (Pointer(4, 3, False),),
+    "fbusGetAdapterInfo": (Pointer(1, 2, True),),
+}
+
+_NAMES = list(FBusDevice._functions_)
+
+
+def _scalars(values: tuple) -> tuple:
+    """Значения аргументов для записи с преобразованием только первого из
+    них (обычно это дескриптор сети c_size_t). Остальные объекты ctypes
+    вызывают ошибку упаковки, после которой запись повторяется с _value().
+    """
+
+    if values and values[0].__class__ is not int:
+        return (_value(values[0]), *values[1:])
+
+    return values
+
+
+class Recorder(Backend):
+    """Бэкенд, записывающий все вызовы другого бэкенда в трассу.
+
+    Расположение аргументов и буферов в записи вычисляется для каждой
+    функции один раз при формировании таблицы функций, а данные буферов
+    копируются из аргументов прямо в заранее выделенный буфер записи. Буфер
+    записывается в файл одним вызовом write() при его заполнении, а также
+    при flush() и close() (в том числе при выходе из блока with). Вызовы из
+    нескольких потоков записываются в порядке их завершения.
+    """
+
+    def __init__(self, file: str | IO[bytes], backend: str | Backend | None = None,
+                       buffer_size: int = TRACE_BUFFER_SIZE,
+                       clock: Callable[[], float] = monotonic) -> None:
+        self.backend = get_backend(backend)
+        self.clock = clock
+        self.calls = 0          # Число записанных вызовов
+        self._own = isinstance(file, str)
+        self._file: IO[bytes] = open(file, "wb") if isinstance(file, str) else file
+        self._allocate(max(buffer_size, 4096))
+        self._position = 0
+        self._lock = Lock()
+
+        names = b"\0".join(name.encode() for name in _NAMES)
+        self._file.write(TRACE_HEADER.pack(TRACE_MAGIC, TRACE_VERSION, len(names)))
+        self._file.write(names)
+
+    def __enter__(self) -> Recorder:
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+    def _allocate(self, size: int) -> None:
+        self._buffer = bytearray(size)
+        self._view = memoryview(self._buffer)
+        self._anchor = c_char.from_buffer(self._buffer)    # Запрещает изменение размера буфера
+        self._base = addressof(self._anchor)
+
+    def functions(self) -> dict[str, Callable[..., bool]]:
+        return {name: self._wrap(name, func) for name, func in self.backend.functions().items()}
+
+    def _wrap(self, name: str, func: Callable[..., bool]) -> Callable[..., bool]:
+        record = self._recorder(name)
+        clock = self.clock
+        ok = int(FBUS_RESULT.OK)
+
+        def call(*arguments: object) -> bool:
+            start = clock()
+            try:
+                result = func(*arguments)
+            except FBusError as err:
+                record(arguments, err.result or FBUS_RESULT.SYSTEM_ERROR, start, clock())
+                raise
+
+            record(arguments, ok, start, clock())
+            return result
+
+        call.__name__ = name
+        return call
+
+    def _recorder(self, name: str) -> Callable[[tuple, int, float, float], None]:
+        index = _NAMES.index(name)
+        count = len(FBusDevice._functions_[name]._argtypes_)
+        head = Struct(TRACE_RECORD.format + TRACE_ARGUMENT.format[1:] * count)
+        pointers = _POINTERS.get(name, ())
+        lock = self._lock
+
+        def reserve(size: int) -> int:
+            self._flush()
+            if size > len(self._buffer):
+                self._allocate(size)
+            return 0
+
+        if not pointers:
+            def record(arguments: tuple, result: int, start: float, end: float) -> None:
+                values = _scalars(arguments)
+                with lock:
+                    position = self._position
+                    if position + head.size > len(self._buffer):
+                        position = reserve(head.size)
+                    try:
+                        head.pack_into(self._buffer, position, index, count, 0, result,
+                                       start, end, *values)
+                    except StructError:
+                        head.pack_into(self._buffer, position, index, count, 0, result,
+                                       start, end, *map(_value, values))
+                    self._position = position + head.size
+                    self.calls += 1
+
+            return record
+
+        # Значения аргументов в записи выбираются из аргументов вызова, к
+        # которым добавлены длины буферов постоянного размера. Для указателей
+        # записывается длина буфера
+        constants = tuple(sizeof(pointer.length) for pointer in pointers
+                          if not isinstance(pointer.length, int))
+        sources = list(range(count))
+        extra = count
+        for pointer in pointers:
+            if isinstance(pointer.length, int):
+                sources[pointer.index] = pointer.length
+            else:
+                sources[pointer.index] = extra
+                extra += 1
+        select = itemgetter(*sources)
+
+        # Заголовок первого буфера упаковывается вместе с заголовком записи
+        written = tuple(pointer.index for pointer in pointers)
+        inputs = tuple(pointer.index for pointer in pointers if not pointer.output)
+        layouts = {blobs: Struct(head.format + TRACE_BLOB.format[1:]) if blobs else head
+                   for blobs in (written, inputs)}
+        blob = TRACE_BLOB
+        ok = int(FBUS_RESULT.OK)
+
+        def write(arguments: tuple, values: tuple, blobs: tuple, result: int,
+                  start: float, end: float) -> None:
+            layout = layouts[blobs]
+            size = layout.size + blob.size * (len(blobs) - 1) if blobs else layout.size
+            for number in blobs:
+                size += values[number]
+
+            with lock:
+                position = self._position
+                if position + size > len(self._buffer):
+                    position = reserve(size)
+                buffer = self._buffer
+                if not blobs:
+                    layout.pack_into(buffer, position, index, count, 0, result, start, end,
+                                     *values)
+                    position += layout.size
+
+                for number in blobs:
+                    length = values[number]
+                    if number == blobs[0]:
+                        layout.pack_into(buffer, position, index, count, len(blobs), result,
+                                         start, end, *values, number, length)
+                        position += layout.size
+                    else:
+                        blob.pack_into(buffer, position, number, length)
+                        position += blob.size
+                    try:
+                        memmove(self._base + position, arguments[number], length)
+                    except ArgumentError:   # Структура или скаляр ctypes без byref()
+                        memmove(self._base + position, _address(arguments[number]), length)
+                    position += length
+
+                self._position = position
+                self.calls += 1
+
+        def record(arguments: tuple, result: int, start: float, end: float) -> None:
+            values = _scalars(select(arguments + constants))
+            blobs = written if result == ok else inputs
+            try:
+                write(arguments, values, blobs, result, start, end)
+            except (StructError, TypeError):
+                write(arguments, tuple(map(_value, values)), blobs, result, start, end)
+
+        return record
+
+    def _flush(self) -> None:
+        if self._position:
+            self._file.write(self._view[:self._position])
+            self._position = 0
+
+    def flush(self) -> None:
+        """Записать накопленные вызовы в файл."""
+
+        with self._lock:
+            self._flush()
+            self._file.flush()
+
+    def close(self) -> None:
+        """Записать накопленные вызовы и закрыть файл (если он открыт
+        бэкендом).
+        """
+
+        self.flush()
+        if self._own:
+            self._file.close()
+
+
+class TraceRecord(NamedTuple):
+    """Запись трассы."""
+
+    name: str                       # Имя функции
+    arguments: tuple[int, ...]      # Скалярные аргументы (для указателей - длина буфера)
+    buffers: dict[int, bytes]       # Буферы по индексам аргументов
+    result: int                     # Код возврата FBUS_RESULT
+    start: float                    # Начало вызова (monotonic), с
+    end: float                      # Конец вызова (monotonic), с
+
+
+def read_trace(data: bytes) -> list[TraceRecord]:
+    """Разобрать трассу."""
+
+    magic, version, names_size = TRACE_HEADER.unpack_from(data)
+    if magic != TRACE_MAGIC or version != TRACE_VERSION:
+        msg = "Not a FBUS trace or unsupported trace version"
+        raise FBusError(msg)
+
+    position = TRACE_HEADER.size
+    names = data[position:position + names_size].decode().split("\0")
+    position += names_size
+
+    records = []
+    while position < len(data):
+        index, count, blobs, result, start, end = TRACE_RECORD.unpack_from(data, position)
+        position += TRACE_RECORD.size
+        arguments = tuple(value for (value,) in TRACE_ARGUMENT.iter_unpack(
+            data[position:position + TRACE_ARGUMENT.size * count]))
+        position += TRACE_ARGUMENT.size * count
+
+        buffers = {}
+        for _ in range(blobs):
+            number, length = TRACE_BLOB.unpack_from(data, position)
+            position += TRACE_BLOB.size
+            buffers[number] = data[position:position + length]
+            position += length
+
+        records.append(TraceRecord(names[index], arguments, buffers, result, start, end))
+
+    return records
+
+
+class Replay(Backend):
+    """Бэкенд, воспроизводящий трассу Recorder.
+
+    Каждый вызов должен совпадать с очередной записью трассы по имени функции
+    (и при strict - по значениям скалярных аргументов), иначе вызывается
+    FBusError. Выходные буферы записи копируются в аргументы вызова, код
+    возврата записи возвращается вызывающему. При pace вызовы выполняются не
+    раньше, чем в записанное время относительно первого вызова.
+    """
+
+    def __init__(self, file: str | bytes, pace: bool = False, strict: bool = True,
+                       clock: Callable[[], float] = monotonic,
+                       delay: Callable[[float], None] = sleep) -> None:
+        if isinstance(file, str):
+            with open(file, "rb") as trace:
+                file = trace.read()
+
+        self.records = read_trace(file)
+        self.position = 0           # Индекс следующей записи
+        self.pace = pace
+        self.strict = strict
+        self.clock = clock
+        self.delay = delay
+        self._origin: tuple[float, float] | None = None
+        self._lock = Lock()
+
+    @property
+    def done(self) -> bool:
+        """Все записи трассы воспроизведены."""
+
+        return self.position >= len(self.records)
+
+    def functions(self) -> dict[str, Callable[..., bool]]:
+        return {name: self._replayer(name) for name in _NAMES}
+
+    def _next(self, name: str, arguments: tuple) -> TraceRecord:
+        with self._lock:
+            if self.done:
+                msg = f"{name} called after the end of the trace"
+                raise FBusError(msg)
+
+            record = self.records[self.position]
+            if record.name != name:
+                msg = f"Trace mismatch at call {self.position}: {name} instead of {record.name}"
+                raise FBusError(msg)
+            self.position += 1
+
+        if self.strict:
+            pointers = {pointer.index for pointer in _POINTERS.get(name, ())}
+            values = tuple(record.arguments[number] if number in pointers else _value(argument)
+                           for number, argument in enumerate(arguments))
+            if values != record.arguments:
+                msg = f"{name} arguments {values} differ from the trace {record.arguments}"
+                raise FBusError(msg)
+
+        return record
+
+    def _replayer(self, name: str) -> Callable[..., bool]:
+        pointers = _POINTERS.get(name, ())
+
+        def call(*arguments: object) -> bool:
+            record = self._next(name, arguments)
+
+            if self.pace:
+                if self._origin is None:
+                    self._origin = (self.clock(), record.start)
+                wait = record.end - self._origin[1] - (self.clock() - self._origin[0])
+                if wait > 0:
+                    self.delay(wait)
+
+            for pointer in pointers:
+                data = record.buffers.get(pointer.index)
+                if pointer.output and data is not None:
+                    memmove(_address(arguments[pointer.index]), data, len(data))
+
+            if record.result:
+                _raise_result(name, record.result)
+            return True
+
+        call.__name__ = name
+        return call
+
+
+__all__ = ["Pointer", "Recorder", "Replay", "TraceRecord", "read_trace"]
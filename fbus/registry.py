@@ -0,0 +1,94 @@
+#! /usr/bin/env python3
+
+"""Соответствие типов модулей FIO_MODULE_TYPE структурам из fbus.device.
+Fastwel FBUS SDK Версия 2.4.
+
+Модуль fbus.device импортируется только при первом обращении к его типу.
+"""
+
+from __future__ import annotations
+
+from ctypes import Structure, sizeof
+from functools import lru_cache
+from importlib import import_module
+from typing import NamedTuple
+
+from fbus.client import FBusError
+from fbus.protocol import FIO_MODULE_DESC, FIO_MODULE_TYPE
+
+
+class DeviceLayouts(NamedTuple):
+    """Структуры модуля определенного типа."""
+
+    module: str                                 # Модуль с определениями структур
+    inputs: type[Structure] | None              # Область входных данных *_INPUTS
+    outputs: type[Structure] | None             # Область выходных данных *_OUTPUTS
+    configuration: type[Structure] | None       # Область конфигурации *_CONFIGURATION
+
+
+# Модуль fbus.device и префикс имен структур для типов, имена которых не
+# совпадают с именем модуля. Значение None - структуры не определены.
+_modules: dict[int, tuple[str, str] | None] = {
+    FIO_MODULE_TYPE.UNKNOWN: None,
+    FIO_MODULE_TYPE.AIM732: None,
+    FIO_MODULE_TYPE.AIM72503: ("fbus.device.aim725", "AIM725"),
+    FIO_MODULE_TYPE.NIM741: ("fbus.device.nim74x", "NIM74X"),
+    FIO_MODULE_TYPE.NIM742: ("fbus.device.nim74x", "NIM74X"),
+}
+
+
+def register_device(module_type: int, module: str, prefix: str) -> None:
+    """Зарегистрировать модуль module со структурами <prefix>_INPUTS,
+    <prefix>_OUTPUTS и <prefix>_CONFIGURATION для типа module_type.
+    """
+
+    _modules[module_type] = (module, prefix)
+    layouts_of.cache_clear()
+
+
+@lru_cache(maxsize=None)
+def layouts_of(module_type: int) -> DeviceLayouts:
+    """Структуры модуля типа module_type."""
+
+    try:
+        name = FIO_MODULE_TYPE(module_type).name
+    except ValueError:
+        name = None
+
+    location = _modules.get(module_type, (f"fbus.device.{name.lower()}", name) if name else None)
+    if location is None:
+        msg = f"No device layouts are defined for module type {module_type}"
+        raise FBusError(msg)
+
+    module, prefix = location
+    device = import_module(module)
+    return DeviceLayouts(module,
+                         getattr(device, f"{prefix}_INPUTS", None),
+                         getattr(device, f"{prefix}_OUTPUTS", None),
+                         getattr(device, f"{prefix}_CONFIGURATION", None))
+
+
+def check_sizes(layouts: DeviceLayouts, descr: FIO_MODULE_DESC) -> None:
+    """Проверить соответствие размеров структур размерам областей данных,
+    сообщенным модулем.
+    """
+
+    for layout, size in ((layouts.inputs, descr.InputsSize),
+                         (layouts.outputs, descr.OutputsSize)):
+        actual = sizeof(layout) if layout is not None else 0
+        if actual != size:
+            name = layout.__name__ if layout is not None else "missing layout"
+            msg = (f"{name} size {actual} does not match size {size} "
+                   f"reported by {descr.TypeName.decode(errors='replace')}")
+            raise FBusError(msg)
+
+
+def layouts_for(descr: FIO_MODULE_DESC) -> DeviceLayouts:
+    """Структуры модуля по его описанию с проверкой размеров."""
+
+    layouts = layouts_of(descr.Type)
+    check_sizes(layouts, descr)
+    return layouts
+
+
+__all__ = ["DeviceLayouts", "check_sizes", "layouts_for", "layouts_of", "register_device"]
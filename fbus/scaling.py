@@ -0,0 +1,264 @@
+#! /usr/bin/env python3
+
+"""Пересчет кодов аналоговых модулей в физические величины.
+Fastwel FBUS SDK Версия 2.4.
+
+Требуется пакет numpy.
+"""
+
+from __future__ import annotations
+
+from ctypes import Structure
+from typing import TYPE_CHECKING, Callable, NamedTuple
+
+import numpy as np
+
+from fbus.client import FBusError
+from fbus.device.aim720 import AIM720_CONFIGURATION, AIM720_INPUTS, AIM720_RANGE
+from fbus.device.aim730 import AIM730_CONFIGURATION, AIM730_INPUTS, AIM730_OUTPUT_RANGE
+from fbus.device.aim731 import AIM731_CONFIGURATION, AIM731_INPUTS, AIM731_OUTPUT_RANGE
+from fbus.device.aim733 import AIM733_CONFIGURATION, AIM733_INPUT_RANGE, AIM733_INPUTS
+from fbus.device.aim791 import AIM791_CONFIGURATION, AIM791_INPUTS, AIM791_RANGE
+from fbus.device.aim792 import AIM792_CONFIGURATION, AIM792_INPUTS, AIM792_RANGE
+from fbus.dtypes import frombuffer
+from fbus.protocol import FIO_MODULE_TYPE
+
+if TYPE_CHECKING:
+    from fbus.client import FBUS, Buffer
+
+
+class RangeSpec(NamedTuple):
+    """Линейная шкала диапазона: код 0...full_scale соответствует low...high."""
+
+    low: float          # Значение при нулевом коде
+    high: float         # Значение при коде full_scale
+    full_scale: int     # Максимальный код (маска значащих разрядов)
+    unit: str           # Единица измерения
+
+
+class ModuleScale(NamedTuple):
+    """Описание шкал типа модуля."""
+
+    inputs: type[Structure]                     # Структура входных данных
+    configuration: type[Structure]              # Структура конфигурации
+    channels: tuple[str, ...]                   # Поля входных данных с кодами каналов
+    ranges: Callable[[Structure], list[int]]    # Коды диапазонов каналов из конфигурации
+    specs: dict[int, RangeSpec]                 # Шкала для каждого кода диапазона
+
+
+def _uniform(field: str, count: int) -> Callable[[Structure], list[int]]:
+    return lambda config: [getattr(config, field)] * count
+
+
+def _fields(*fields: str) -> Callable[[Structure], list[int]]:
+    return lambda config: [getattr(config, field) for field in fields]
+
+
+def _array(field: str) -> Callable[[Structure], list[int]]:
+    return lambda config: list(getattr(config, field))
+
+
+_CODE12 = 0x0FFF
+_CODE16 = 0xFFFF
+_CODE24 = 0xFFFFFF
+
+# Значащие разряды кодов: AIM720 - 12 младших разрядов, AIM733 - 24 младших
+# разряда (старшие содержат диагностику канала), остальные - полное слово.
+_scales: dict[int, ModuleScale] = {
+    FIO_MODULE_TYPE.AIM720: ModuleScale(
+        AIM720_INPUTS, AIM720_CONFIGURATION,
+        ("voltageInput0", "voltageInput1", "voltageInput2"),
+        _uniform("inputsRange", 3),
+        {AIM720_RANGE.V0_5: RangeSpec(0.0, 5.0, _CODE12, "V"),
+         AIM720_RANGE.V0_10: RangeSpec(0.0, 10.0, _CODE12, "V"),
+         AIM720_RANGE.VM5_5: RangeSpec(-5.0, 5.0, _CODE12, "V"),
+         AIM720_RANGE.VM10_10: RangeSpec(-10.0, 10.0, _CODE12, "V")}),
+    FIO_MODULE_TYPE.AIM730: ModuleScale(
+        AIM730_INPUTS, AIM730_CONFIGURATION,
+        ("outputValue0", "outputValue1"),
+        _fields("outputRange0", "outputRange1"),
+        {AIM730_OUTPUT_RANGE.MA0_20: RangeSpec(0.0, 20.0, _CODE16, "mA"),
+         AIM730_OUTPUT_RANGE.MA4_20: RangeSpec(4.0, 20.0, _CODE16, "mA")}),
+    FIO_MODULE_TYPE.AIM731: ModuleScale(
+        AIM731_INPUTS, AIM731_CONFIGURATION,
+        ("outputValue0", "outputValue1"),
+        _fields("outputRange0", "outputRange1"),
+        {AIM731_OUTPUT_RANGE.V0_10: RangeSpec(0.0, 10.0, _CODE16, "V"),
+         AIM731_OUTPUT_RANGE.VDIFF10: RangeSpec(-10.0, 10.0, _CODE16, "V")}),
+    FIO_MODULE_TYPE.AIM733: ModuleScale(
+        AIM733_INPUTS, AIM733_CONFIGURATION,
+        ("input0", "input1", "input2", "input3"),
+        _fields("range0", "range1", "range2", "range3"),
+        {AIM733_INPUT_RANGE.V0_5: RangeSpec(0.0, 5.0, _CODE24, "V"),
+         AIM733_INPUT_RANGE.V0_2D5: RangeSpec(0.0, 2.5, _CODE24, "V")}),
+    FIO_MODULE_TYPE.AIM791: ModuleScale(
+        AIM791_INPUTS, AIM791_CONFIGURATION,
+        ("values",),
+        _array("channelRanges"),
+        {AIM791_RANGE.MA0_5: RangeSpec(0.0, 5.0, _CODE16, "mA"),
+         AIM791_RANGE.MA0_20: RangeSpec(0.0, 20.0, _CODE16, "mA"),
+         AIM791_RANGE.MA4_20: RangeSpec(4.0, 20.0, _CODE16, "mA")}),
+    FIO_MODULE_TYPE.AIM792: ModuleScale(
+        AIM792_INPUTS, AIM792_CONFIGURATION,
+        ("values",),
+        _array("channelRanges"),
+        {AIM792_RANGE.V0_5: RangeSpec(0.0, 5.0, _CODE16, "V"),
+         AIM792_RANGE.V0_10: RangeSpec(0.0, 10.0, _CODE16, "V"),
+         AIM792_RANGE.VDIFF5: RangeSpec(-5.0, 5.0, _CODE16, "V"),
+         AIM792_RANGE.VDIFF10: RangeSpec(-10.0, 10.0, _CODE16, "V")}),
+}
+
+
+def register_scale(module_type: int, scale: ModuleScale) -> None:
+    """Зарегистрировать (или заменить) шкалы типа модуля."""
+
+    _scales[module_type] = scale
+
+
+def get_scale(module_type: int) -> ModuleScale:
+    """Описание шкал типа модуля."""
+
+    try:
+        return _scales[module_type]
+    except KeyError:
+        msg = f"No scaling is defined for module type {module_type}"
+        raise FBusError(msg) from None
+
+
+class NodeScale:
+    """Шкалы каналов одного модуля.
+
+    Коэффициенты всех каналов хранятся в массивах gain и offset, поэтому
+    пакет кодов любой длины пересчитывается одной векторной операцией:
+    value = offset + (code & mask) * gain.
+    """
+
+    def __init__(self, scale: ModuleScale, ranges: list[int]) -> None:
+        count = self._count(scale)
+        if len(ranges) < count:
+            msg = "Number of ranges does not match the number of channels"
+            raise FBusError(msg)
+
+        try:
+            specs = [scale.specs[code] for code in ranges[:count]]
+        except KeyError as exc:
+            msg = f"Unknown range code {exc.args[0]}"
+            raise FBusError(msg) from None
+
+        self.scale = scale
+        self.ranges = ranges
+        self.specs = specs
+        self.units = [spec.unit for spec in specs]
+        self.mask = np.array([spec.full_scale for spec in specs], np.uint32)
+        self.gain = np.array([(spec.high - spec.low) / spec.full_scale for spec in specs])
+        self.offset = np.array([spec.low for spec in specs])
+
+    @staticmethod
+    def _count(scale: ModuleScale) -> int:
+        return sum(_field_count(scale.inputs, field) for field in scale.channels)
+
+    @property
+    def count(self) -> int:
+        """Число каналов."""
+
+        return len(self.specs)
+
+    def convert(self, codes: np.ndarray, channel: int | None = None) -> np.ndarray:
+        """Пересчитать коды в физические величины.
+
+        При channel=None последняя ось codes соответствует каналам модуля,
+        иначе все коды относятся к каналу channel.
+        """
+
+        codes = np.asarray(codes)
+        if channel is None:
+            return self.offset + (codes & self.mask) * self.gain
+
+        return self.offset[channel] + (codes & self.mask[channel]) * self.gain[channel]
+
+    def encode(self, values: np.ndarray, channel: int | None = None) -> np.ndarray:
+        """Обратный пересчет физических величин в коды (например, для выходов
+        AIM730/AIM731) с ограничением диапазоном шкалы.
+        """
+
+        values = np.asarray(values, np.float64)
+        if channel is None:
+            mask, gain, offset = self.mask, self.gain, self.offset
+        else:
+            mask, gain, offset = self.mask[channel], self.gain[channel], self.offset[channel]
+
+        codes = np.rint((values - offset) / gain)
+        return np.clip(codes, 0, mask).astype(np.uint32)
+
+    def codes(self, records: np.ndarray) -> np.ndarray:
+        """Матрица кодов (записи x каналы) из массива записей входных данных."""
+
+        columns = [records[field].reshape(len(records), -1) for field in self.scale.channels]
+        return np.concatenate(columns, axis=1)
+
+    def decode(self, data: Buffer | bytes | np.ndarray, offset: int = 0,
+                     count: int = -1) -> np.ndarray:
+        """Физические величины (записи x каналы) из сырых входных данных модуля
+        или массива записей (например, окна истории).
+        """
+
+        records = data if isinstance(data, np.ndarray) else \
+            frombuffer(self.scale.inputs, data, offset, count)
+        return self.convert(self.codes(records))
+
+
+def _field_count(layout: type[Structure], field: str) -> int:
+    for name, ctype, *_ in layout._fields_:
+        if name == field:
+            return getattr(ctype, "_length_", 1)
+
+    msg = f"{layout.__name__} has no field {field}"
+    raise FBusError(msg)
+
+
+class Scaler:
+    """Пересчет кодов модулей сети с кэшированием шкал.
+
+    Тип модуля и коды диапазонов читаются из конфигурации сети один раз при
+    первом обращении к модулю. После изменения конфигурации модуля следует
+    вызвать invalidate().
+    """
+
+    def __init__(self, bus: FBUS) -> None:
+        self._bus = bus
+        self._nodes: dict[int, NodeScale] = {}
+
+    def node(self, net_id: int, module_type: int | None = None) -> NodeScale:
+        """Шкалы модуля net_id."""
+
+        node = self._nodes.get(net_id)
+        if node is None:
+            if module_type is None:
+                module_type = self._bus.fbusGetNodeDescription(net_id).Type
+            scale = get_scale(module_type)
+            config = self._bus.fbusGetNodeSpecificParameters(net_id, scale.configuration)
+            node = self._nodes[net_id] = NodeScale(scale, scale.ranges(config))
+
+        return node
+
+    def convert(self, net_id: int, codes: np.ndarray, channel: int | None = None) -> np.ndarray:
+        """Пересчитать коды модуля net_id в физические величины."""
+
+        return self.node(net_id).convert(codes, channel)
+
+    def decode(self, net_id: int, data: Buffer | bytes | np.ndarray, offset: int = 0,
+                     count: int = -1) -> np.ndarray:
+        """Физические величины из сырых входных данных модуля net_id."""
+
+        return self.node(net_id).decode(data, offset, count)
+
+    def invalidate(self, net_id: int | None = None) -> None:
+        """Сбросить кэш шкал модуля (или всех модулей)."""
+
+        if net_id is None:
+            self._nodes.clear()
+        else:
+            self._nodes.pop(net_id, None)
+
+
+__all__ = ["ModuleScale", "NodeScale", "RangeSpec", "Scaler", "get_scale", "register_scale"]
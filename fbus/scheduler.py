@@ -0,0 +1,252 @@
+#! /usr/bin/env python3
+
+"""Многочастотный циклический планировщик обмена по шине FBUS.
+Fastwel FBUS SDK Версия 2.4.
+"""
+
+from __future__ import annotations
+
+from collections import deque
+from ctypes import Structure
+from functools import partial
+from math import gcd
+from threading import Event
+from time import monotonic, sleep
+from typing import TYPE_CHECKING, Callable, NamedTuple
+
+from fbus.client import FBusError
+
+if TYPE_CHECKING:
+    from fbus.client import FBUS, Buffer
+    from fbus.image import ProcessImage
+
+TIME_QUANTUM = 1e-4     # Дискретность задания периодов, с
+HYPERPERIOD_MAX = 10000 # Наибольшее число тактов в гиперпериоде
+
+
+class Overrun(NamedTuple):
+    """Превышение длительности такта планировщика."""
+
+    tick: int           # Номер такта
+    lateness: float     # Время, на которое выполнение такта вышло за его границу, с
+
+
+class Task:
+    """Периодическое действие планировщика."""
+
+    def __init__(self, name: str, period: float, action: Callable[[], object],
+                       cost: float = 1.0) -> None:
+        self.name = name
+        self.period = period
+        self.action = action
+        self.cost = cost        # Относительная стоимость действия для распределения по тактам
+        self.multiple = 1       # Период в тактах планировщика
+        self.phase = 0          # Номер такта внутри периода, в котором выполняется действие
+        self.runs = 0
+        self.overdue = 0        # Число пропущенных из-за превышений выполнений
+
+    def __repr__(self) -> str:
+        return (f"Task({self.name!r}, period={self.period}, multiple={self.multiple}, "
+                f"phase={self.phase})")
+
+
+class Scheduler:
+    """Циклический планировщик с индивидуальным периодом для каждой группы
+    или модуля.
+
+    Такт планировщика равен наибольшему общему делителю периодов задач.
+    Задача с периодом в N тактов выполняется в одном из N тактов, причем
+    медленные задачи распределяются по тактам так, чтобы выровнять нагрузку
+    (гармоническое мультиплексирование). Гиперпериод (наименьшее общее
+    кратное периодов в тактах) не должен превышать HYPERPERIOD_MAX тактов,
+    иначе add() вызывает FBusError; такты без задач не ожидаются. Сроки отсчитываются по монотонным часам; такты, выполнение
+    которых вышло за свою границу, фиксируются как превышения. Задачи
+    пропущенных тактов выполняются один раз сразу после превышения, число
+    пропущенных выполнений каждой задачи учитывается в Task.overdue.
+    """
+
+    def __init__(self, bus: FBUS, history: int = 1000) -> None:
+        self._bus = bus
+        self.tasks: list[Task] = []
+        self.tick_period = 0.0
+        self.hyperperiod = 1
+        self.ticks = 0
+        self.missed = 0
+        self.max_lateness = 0.0
+        self.overruns: deque[Overrun] = deque(maxlen=history)
+        self._slots: list[list[Task]] = []
+        self._ahead: list[int] = []     # Число тактов до ближайшего такта с задачами
+        self._stop = Event()
+
+    def add(self, name: str, period: float, action: Callable[[], object],
+                  cost: float = 1.0) -> Task:
+        """Добавить произвольное периодическое действие."""
+
+        if period < TIME_QUANTUM:
+            msg = f"Task {name!r} period is too small"
+            raise FBusError(msg)
+
+        task = Task(name, period, action, cost)
+        self.tasks.append(task)
+        try:
+            self._plan()
+        except FBusError:
+            self.tasks.remove(task)
+            self._plan()
+            raise
+
+        return task
+
+    def add_group(self, group_id: int, period: float,
+                        image: ProcessImage | None = None) -> Task:
+        """Добавить групповой обмен. Если указан образ процесса, данные группы
+        передаются через него, иначе выполняется только fbusProcessGroup.
+        """
+
+        if image is not None:
+            action = partial(image.exchange_group, group_id)
+        else:
+            action = partial(self._bus.fbusProcessGroup, group_id)
+
+        return self.add(f"group {group_id:#x}", period, action)
+
+    def add_node(self, net_id: int, period: float, dest: Buffer | Structure,
+                       buffer_offset: int = 0, length: int | None = None) -> Task:
+        """Добавить индивидуальное чтение входов модуля в буфер dest со
+        смещения buffer_offset.
+        """
+
+        action = partial(self._bus.fbusReadInputsInto, net_id, dest, buffer_offset, length)
+        return self.add(f"node {net_id}", period, action)
+
+    def add_image(self, image: ProcessImage, periods: dict[int, float]) -> list[Task]:
+        """Добавить групповой обмен для всех групп образа процесса с периодами
+        periods (например, GroupPlan.periods()).
+        """
+
+        return [self.add_group(group_id, periods[group_id], image)
+                for group_id in image.groups]
+
+    def _plan(self) -> None:
+        quanta = [max(1, round(task.period / TIME_QUANTUM)) for task in self.tasks]
+        base = 0
+        for quantum in quanta:
+            base = gcd(base, quantum)
+
+        hyperperiod = 1
+        for quantum in quanta:
+            hyperperiod = hyperperiod * (quantum // base) // gcd(hyperperiod, quantum // base)
+            if hyperperiod > HYPERPERIOD_MAX:
+                periods = ", ".join(f"{task.period:g}" for task in self.tasks)
+                msg = (f"Hyperperiod of periods {periods} s is too long: more than "
+                       f"{HYPERPERIOD_MAX} ticks of {base * TIME_QUANTUM:g} s")
+                raise FBusError(msg)
+
+        self.tick_period = base * TIME_QUANTUM
+        self.hyperperiod = hyperperiod
+        for task, quantum in zip(self.tasks, quanta):
+            task.multiple = quantum // base
+
+        # Медленные задачи размещаются последними в наименее загруженные такты
+        load = [0.0] * self.hyperperiod
+        for task in sorted(self.tasks, key=lambda task: (task.multiple, -task.cost)):
+            task.phase = min(range(task.multiple),
+                             key=lambda phase: max(load[phase::task.multiple]))
+            for tick in range(task.phase, self.hyperperiod, task.multiple):
+                load[tick] += task.cost
+
+        self._slots = [[task for task in self.tasks
+                        if tick % task.multiple == task.phase]
+                       for tick in range(self.hyperperiod)]
+
+        self._ahead = [0] * self.hyperperiod
+        distance = 0
+        for tick in range(2 * self.hyperperiod - 1, -1, -1):
+            distance = 0 if self._slots[tick % self.hyperperiod] else distance + 1
+            self._ahead[tick % self.hyperperiod] = distance
+
+    def cycle(self, tick: int) -> None:
+        """Выполнить задачи такта с номером tick."""
+
+        for task in self._slots[tick % self.hyperperiod]:
+            task.action()
+            task.runs += 1
+
+    def run(self, cycles: int | None = None) -> None:
+        """Выполнять такты до вызова stop() или до выполнения cycles тактов
+        с задачами.
+        """
+
+        if not self.tasks:
+            msg = "No tasks to schedule"
+            raise FBusError(msg)
+
+        self._stop.clear()
+        period = self.tick_period
+        hyperperiod = self.hyperperiod
+        ahead = self._ahead
+        start = monotonic()
+        tick = ahead[0]
+        done = 0
+
+        while not self._stop.is_set() and (cycles is None or done < cycles):
+            delay = start + tick * period - monotonic()
+            if delay > 0:
+                sleep(delay)
+
+            self.cycle(tick)
+            self.ticks += 1
+            done += 1
+
+            following = tick + 1
+            now = monotonic()
+            deadline = start + following * period
+            if now > deadline:
+                lateness = now - deadline
+                self.overruns.append(Overrun(tick, lateness))
+                self.max_lateness = max(self.max_lateness, lateness)
+
+                current = max(int((now - start) / period), following)
+                self.missed += current - following
+                self._catch_up(following, current)
+                following = current
+
+            tick = following + ahead[following % hyperperiod]
+
+    def _catch_up(self, first: int, end: int) -> None:
+        """Выполнить один раз задачи пропущенных тактов first...end - 1,
+        кроме тех, что выполняются в такте end.
+        """
+
+        if first >= end:
+            return
+
+        for task in self.tasks:
+            multiple, phase = task.multiple, task.phase
+            count = (end - 1 - phase) // multiple - (first - 1 - phase) // multiple
+            if not count:
+                continue
+
+            task.overdue += count
+            if end % multiple != phase:
+                task.action()
+                task.runs += 1
+
+    def stop(self) -> None:
+        """Остановить выполнение run() после завершения текущего такта."""
+
+        self._stop.set()
+
+    def reset_statistics(self) -> None:
+        """Сбросить счетчики тактов и превышений."""
+
+        self.ticks = 0
+        self.missed = 0
+        self.max_lateness = 0.0
+        self.overruns.clear()
+        for task in self.tasks:
+            task.runs = 0
+            task.overdue = 0
+
+
+__all__ = ["Overrun", "Scheduler", "Task"]
@@ -0,0 +1,253 @@
+#! /usr/bin/env python3
+
+"""Образ процесса в разделяемой памяти для чтения из других процессов.
+Fastwel FBUS SDK Версия 2.4.
+"""
+
+from __future__ import annotations
+
+import os
+import sys
+from ctypes import Structure, c_double, c_uint8, c_uint32, c_uint64, sizeof
+from multiprocessing import resource_tracker
+from multiprocessing.shared_memory import SharedMemory
+from time import monotonic, sleep, time
+from typing import TYPE_CHECKING, TypeVar
+
+from fbus.client import FBusError
+from fbus.protocol import FIO_MODULE_TYPE
+
+if TYPE_CHECKING:
+    import numpy as np
+
+    from fbus.image import ProcessImage
+
+SHM_MAGIC = 0x46425553  # "FBUS"
+SHM_VERSION = 1
+
+# Число опросов счетчика seqlock до передачи управления другим потокам
+_SPIN_COUNT = 100
+
+_S = TypeVar("_S", bound=Structure)
+
+# До Python 3.13 каждый процесс, подключившийся к сегменту, регистрирует его
+# в resource_tracker, который удаляет сегмент при завершении процесса
+_TRACKED = sys.version_info < (3, 13) and os.name == "posix"
+
+
+class SHM_HEADER(Structure):
+    """Заголовок сегмента разделяемой памяти."""
+
+    _fields_ = [
+        ("magic", c_uint32),            # Признак сегмента SHM_MAGIC
+        ("version", c_uint32),          # Версия формата сегмента
+        ("sequence", c_uint64),         # Счетчик seqlock: нечетное значение - идет запись
+        ("cycle", c_uint64),            # Номер опубликованного цикла
+        ("monotonic", c_double),        # Время публикации по монотонным часам, с
+        ("wall", c_double),             # Время публикации по системным часам, с
+        ("node_count", c_uint32),       # Число записей в таблице модулей
+        ("inputs_offset", c_uint32),    # Смещение входного образа от начала сегмента
+        ("inputs_size", c_uint32),      # Размер входного образа
+        ("outputs_offset", c_uint32),   # Смещение выходного образа от начала сегмента
+        ("outputs_size", c_uint32),     # Размер выходного образа
+    ]
+
+
+class SHM_NODE(Structure):
+    """Запись таблицы модулей сегмента."""
+
+    _fields_ = [
+        ("net_id", c_uint8),            # Идентификатор модуля в сети
+        ("group_id", c_uint8),          # Идентификатор группы
+        ("type", c_uint32),             # Тип модуля FIO_MODULE_TYPE
+        ("input_offset", c_uint32),     # Смещение входных данных модуля во входном образе
+        ("input_length", c_uint32),     # Длина входных данных модуля
+        ("output_offset", c_uint32),    # Смещение выходных данных модуля в выходном образе
+        ("output_length", c_uint32),    # Длина выходных данных модуля
+    ]
+
+
+def _attach(name: str) -> SharedMemory:
+    if sys.version_info >= (3, 13):
+        return SharedMemory(name, track=False)
+
+    shm = SharedMemory(name)
+    if _TRACKED:    # Иначе при завершении читателя сегмент писателя был бы удален
+        resource_tracker.unregister(shm._name, "shared_memory")
+    return shm
+
+
+class SharedImageWriter:
+    """Публикация образа процесса в сегмент разделяемой памяти.
+
+    Сегмент содержит заголовок SHM_HEADER с счетчиком seqlock и временем
+    цикла, таблицу модулей SHM_NODE, построенную по размещению образа и типам
+    модулей из FIO_MODULE_DESC, и копии входного и выходного образов.
+    """
+
+    def __init__(self, image: ProcessImage, name: str | None = None,
+                       types: dict[int, int] | None = None) -> None:
+        self.image = image
+        types = types or {}
+
+        table = sizeof(SHM_HEADER) + sizeof(SHM_NODE) * len(image.layout)
+        inputs_offset = (table + 7) & ~7
+        outputs_offset = (inputs_offset + len(image.inputs) + 7) & ~7
+        size = max(outputs_offset + len(image.outputs), 1)
+
+        self.shm = SharedMemory(name, create=True, size=size)
+        self.header = SHM_HEADER.from_buffer(self.shm.buf)
+        self.header.magic = SHM_MAGIC
+        self.header.version = SHM_VERSION
+        self.header.node_count = len(image.layout)
+        self.header.inputs_offset = inputs_offset
+        self.header.inputs_size = len(image.inputs)
+        self.header.outputs_offset = outputs_offset
+        self.header.outputs_size = len(image.outputs)
+
+        nodes = (SHM_NODE * len(image.layout)).from_buffer(self.shm.buf, sizeof(SHM_HEADER))
+        for entry, node in zip(nodes, image.layout):
+            entry.net_id = node.net_id
+            entry.group_id = node.group_id
+            entry.type = types.get(node.net_id, FIO_MODULE_TYPE.UNKNOWN)
+            entry.input_offset = node.input_offset
+            entry.input_length = node.input_length
+            entry.output_offset = node.output_offset
+            entry.output_length = node.output_length
+        del nodes
+
+        self._inputs = self.shm.buf[inputs_offset:inputs_offset + len(image.inputs)]
+        self._outputs = self.shm.buf[outputs_offset:outputs_offset + len(image.outputs)]
+
+    @property
+    def name(self) -> str:
+        """Имя сегмента для подключения читателей."""
+
+        return self.shm.name
+
+    def publish(self) -> int:
+        """Скопировать текущий образ процесса в сегмент. Возвращает номер цикла."""
+
+        header = self.header
+        header.sequence += 1
+        self._inputs[:] = self.image.inputs
+        self._outputs[:] = self.image.outputs
+        header.cycle += 1
+        header.monotonic = monotonic()
+        header.wall = time()
+        header.sequence += 1
+        return header.cycle
+
+    def close(self, unlink: bool = True) -> None:
+        """Отключиться от сегмента и (по умолчанию) удалить его."""
+
+        self._inputs.release()
+        self._outputs.release()
+        del self.header
+        self.shm.close()
+        if unlink:
+            if _TRACKED:
+                # Читатели, запущенные из этого процесса, используют тот же
+                # resource_tracker и могли снять регистрацию сегмента
+                resource_tracker.register(self.shm._name, "shared_memory")
+            self.shm.unlink()
+
+
+class SharedImageReader:
+    """Чтение образа процесса из сегмента разделяемой памяти.
+
+    Массивы NumPy отображаются на сегмент без копирования и только для
+    чтения, структуры ctypes возвращаются копиями. Согласованность данных
+    проверяется по счетчику seqlock: begin() возвращает номер версии перед
+    чтением, а valid() подтверждает, что за время чтения данные не
+    изменились. Перед close() все полученные массивы должны быть освобождены.
+    """
+
+    def __init__(self, name: str) -> None:
+        self.shm = _attach(name)
+        self.header = SHM_HEADER.from_buffer(self.shm.buf)
+        if self.header.magic != SHM_MAGIC or self.header.version != SHM_VERSION:
+            del self.header
+            self.shm.close()
+            msg = f"{name} is not a FBUS process image segment"
+            raise FBusError(msg)
+
+        nodes = (SHM_NODE * self.header.node_count).from_buffer_copy(self.shm.buf,
+                                                                     sizeof(SHM_HEADER))
+        self.nodes = {node.net_id: node for node in nodes}
+        self._view = self.shm.buf.toreadonly()
+
+    def begin(self, timeout: float = 1.0) -> int:
+        """Дождаться окончания записи и вернуть номер версии для valid().
+        Если запись не закончилась за timeout секунд, вызывает FBusError.
+        """
+
+        header = self.header
+        spins = _SPIN_COUNT
+        deadline = None
+        while (sequence := header.sequence) & 1:
+            if spins:
+                spins -= 1
+                continue
+
+            if deadline is None:
+                deadline = monotonic() + timeout
+            elif monotonic() > deadline:
+                msg = f"Process image segment is being written for more than {timeout} s"
+                raise FBusError(msg)
+            sleep(0)
+
+        return sequence
+
+    def valid(self, sequence: int) -> bool:
+        """Данные не изменялись с момента вызова begin()."""
+
+        return self.header.sequence == sequence
+
+    def read(self) -> tuple[int, float, bytes]:
+        """Согласованная копия входного образа: номер цикла, время публикации
+        по монотонным часам и данные.
+        """
+
+        header = self.header
+        start = header.inputs_offset
+        end = start + header.inputs_size
+
+        while True:
+            sequence = self.begin()
+            cycle, stamp = header.cycle, header.monotonic
+            data = bytes(self._view[start:end])
+            if self.valid(sequence):
+                return cycle, stamp, data
+
+    def input_structure(self, net_id: int, layout: type[_S]) -> _S:
+        """Копия входных данных модуля в виде структуры."""
+
+        node = self.nodes[net_id]
+        return layout.from_buffer_copy(self._view, self.header.inputs_offset + node.input_offset)
+
+    def output_structure(self, net_id: int, layout: type[_S]) -> _S:
+        """Копия выходных данных модуля в виде структуры."""
+
+        node = self.nodes[net_id]
+        return layout.from_buffer_copy(self._view, self.header.outputs_offset + node.output_offset)
+
+    def input_array(self, net_id: int, layout: type[Structure]) -> np.ndarray:
+        """Запись NumPy входных данных модуля, отображенная на сегмент только
+        для чтения (требуется пакет numpy).
+        """
+
+        from fbus.dtypes import frombuffer
+
+        node = self.nodes[net_id]
+        return frombuffer(layout, self._view, self.header.inputs_offset + node.input_offset, 1)
+
+    def close(self) -> None:
+        """Отключиться от сегмента."""
+
+        self._view.release()
+        del self.header
+        self.shm.close()
+
+
+__all__ = ["SHM_HEADER", "SHM_NODE", "SharedImageReader", "SharedImageWriter"]
@@ -0,0 +1,719 @@
+#! /usr/bin/env python3
+
+"""Программная модель сетей FBUS для работы без оборудования и libfbus.
+Fastwel FBUS SDK Версия 2.4.
+
+Бэкенд Simulator реализует все функции FBusDevice._functions_ с теми же
+аргументами и кодами FBUS_RESULT, поэтому класс FBUS работает с ним без
+изменений:
+
+    bus = FBUS(Simulator({0: [FIO_MODULE_TYPE.DIM764, FIO_MODULE_TYPE.AIM724]}))
+
+Бэкенд "sim" - один общий для процесса Simulator (shared_simulator()).
+Его сети задаются переменной окружения FBUS_SIM_NETWORKS в виде
+"номер=ТИП,ТИП*n;номер=...", например "1=DIM718,AIM724*4", а при ее
+отсутствии сети 0 и 1 (первый локальный порт и первый порт TCP) содержат
+модули DEFAULT_RACK с моделями поведения из fbus.models.
+"""
+
+from __future__ import annotations
+
+import os
+from ctypes import addressof, c_int, c_size_t, memmove, sizeof, string_at
+from functools import lru_cache
+from random import Random
+from threading import Lock
+from time import monotonic
+from typing import Callable, Iterable, Sequence, Union
+
+from fbus.client import Backend, FBusError, _address, _value
+from fbus.protocol import (FBUS_ADAPTER_INFO, FBUS_GROUP_ID_MAX, FBUS_GROUP_ID_MIN,
+                           FBUS_MAX_NODE_COUNT, FBUS_MULTICAST_ID, FBUS_RESULT,
+                           FBUS_UNDEFINED_GROUP_ID, FBUS_UNDEFINED_SYNC_ID,
+                           FIO_MODULE_COMMON_CONF, FIO_MODULE_DESC, FIO_MODULE_TYPE)
+from fbus.registry import layouts_of
+
+SIM_VERSION = (2, 4)            # Версия FBUS API, сообщаемая fbusGetVersion
+SIM_CALIBRATION_SIZE = 256      # Размер области калибровочных данных модуля
+SIM_GROUP_DATA_MAX = 255        # Максимальный объем данных группы в одном направлении
+SIM_NETWORKS_ENV = "FBUS_SIM_NETWORKS"
+
+# Модули сетей бэкенда "sim" по умолчанию
+DEFAULT_RACK = (FIO_MODULE_TYPE.AIM724, FIO_MODULE_TYPE.DIM718, FIO_MODULE_TYPE.NIM741,
+                FIO_MODULE_TYPE.DIM764)
+
+_OK = FBUS_RESULT.OK
+
+
+def _store(pointer: object, ctype: type, value: int) -> None:
+    ctype.from_address(_address(pointer)).value = value
+
+
+class SimNode:
+    """Виртуальный модуль ввода-вывода.
+
+    Области входных и выходных данных и конфигурации имеют размеры структур
+    из fbus.device для типа модуля. Поведение модуля задается в наследниках
+    переопределением update(), apply_outputs(), configure() и sync().
+    """
+
+    def __init__(self, module_type: int, serial: int = 0) -> None:
+        layouts = layouts_of(module_type)
+
+        self.type = module_type
+        self.layouts = layouts
+        self.serial = serial
+        self.inputs = bytearray(sizeof(layouts.inputs) if layouts.inputs else 0)
+        self.outputs = bytearray(sizeof(layouts.outputs) if layouts.outputs else 0)
+        self.config = bytearray(sizeof(layouts.configuration) if layouts.configuration else 0)
+        self.saved_config = bytes(self.config)
+        self.common = FIO_MODULE_COMMON_CONF()
+        self.common.OutputSync = self.common.InputSync = FBUS_UNDEFINED_SYNC_ID
+        self.common.GroupConf.GroupID = FBUS_UNDEFINED_GROUP_ID
+        self.calibration = bytearray(SIM_CALIBRATION_SIZE)
+        self.calibration_sections: dict[int, bytes] = {}
+        self.calibrating = False
+
+    def description(self) -> FIO_MODULE_DESC:
+        """Описание модуля для fbusGetNodeDescription."""
+
+        descr = FIO_MODULE_DESC()
+        descr.Type = self.type
+        descr.TypeName = FIO_MODULE_TYPE(self.type).name.encode()
+        descr.ProductionCode = self.type
+        descr.SerialNumber = self.serial
+        descr.fbusVer[:] = SIM_VERSION
+        descr.fwVer[:] = (1, 0)
+        descr.SpecificRwSize = len(self.config)
+        descr.InputsSize = len(self.inputs)
+        descr.OutputsSize = len(self.outputs)
+        return descr
+
+    def update(self, now: float) -> None:
+        """Обновить входные данные к моменту now (перед их чтением)."""
+
+    def apply_outputs(self, now: float) -> None:
+        """Применить записанные выходные данные."""
+
+    def configure(self) -> None:
+        """Применить записанную в модуль конфигурацию."""
+
+    def sync(self, sync_id: int, now: float) -> None:
+        """Обработать синхронизирующее сообщение sync_id."""
+
+    def reset(self) -> None:
+        """Сброс модуля: восстановление сохраненной конфигурации и обнуление
+        выходов.
+        """
+
+        self.config[:] = self.saved_config
+        self.outputs[:] = bytes(len(self.outputs))
+        self.calibrating = False
+        self.configure()
+
+
+class _Group:
+    __slots__ = ("built", "inputs", "members", "outputs")
+
+    def __init__(self) -> None:
+        self.members: dict[int, tuple[int, int, int, int]] = {}
+        self.inputs: dict[int, bytearray] = {}
+        self.outputs: dict[int, bytearray] = {}
+        self.built = False
+
+
+class SimNetwork:
+    """Виртуальная сеть: модули в порядке подключения и конфигурация сети."""
+
+    def __init__(self, nodes: Iterable[SimNode]) -> None:
+        self.nodes = list(nodes)
+        if len(self.nodes) > FBUS_MAX_NODE_COUNT:
+            msg = f"A network holds at most {FBUS_MAX_NODE_COUNT} nodes"
+            raise ValueError(msg)
+
+        self.opened = False
+        self.scanned = False
+        self.common: list[FIO_MODULE_COMMON_CONF] = []
+        self.specific: list[bytearray] = []
+        self.groups: dict[int, _Group] = {}
+        self.syncs = 0      # Число переданных синхронизирующих сообщений
+
+    def rescan(self) -> None:
+        """Сканирование: чтение конфигурации модулей в конфигурацию сети."""
+
+        self.scanned = True
+        self.groups.clear()
+        self.common = [FIO_MODULE_COMMON_CONF.from_buffer_copy(node.common) for node in self.nodes]
+        self.specific = [bytearray(node.config) for node in self.nodes]
+
+
+NodeSpec = Union[int, SimNode]
+
+
+class Simulator(Backend):
+    """Бэкенд с виртуальными сетями модулей.
+
+    networks - словарь номер сети -> список модулей (типов FIO_MODULE_TYPE
+    или объектов SimNode). Номер сети совпадает с номером, который FBUS
+    передает в fbusOpen: 0 для первого локального порта, 100 + n - 1 для
+    локального порта n > 1, номер порта для адаптера TCP.
+
+    Таблица дескрипторов сетей защищена блокировкой, поэтому сети можно
+    открывать и закрывать из нескольких клиентов FBUS одновременно (как у
+    общего для процесса shared_simulator()). Вызовы для одного дескриптора
+    сериализует сам клиент FBUS.
+    """
+
+    def __init__(self, networks: dict[int, Sequence[NodeSpec]] | None = None,
+                       clock: Callable[[], float] = monotonic) -> None:
+        self.clock = clock
+        self.initialized = 0
+        self.networks: dict[int, SimNetwork] = {}
+        self._handles: dict[int, SimNetwork] = {}
+        self._serial = 0
+        self._lock = Lock()     # Счетчик инициализаций и таблица дескрипторов
+
+        for number, nodes in (networks if networks is not None else {0: [], 1: []}).items():
+            self.add_network(number, nodes)
+
+    def add_network(self, number: int, nodes: Sequence[NodeSpec]) -> SimNetwork:
+        """Добавить виртуальную сеть с номером number."""
+
+        network = SimNetwork(self._node(node) for node in nodes)
+        self.networks[number] = network
+        return network
+
+    def _node(self, node: NodeSpec) -> SimNode:
+        self._serial += 1
+        return node if isinstance(node, SimNode) else SimNode(node, self._serial)
+
+    def _network(self, hnet: object) -> SimNetwork | None:
+        return self._handles.get(_value(hnet))
+
+    def _lookup(self, hnet: object,
+                      net_id: object) -> tuple[int, SimNetwork | None, SimNode | None]:
+        network = self._network(hnet)
+        if network is None:
+            return FBUS_RESULT.INCORRECT_PARAM, None, None
+        if not network.scanned:
+            return FBUS_RESULT.NET_NOT_RESCANED_OR_ZERO_MODULES, network, None
+
+        net_id = _value(net_id)
+        if net_id >= FBUS_MAX_NODE_COUNT:
+            return FBUS_RESULT.INCORRECT_PARAM, network, None
+        if net_id >= len(network.nodes):
+            return FBUS_RESULT.MODULE_NOT_ANSWER, network, None
+
+        return _OK, network, network.nodes[net_id]
+
+    def _targets(self, hnet: object, net_id: object) -> tuple[int, SimNetwork | None, list[int]]:
+        if _value(net_id) == FBUS_MULTICAST_ID:
+            network = self._network(hnet)
+            if network is None:
+                return FBUS_RESULT.INCORRECT_PARAM, None, []
+            if not network.scanned:
+                return FBUS_RESULT.NET_NOT_RESCANED_OR_ZERO_MODULES, network, []
+            return _OK, network, list(range(len(network.nodes)))
+
+        result, network, _ = self._lookup(hnet, net_id)
+        return result, network, [_value(net_id)]
+
+# Функции инициализации сервиса
+
+    def fbusGetVersion(self, major: object, minor: object) -> int:
+        _store(major, c_int, SIM_VERSION[0])
+        _store(minor, c_int, SIM_VERSION[1])
+        return _OK
+
+    def fbusInitialize(self) -> int:
+        with self._lock:
+            self.initialized += 1
+        return _OK
+
+    def fbusDeInitialize(self) -> int:
+        with self._lock:
+            if not self.initialized:
+                return FBUS_RESULT.INVALID_STATE
+
+            self.initialized -= 1
+        return _OK
+
+# Функции управления сетью
+
+    def fbusOpen(self, net_number: object, hnet: object) -> int:
+        with self._lock:
+            if not self.initialized:
+                return FBUS_RESULT.INVALID_STATE
+
+            network = self.networks.get(_value(net_number))
+            if network is None:
+                return FBUS_RESULT.OPEN_ADAPTER
+            if network.opened:
+                return FBUS_RESULT.INVALID_STATE
+
+            network.opened = True
+            handle = max(self._handles, default=0) + 1
+            self._handles[handle] = network
+
+        _store(hnet, c_size_t, handle)
+        return _OK
+
+    def fbusClose(self, hnet: object) -> int:
+        with self._lock:
+            network = self._handles.pop(_value(hnet), None)
+        if network is None:
+            return FBUS_RESULT.INCORRECT_PARAM
+
+        network.opened = network.scanned = False
+        network.groups.clear()
+        return _OK
+
+    def fbusRescan(self, hnet: object, count: object) -> int:
+        network = self._network(hnet)
+        if network is None:
+            return FBUS_RESULT.INCORRECT_PARAM
+
+        network.rescan()
+        _store(count, c_size_t, len(network.nodes))
+        return _OK
+
+    def fbusGetNodesCount(self, hnet: object, count: object) -> int:
+        network = self._network(hnet)
+        if network is None:
+            return FBUS_RESULT.INCORRECT_PARAM
+
+        _store(count, c_size_t, len(network.nodes) if network.scanned else 0)
+        return _OK
+
+    def fbusGetNodeDescription(self, hnet: object, net_id: object, dest: object,
+                                     size: object) -> int:
+        result, _, node = self._lookup(hnet, net_id)
+        if result:
+            return result
+        if _value(size) < sizeof(FIO_MODULE_DESC):
+            return FBUS_RESULT.INCORRECT_PARAM
+
+        descr = node.description()
+        memmove(_address(dest), addressof(descr), sizeof(descr))
+        return _OK
+
+    def fbusReset(self, hnet: object, net_id: object) -> int:
+        result, network, targets = self._targets(hnet, net_id)
+        for target in targets if not result else ():
+            network.nodes[target].reset()
+
+        return result
+
+    def fbusSendSync(self, hnet: object, sync_id: object) -> int:
+        network = self._network(hnet)
+        if network is None:
+            return FBUS_RESULT.INCORRECT_PARAM
+
+        now = self.clock()
+        sync_id = _value(sync_id)
+        network.syncs += 1
+        for node in network.nodes:
+            node.sync(sync_id, now)
+
+        return _OK
+
+# Функции конфигурации
+
+    def fbusGetNodeCommonParameters(self, hnet: object, net_id: object, dest: object,
+                                          size: object) -> int:
+        result, network, _ = self._lookup(hnet, net_id)
+        if result:
+            return result
+        if _value(size) < sizeof(FIO_MODULE_COMMON_CONF):
+            return FBUS_RESULT.INCORRECT_PARAM
+
+        memmove(_address(dest), addressof(network.common[_value(net_id)]),
+                sizeof(FIO_MODULE_COMMON_CONF))
+        return _OK
+
+    def fbusSetNodeCommonParameters(self, hnet: object, net_id: object, src: object,
+                                          size: object) -> int:
+        result, network, _ = self._lookup(hnet, net_id)
+        if result:
+            return result
+        if _value(size) < sizeof(FIO_MODULE_COMMON_CONF):
+            return FBUS_RESULT.INCORRECT_PARAM
+
+        memmove(addressof(network.common[_value(net_id)]), _address(src),
+                sizeof(FIO_MODULE_COMMON_CONF))
+        return _OK
+
+    def _specific(self, hnet: object, net_id: object, offset: object,
+                        length: object) -> tuple[int, bytearray | None, int, int]:
+        result, network, _ = self._lookup(hnet, net_id)
+        if result:
+            return result, None, 0, 0
+
+        config = network.specific[_value(net_id)]
+        offset, length = _value(offset), _value(length)
+        if offset + length > len(config):
+            return FBUS_RESULT.INVALID_EXCHANGE_REGION, None, 0, 0
+
+        return _OK, config, offset, length
+
+    def fbusGetNodeSpecificParameters(self, hnet: object, net_id: object, dest: object,
+                                            offset: object, length: object) -> int:
+        result, config, offset, length = self._specific(hnet, net_id, offset, length)
+        if not result:
+            memmove(_address(dest), bytes(config[offset:offset + length]), length)
+
+        return result
+
+    def fbusSetNodeSpecificParameters(self, hnet: object, net_id: object, src: object,
+                                            offset: object, length: object) -> int:
+        result, config, offset, length = self._specific(hnet, net_id, offset, length)
+        if not result:
+            config[offset:offset + length] = string_at(_address(src), length)
+
+        return result
+
+    def fbusReadConfig(self, hnet: object, net_id: object) -> int:
+        result, network, targets = self._targets(hnet, net_id)
+        for target in targets if not result else ():
+            node = network.nodes[target]
+            network.common[target] = FIO_MODULE_COMMON_CONF.from_buffer_copy(node.common)
+            network.specific[target][:] = node.config
+
+        return result
+
+    def fbusWriteConfig(self, hnet: object, net_id: object) -> int:
+        result, network, targets = self._targets(hnet, net_id)
+        for target in targets if not result else ():
+            node = network.nodes[target]
+            node.common = FIO_MODULE_COMMON_CONF.from_buffer_copy(network.common[target])
+            node.config[:] = network.specific[target]
+            node.configure()
+
+        return result
+
+    def fbusSaveConfig(self, hnet: object, net_id: object) -> int:
+        result, network, targets = self._targets(hnet, net_id)
+        for target in targets if not result else ():
+            node = network.nodes[target]
+            node.saved_config = bytes(node.config)
+
+        return result
+
+# Функции групповой конфигурации
+
+    def fbusDeleteGroup(self, hnet: object, group_id: object) -> int:
+        network = self._network(hnet)
+        if network is None:
+            return FBUS_RESULT.INCORRECT_PARAM
+        if network.groups.pop(_value(group_id), None) is None:
+            return FBUS_RESULT.GROUP_UNDEFINED
+
+        return _OK
+
+    def fbusDeleteAllGroups(self, hnet: object) -> int:
+        network = self._network(hnet)
+        if network is None:
+            return FBUS_RESULT.INCORRECT_PARAM
+
+        network.groups.clear()
+        return _OK
+
+    def fbusAssignNodeToGroup(self, hnet: object, net_id: object, group_id: object,
+                                    input_offset: object, input_length: object,
+                                    output_offset: object, output_length: object) -> int:
+        result, network, node = self._lookup(hnet, net_id)
+        if result:
+            return result
+
+        group_id = _value(group_id)
+        if not FBUS_GROUP_ID_MIN <= group_id <= FBUS_GROUP_ID_MAX:
+            return FBUS_RESULT.INVALID_GROUP_ID
+
+        region = tuple(_value(argument) for argument in (input_offset, input_length,
+                                                          output_offset, output_length))
+        if region[0] + region[1] > len(node.inputs) or \
+           region[2] + region[3] > len(node.outputs):
+            return FBUS_RESULT.INVALID_EXCHANGE_REGION
+
+        net_id = _value(net_id)
+        for group in network.groups.values():
+            if group.members.pop(net_id, None) is not None:
+                group.built = False
+
+        group = network.groups.setdefault(group_id, _Group())
+        group.members[net_id] = region
+        group.built = False
+        return _OK
+
+    def fbusBuildGroups(self, hnet: object) -> int:
+        network = self._network(hnet)
+        if network is None:
+            return FBUS_RESULT.INCORRECT_PARAM
+        if not network.scanned:
+            return FBUS_RESULT.NET_NOT_RESCANED_OR_ZERO_MODULES
+
+        for common in network.common:
+            common.GroupConf.GroupID = FBUS_UNDEFINED_GROUP_ID
+
+        for group_id, group in network.groups.items():
+            input_total = sum(region[1] for region in group.members.values())
+            output_total = sum(region[3] for region in group.members.values())
+            if input_total > SIM_GROUP_DATA_MAX or output_total > SIM_GROUP_DATA_MAX:
+                return FBUS_RESULT.INVALID_GROUP_CONFIG
+
+            input_packet = output_packet = 0
+            for net_id, (input_offset, input_length,
+                         output_offset, output_length) in group.members.items():
+                conf = network.common[net_id].GroupConf
+                conf.GroupID = group_id
+                conf.InputPacketDataOffset = input_packet
+                conf.InputModuleDataLength = input_length
+                conf.InputModuleDataOffset = input_offset
+                conf.InputPacketCRCOffset = input_total
+                conf.OutputPacketDataOffset = output_packet
+                conf.OutputModuleDataLength = output_length
+                conf.OutputModuleDataOffset = output_offset
+                conf.OutputPacketCRCOffset = output_total
+                input_packet += input_length
+                output_packet += output_length
+
+            group.inputs = {net_id: bytearray(region[1])
+                            for net_id, region in group.members.items()}
+            group.outputs = {net_id: bytearray(region[3])
+                             for net_id, region in group.members.items()}
+            group.built = True
+
+        return _OK
+
+# Функции индивидуальных запросов
+
+    def fbusReadInputs(self, hnet: object, net_id: object, dest: object,
+                             offset: object, length: object) -> int:
+        result, _, node = self._lookup(hnet, net_id)
+        if result:
+            return result
+
+        offset, length = _value(offset), _value(length)
+        if offset + length > len(node.inputs):
+            return FBUS_RESULT.INVALID_EXCHANGE_REGION
+
+        node.update(self.clock())
+        memmove(_address(dest), bytes(node.inputs[offset:offset + length]), length)
+        return _OK
+
+    def fbusWriteOutputs(self, hnet: object, net_id: object, src: object,
+                               offset: object, length: object) -> int:
+        result, _, node = self._lookup(hnet, net_id)
+        if result:
+            return result
+
+        offset, length = _value(offset), _value(length)
+        if offset + length > len(node.outputs):
+            return FBUS_RESULT.INVALID_EXCHANGE_REGION
+
+        node.outputs[offset:offset + length] = string_at(_address(src), length)
+        node.apply_outputs(self.clock())
+        return _OK
+
+# Функции группового обмена
+
+    def _group(self, hnet: object, group_id: object) -> tuple[int, SimNetwork | None,
+                                                              _Group | None]:
+        network = self._network(hnet)
+        if network is None:
+            return FBUS_RESULT.INCORRECT_PARAM, None, None
+
+        group_id = _value(group_id)
+        if not FBUS_GROUP_ID_MIN <= group_id <= FBUS_GROUP_ID_MAX:
+            return FBUS_RESULT.INVALID_GROUP_ID, network, None
+
+        group = network.groups.get(group_id)
+        if group is None:
+            return FBUS_RESULT.GROUP_UNDEFINED, network, None
+        if not group.built:
+            return FBUS_RESULT.GROUP_NOT_CREATED, network, None
+
+        return _OK, network, group
+
+    def fbusProcessGroup(self, hnet: object, group_id: object) -> int:
+        result, network, group = self._group(hnet, group_id)
+        if result:
+            return result
+
+        group_id = _value(group_id)
+        nodes = network.nodes
+        if any(nodes[net_id].common.GroupConf.GroupID != group_id for net_id in group.members):
+            return FBUS_RESULT.GROUP_CONFIG_NOT_SINCHRONIZED
+
+        now = self.clock()
+        for net_id, (input_offset, input_length,
+                     output_offset, output_length) in group.members.items():
+            node = nodes[net_id]
+            if output_length:
+                node.outputs[output_offset:output_offset + output_length] = group.outputs[net_id]
+                node.apply_outputs(now)
+            if input_length:
+                node.update(now)
+                group.inputs[net_id][:] = node.inputs[input_offset:input_offset + input_length]
+
+        return _OK
+
+    def _member(self, hnet: object, group_id: object, net_id: object, offset: object,
+                      length: object, buffers: str) -> tuple[int, bytearray | None, int, int]:
+        result, _, group = self._group(hnet, group_id)
+        if result:
+            return result, None, 0, 0
+
+        buffer = getattr(group, buffers).get(_value(net_id))
+        if buffer is None:
+            return FBUS_RESULT.NODE_NOT_ASSIGNED_TO_GROUP, None, 0, 0
+
+        offset, length = _value(offset), _value(length)
+        if offset + length > len(buffer):
+            return FBUS_RESULT.INVALID_EXCHANGE_REGION, None, 0, 0
+
+        return _OK, buffer, offset, length
+
+    def fbusGroup_setNodeOutputs(self, hnet: object, group_id: object, net_id: object,
+                                       offset: object, length: object, src: object) -> int:
+        result, buffer, offset, length = self._member(hnet, group_id, net_id,
+                                                      offset, length, "outputs")
+        if not result:
+            buffer[offset:offset + length] = string_at(_address(src), length)
+
+        return result
+
+    def fbusGroup_getNodeInputs(self, hnet: object, group_id: object, net_id: object,
+                                      offset: object, length: object, dest: object) -> int:
+        result, buffer, offset, length = self._member(hnet, group_id, net_id,
+                                                      offset, length, "inputs")
+        if not result:
+            memmove(_address(dest), bytes(buffer[offset:offset + length]), length)
+
+        return result
+
+# Функции калибровки
+
+    def _calibration(self, hnet: object, net_id: object, offset: object,
+                           length: object) -> tuple[int, SimNode | None, int, int]:
+        result, _, node = self._lookup(hnet, net_id)
+        if result:
+            return result, None, 0, 0
+
+        offset, length = _value(offset), _value(length)
+        if offset + length > len(node.calibration):
+            return FBUS_RESULT.INVALID_EXCHANGE_REGION, None, 0, 0
+
+        return _OK, node, offset, length
+
+    def fbusModuleGetCalibrationData(self, hnet: object, net_id: object, offset: object,
+                                           length: object, dest: object) -> int:
+        result, node, offset, length = self._calibration(hnet, net_id, offset, length)
+        if not result:
+            memmove(_address(dest), bytes(node.calibration[offset:offset + length]), length)
+
+        return result
+
+    def fbusModuleSetCalibrationData(self, hnet: object, net_id: object, offset: object,
+                                           length: object, src: object) -> int:
+        result, node, offset, length = self._calibration(hnet, net_id, offset, length)
+        if result:
+            return result
+        if not node.calibrating:
+            return FBUS_RESULT.INVALID_STATE
+
+        node.calibration[offset:offset + length] = string_at(_address(src), length)
+        return _OK
+
+    def fbusModuleEnterCalibrationMode(self, hnet: object, net_id: object) -> int:
+        result, _, node = self._lookup(hnet, net_id)
+        if not result:
+            node.calibrating = True
+
+        return result
+
+    def fbusModuleLeaveCalibrationMode(self, hnet: object, net_id: object) -> int:
+        result, _, node = self._lookup(hnet, net_id)
+        if not result:
+            node.calibrating = False
+
+        return result
+
+    def fbusModuleSaveCalibrationData(self, hnet: object, net_id: object,
+                                            section_code: object) -> int:
+        result, _, node = self._lookup(hnet, net_id)
+        if not result:
+            node.calibration_sections[_value(section_code)] = bytes(node.calibration)
+
+        return result
+
+    def fbusModuleLoadCalibrationData(self, hnet: object, net_id: object,
+                                            section_code: object) -> int:
+        result, _, node = self._lookup(hnet, net_id)
+        if result:
+            return result
+
+        section = node.calibration_sections.get(_value(section_code))
+        if section is None:
+            return FBUS_RESULT.INCORRECT_PARAM
+
+        node.calibration[:] = section
+        return _OK
+
+# Функции -------
+
+    def fbusGetAdapterInfo(self, hnet: object, dest: object, size: object) -> int:
+        if self._network(hnet) is None or _value(size) < sizeof(FBUS_ADAPTER_INFO):
+            return FBUS_RESULT.INCORRECT_PARAM
+
+        info = FBUS_ADAPTER_INFO()
+        info.nim745.fw[:] = SIM_VERSION
+        memmove(_address(dest), addressof(info), sizeof(info))
+        return _OK
+
+
+def parse_networks(spec: str) -> dict[int, list[int]]:
+    """Сети из строки вида "номер=ТИП,ТИП*n;номер=..." (имена FIO_MODULE_TYPE)."""
+
+    networks = {}
+    for item in filter(None, (part.strip() for part in spec.split(";"))):
+        number, _, types = item.partition("=")
+        rack = []
+        try:
+            for entry in filter(None, (part.strip() for part in types.split(","))):
+                name, _, count = entry.partition("*")
+                rack.extend([FIO_MODULE_TYPE[name.strip().upper()]] * int(count or 1))
+            networks[int(number)] = rack
+        except (KeyError, ValueError) as err:
+            msg = f"Invalid {SIM_NETWORKS_ENV} entry {item!r}: {err}"
+            raise FBusError(msg) from None
+
+    return networks
+
+
+@lru_cache(maxsize=None)
+def shared_simulator() -> Simulator:
+    """Общий для процесса Simulator бэкенда "sim": все клиенты FBUS видят
+    одни и те же сети, как и при работе с libfbus.
+    """
+
+    from fbus.models import model_for
+
+    spec = os.environ.get(SIM_NETWORKS_ENV)
+    networks = parse_networks(spec) if spec else {0: DEFAULT_RACK, 1: DEFAULT_RACK}
+
+    random = Random(0)
+    serial = 0
+    racks = {}
+    for number, types in networks.items():
+        rack = []
+        for module_type in types:
+            serial += 1
+            rack.append(model_for(module_type, random, serial))
+        racks[number] = rack
+
+    return Simulator(racks)
+
+
+__all__ = ["DEFAULT_RACK", "SIM_NETWORKS_ENV", "SimNetwork", "SimNode", "Simulator",
+           "parse_networks", "shared_simulator"]
@@ -0,0 +1,140 @@
+#! /usr/bin/env python3
+
+"""Многобуферный образ входных данных для одновременного чтения из
+нескольких потоков без блокировок.
+Fastwel FBUS SDK Версия 2.4.
+"""
+
+from __future__ import annotations
+
+from ctypes import Structure
+from time import monotonic
+from typing import TypeVar
+
+_S = TypeVar("_S", bound=Structure)
+
+_WRITING = -1   # Номер версии буфера, в который записывает поток опроса
+
+
+class _Slot:
+    __slots__ = ("buffer", "sequence", "view")
+
+    def __init__(self, size: int) -> None:
+        self.buffer = bytearray(size)
+        self.view = memoryview(self.buffer).toreadonly()
+        self.sequence = 0
+
+
+class Snapshot:
+    """Опубликованная версия образа данных.
+
+    data ссылается на буфер без копирования. Буфер может быть повторно
+    использован потоком опроса после публикации следующих версий, поэтому
+    после обработки данных следует проверить valid(), либо получить копию
+    через SnapshotBuffer.read().
+    """
+
+    __slots__ = ("_slot", "data", "sequence", "timestamp")
+
+    def __init__(self, slot: _Slot, sequence: int, timestamp: float,
+                       data: memoryview | bytes) -> None:
+        self._slot = slot
+        self.sequence = sequence        # Номер версии
+        self.timestamp = timestamp      # Время публикации (monotonic), с
+        self.data = data
+
+    def valid(self) -> bool:
+        """Данные версии еще не перезаписаны."""
+
+        return self._slot.sequence == self.sequence
+
+    def structure(self, layout: type[_S], offset: int = 0) -> _S:
+        """Структура с копией данных версии. Изменение структуры не влияет на
+        опубликованные данные; для версии без копирования после вызова
+        следует проверить valid().
+        """
+
+        return layout.from_buffer_copy(self.data, offset)
+
+    def __repr__(self) -> str:
+        return f"Snapshot(sequence={self.sequence}, timestamp={self.timestamp})"
+
+
+class SnapshotBuffer:
+    """Тройной (по умолчанию) буфер образа данных.
+
+    Поток опроса заполняет задний буфер back и публикует его вызовом
+    publish(): ссылка на новую версию подменяется одним присваиванием, после
+    чего задним становится буфер, опубликованный count - 1 версий назад.
+    Читатели получают последнюю версию через latest() без блокировок, а
+    целостность данных проверяется по номеру версии буфера (seqlock).
+    Поддерживается один поток записи и произвольное число читателей.
+    """
+
+    def __init__(self, size: int, count: int = 3) -> None:
+        if count < 2:
+            msg = "At least two buffers are required"
+            raise ValueError(msg)
+
+        self._slots = [_Slot(size) for _ in range(count)]
+        self._back = 0
+        self._sequence = 0
+        self._slots[0].sequence = _WRITING
+        self._latest = Snapshot(self._slots[-1], 0, monotonic(), self._slots[-1].view)
+
+    @property
+    def back(self) -> bytearray:
+        """Буфер, заполняемый потоком опроса."""
+
+        return self._slots[self._back].buffer
+
+    @property
+    def sequence(self) -> int:
+        """Номер последней опубликованной версии."""
+
+        return self._sequence
+
+    def publish(self, timestamp: float | None = None) -> Snapshot:
+        """Опубликовать заполненный задний буфер."""
+
+        slot = self._slots[self._back]
+        self._sequence += 1
+        slot.sequence = self._sequence
+        self._latest = snapshot = Snapshot(slot, self._sequence,
+                                           monotonic() if timestamp is None else timestamp,
+                                           slot.view)
+
+        self._back = (self._back + 1) % len(self._slots)
+        self._slots[self._back].sequence = _WRITING
+        return snapshot
+
+    def publish_from(self, source: bytes | bytearray | memoryview,
+                           timestamp: float | None = None) -> Snapshot:
+        """Скопировать данные source в задний буфер и опубликовать их.
+        Размер source должен совпадать с размером буфера.
+        """
+
+        back = self.back
+        if memoryview(source).nbytes != len(back):
+            msg = f"Source size {memoryview(source).nbytes} differs from buffer size {len(back)}"
+            raise ValueError(msg)
+
+        back[:] = source
+        return self.publish(timestamp)
+
+    def latest(self) -> Snapshot:
+        """Последняя опубликованная версия без копирования данных."""
+
+        return self._latest
+
+    def read(self) -> Snapshot:
+        """Согласованная копия последней опубликованной версии."""
+
+        while True:
+            snapshot = self._latest
+            data = bytes(snapshot.data)
+            if snapshot.valid():
+                return Snapshot(snapshot._slot, snapshot.sequence, snapshot.timestamp, data)
+
+
+__all__ = ["Snapshot", "SnapshotBuffer"]
@@ -0,0 +1,91 @@
+#! /usr/bin/env python3
+
+"""Синхронизированный сбор данных с использованием синхронизирующих пакетов.
+Fastwel FBUS SDK Версия 2.4.
+"""
+
+from __future__ import annotations
+
+from collections import deque
+from time import perf_counter
+from typing import TYPE_CHECKING, Iterable, NamedTuple
+
+from fbus.protocol import FBUS_MULTICAST_ID, FBUS_UNDEFINED_SYNC_ID, FIO_MODULE_COMMON_CONF
+
+if TYPE_CHECKING:
+    from fbus.client import FBUS
+    from fbus.image import ProcessImage
+
+
+class SyncCycle(NamedTuple):
+    """Результат одного синхронизированного цикла."""
+
+    sequence: int           # Номер цикла
+    sync_time: float        # Момент отправки синхронизирующего пакета (perf_counter), с
+    latency: float          # Время от отправки синхронизирующего пакета до получения данных, с
+
+
+def assign_sync(bus: FBUS, net_ids: Iterable[int], input_sync: int,
+                     output_sync: int) -> None:
+    """Назначить модулям номера синхронизирующих сообщений и записать
+    конфигурацию во все модули одним вызовом fbusWriteConfig.
+    """
+
+    conf = FIO_MODULE_COMMON_CONF()
+    with bus.lock:
+        for net_id in net_ids:
+            bus.fbusGetNodeCommonParametersInto(net_id, conf)
+            conf.InputSync = input_sync
+            conf.OutputSync = output_sync
+            bus.fbusSetNodeCommonParameters(net_id, conf)
+        bus.fbusWriteConfig(FBUS_MULTICAST_ID)
+
+
+class SyncAcquisition:
+    """Синхронизированный сбор данных образа процесса.
+
+    Все модули образа фиксируют входы и актуализируют выходы по одному
+    синхронизирующему пакету, поэтому входные данные одного цикла относятся
+    к одному моменту времени. Цикл состоит из отправки синхронизирующего
+    пакета, группового обмена и сбора входных данных в образ процесса.
+    """
+
+    def __init__(self, bus: FBUS, image: ProcessImage, sync_id: int = 0,
+                       history: int = 1000) -> None:
+        self._bus = bus
+        self.image = image
+        self.sync_id = sync_id
+        self.sequence = 0
+        self.last: SyncCycle | None = None
+        self.latencies: deque[float] = deque(maxlen=history)
+
+    def configure(self, inputs: bool = True, outputs: bool = True) -> None:
+        """Назначить номер синхронизирующего сообщения всем модулям образа."""
+
+        assign_sync(self._bus, self.image.nodes,
+                    self.sync_id if inputs else FBUS_UNDEFINED_SYNC_ID,
+                    self.sync_id if outputs else FBUS_UNDEFINED_SYNC_ID)
+
+    def release(self) -> None:
+        """Вернуть модули образа к асинхронному обновлению входов и выходов."""
+
+        assign_sync(self._bus, self.image.nodes,
+                    FBUS_UNDEFINED_SYNC_ID, FBUS_UNDEFINED_SYNC_ID)
+
+    def cycle(self) -> SyncCycle:
+        """Выполнить цикл: синхронизация, обмен и сбор входных данных."""
+
+        bus = self._bus
+        with bus.lock:
+            sync_time = perf_counter()
+            bus.fbusSendSync(self.sync_id)
+            self.image.exchange()
+            latency = perf_counter() - sync_time
+
+        self.sequence += 1
+        self.latencies.append(latency)
+        self.last = SyncCycle(self.sequence, sync_time, latency)
+        return self.last
+
+
+__all__ = ["SyncAcquisition", "SyncCycle", "assign_sync"]
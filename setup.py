@@ -10,6 +10,7 @@ setup(name="python-fbus",
       author_email="aryadno@mail.ru",
       license="MIT",
       packages=["fbus", "fbus.libs", "fbus.device"],
+      extras_require={"numpy": ["numpy"]},
       package_data={"fbus": ["libs/win32/*.dll",
                              "libs/linux32/*.so",
                              "libs/linux64/*.so"]},
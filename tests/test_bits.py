@@ -0,0 +1,101 @@
+#! /usr/bin/env python3
+
+"""Проверка распаковки состояний дискретных каналов модулей DIM."""
+
+from __future__ import annotations
+
+from ctypes import sizeof
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from fbus.bits import BitField, DigitalImage, register_bits     # noqa: E402
+from fbus.client import FBUS, FBusError                         # noqa: E402
+from fbus.device.dim714 import DIM714_INPUTS                    # noqa: E402
+from fbus.device.dim718 import DIM718_INPUTS                    # noqa: E402
+from fbus.image import NodeLayout, ProcessImage                 # noqa: E402
+from fbus.protocol import FBUS_ADAPTER, FIO_MODULE_TYPE         # noqa: E402
+from fbus.simulator import Simulator                            # noqa: E402
+
+RACK = [FIO_MODULE_TYPE.DIM714, FIO_MODULE_TYPE.AIM724, FIO_MODULE_TYPE.DIM718]
+
+
+@pytest.fixture()
+def simulator():
+    return Simulator({1: RACK})
+
+
+@pytest.fixture()
+def bus(simulator):
+    bus = FBUS(simulator)
+    bus.fbusInitialize()
+    bus.fbusOpen(adapter=FBUS_ADAPTER.TCP, port=1)
+    yield bus
+
+    bus.fbusClose()
+    bus.fbusDeInitialize()
+
+
+def states(simulator: Simulator, dim714: int, dim718: int) -> None:
+    """Записать упакованные состояния каналов во входные данные модулей."""
+
+    nodes = simulator.networks[1].nodes
+    nodes[0].inputs[:sizeof(DIM714_INPUTS)] = bytes(DIM714_INPUTS(0, dim714, 0xFFFF, 0xFFFF, 0xFF))
+    nodes[2].inputs[:sizeof(DIM718_INPUTS)] = bytes(DIM718_INPUTS(0xFF, dim718, 0xFFFF))
+
+
+def test_unpack_known_bytes(bus, simulator):
+    image = ProcessImage.from_rescan(bus)
+    digital = DigitalImage.from_bus(image, bus)
+
+    # У DIM714 значащие только 4 младших разряда inputStates
+    assert digital.names == ([f"0.inputStates.{bit}" for bit in range(4)]
+                             + [f"2.channelsStates.{bit}" for bit in range(8)])
+    assert list(digital.nodes) == [0, 2]
+
+    states(simulator, 0b1111_0101, 0b1000_0110)
+    image.exchange()
+    digital.update()
+
+    assert digital.node(0).tolist() == [True, False, True, False]
+    assert digital.node(2).tolist() == [False, True, True, False, False, False, False, True]
+    assert digital.channel("2.channelsStates.7")
+    assert (digital.rising == digital.states).all()
+
+    states(simulator, 0b0000_0110, 0b0000_0111)
+    image.exchange()
+    digital.update()
+
+    assert digital.node(0).tolist() == [False, True, True, False]
+    assert np.flatnonzero(digital.rising).tolist() == [1, 4]
+    assert np.flatnonzero(digital.falling).tolist() == [0, 11]
+
+
+def test_unpack_history(bus, simulator):
+    image = ProcessImage.from_rescan(bus)
+    digital = DigitalImage.from_bus(image, bus)
+
+    frames = []
+    for value in (0x01, 0x80, 0xFF):
+        states(simulator, value, value)
+        image.exchange()
+        frames.append(np.frombuffer(image.inputs, np.uint8).copy())
+
+    matrix = digital.unpack(np.stack(frames))
+    assert matrix.shape == (3, 12)
+    assert matrix[:, digital.index["0.inputStates.0"]].tolist() == [True, False, True]
+    assert matrix[:, digital.index["2.channelsStates.7"]].tolist() == [False, True, True]
+    assert matrix.sum(axis=1).tolist() == [2, 1, 12]
+
+
+def test_field_too_narrow():
+    layout = [NodeLayout(0, 0x80, 0, sizeof(DIM718_INPUTS), 0, 0)]
+    image = ProcessImage(None, layout)
+
+    register_bits(FIO_MODULE_TYPE.DIM718, (BitField("channelsStates", 9),))
+    try:
+        with pytest.raises(FBusError):
+            DigitalImage(image, {0: FIO_MODULE_TYPE.DIM718})
+    finally:
+        register_bits(FIO_MODULE_TYPE.DIM718, (BitField("channelsStates", 8),))
@@ -0,0 +1,31 @@
+#! /usr/bin/env python3
+
+"""Проверка обнаружения изменений входных данных модулей."""
+
+from __future__ import annotations
+
+from fbus.change import Change, ChangeDetector
+from fbus.image import NodeLayout
+
+LAYOUT = [NodeLayout(1, 1, 0, 4, 0, 2),
+          NodeLayout(2, 1, 4, 0, 2, 2),     # Модуль без входных данных
+          NodeLayout(3, 1, 4, 8, 4, 0)]
+
+
+def test_bits_follow_layout_order():
+    buffer = bytearray(12)
+    detector = ChangeDetector(LAYOUT, buffer)
+    received = []
+    detector.subscribe(lambda change, data: received.append((change, bytes(data))), [3])
+
+    buffer[7] = 1
+    buffer[9] = 2
+
+    assert detector.update() == 0b100
+    assert detector.is_dirty(2)
+    assert not detector.is_dirty(1)
+    assert detector.changes == [Change(3, 3, 6)]
+    assert received == [(Change(3, 3, 6), bytes(buffer[4:12]))]
+
+    assert detector.update() == 0
+    assert detector.changes == []
@@ -0,0 +1,121 @@
+#! /usr/bin/env python3
+
+"""Проверка кодеков struct.Struct по структурам ctypes модулей."""
+
+from __future__ import annotations
+
+import math
+import re
+from ctypes import Structure, c_char_p, c_uint8, c_uint16, sizeof
+from importlib import import_module
+from pkgutil import iter_modules
+from typing import Any
+
+import pytest
+
+from fbus import device
+from fbus.client import FBUS, FBusError
+from fbus.codec import Codec, codec_of
+from fbus.device.dim718 import DIM718_INPUTS, DIM718_OUTPUTS
+from fbus.image import ProcessImage
+from fbus.protocol import FBUS_ADAPTER, FIO_MODULE_TYPE
+from fbus.simulator import Simulator
+
+_PART = re.compile(r"(\w+)(?:\[(\d+)\])?")
+
+
+def structures() -> list[type[Structure]]:
+    """Все структуры, объявленные в модулях пакета fbus.device."""
+
+    found = {}
+    for info in iter_modules(device.__path__, f"{device.__name__}."):
+        module = import_module(info.name)
+        for value in vars(module).values():
+            if (isinstance(value, type) and issubclass(value, Structure)
+                    and value.__module__ == module.__name__):
+                found[value.__qualname__, module.__name__] = value
+
+    return [found[key] for key in sorted(found)]
+
+
+def name_of(layout: type[Structure]) -> str:
+    return f"{layout.__module__.rsplit('.', 1)[-1]}.{layout.__qualname__}"
+
+
+def field(record: Structure, name: str) -> Any:
+    """Значение поля структуры по имени кодека вида "Inputs.values[1]"."""
+
+    value: Any = record
+    for part in name.split("."):
+        attribute, index = _PART.fullmatch(part).groups()
+        value = getattr(value, attribute)
+        if index is not None:
+            value = value[int(index)]
+    if isinstance(value, (bytes, bytearray)) or hasattr(value, "_length_"):
+        value = bytes(value)
+
+    return value
+
+
+def same(left: Any, right: Any) -> bool:
+    if isinstance(left, float) and math.isnan(left):
+        return math.isnan(right)
+    return left == right
+
+
+@pytest.mark.parametrize("layout", structures(), ids=name_of)
+def test_codec_matches_structure(layout):
+    codec = codec_of(layout)
+    raw = (bytes(range(7, 256, 3)) * (sizeof(layout) // 83 + 1))[:sizeof(layout)]
+    record = layout.from_buffer_copy(raw)
+
+    assert codec.size == sizeof(layout)
+    values = codec.unpack(raw)
+    for name, value in zip(codec.names, values):
+        assert same(value, field(record, name)), name
+
+    packed = layout.from_buffer_copy(codec.pack(*values))
+    for name in codec.names:
+        assert same(field(packed, name), field(record, name)), name
+
+
+def test_exchange_through_codec():
+    simulator = Simulator({1: [FIO_MODULE_TYPE.AIM724, FIO_MODULE_TYPE.DIM718]})
+    bus = FBUS(simulator)
+    bus.fbusInitialize()
+    bus.fbusOpen(adapter=FBUS_ADAPTER.TCP, port=1)
+    try:
+        image = ProcessImage.from_rescan(bus)
+        node = simulator.networks[1].nodes[1]
+        node.inputs[:sizeof(DIM718_INPUTS)] = bytes(DIM718_INPUTS(0, 0x5A, 1, 2, 3, 4, 5, 6, 7, 8))
+        layout = image.nodes[1]
+
+        inputs, outputs = codec_of(DIM718_INPUTS), codec_of(DIM718_OUTPUTS)
+        outputs.pack_into(image.outputs, layout.output_offset, 0xC3, *range(100, 108))
+        image.exchange()
+
+        assert inputs.unpack_dict(image.inputs, layout.input_offset) == {
+            "diagnostics": 0, "channelsStates": 0x5A,
+            **{f"{half}HalfDutyState_PWM{channel}": 2 * channel + number
+               for channel in range(4) for number, half in ((1, "first"), (2, "second"))}}
+        assert node.outputs[:sizeof(DIM718_OUTPUTS)] == bytes(DIM718_OUTPUTS(0xC3, *range(100, 108)))
+    finally:
+        bus.fbusClose()
+        bus.fbusDeInitialize()
+
+
+def test_padding_and_errors():
+    class PADDED(Structure):
+        _fields_ = [("first", c_uint8), ("second", c_uint16), ("tail", c_uint8 * 3)]
+
+    codec = Codec(PADDED)
+    assert codec.format == "<B1xH3s1x"
+    assert codec.unpack(bytes(PADDED(1, 2, (c_uint8 * 3)(3, 4, 5)))) == (1, 2, b"\x03\x04\x05")
+    assert list(codec.iter_unpack(bytes(PADDED(1)) + bytes(PADDED(2)))) == [
+        (1, 0, bytes(3)), (2, 0, bytes(3))]
+
+    class POINTER(Structure):
+        _fields_ = [("name", c_char_p)]
+
+    with pytest.raises(FBusError):
+        Codec(POINTER)
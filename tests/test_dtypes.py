@@ -0,0 +1,57 @@
+#! /usr/bin/env python3
+
+"""Проверка соответствия типов NumPy структурам ctypes модулей."""
+
+from __future__ import annotations
+
+from ctypes import Structure, sizeof
+from importlib import import_module
+from pkgutil import iter_modules
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from fbus import device                                 # noqa: E402
+from fbus.dtypes import dtype_of, frombuffer            # noqa: E402
+
+
+def structures() -> list[type[Structure]]:
+    """Все структуры, объявленные в модулях пакета fbus.device."""
+
+    found = {}
+    for info in iter_modules(device.__path__, f"{device.__name__}."):
+        module = import_module(info.name)
+        for value in vars(module).values():
+            if (isinstance(value, type) and issubclass(value, Structure)
+                    and value.__module__ == module.__name__):
+                found[value.__qualname__, module.__name__] = value
+
+    return [found[key] for key in sorted(found)]
+
+
+STRUCTURES = structures()
+
+
+def name_of(layout: type[Structure]) -> str:
+    return f"{layout.__module__.rsplit('.', 1)[-1]}.{layout.__qualname__}"
+
+
+@pytest.mark.parametrize("layout", STRUCTURES, ids=name_of)
+def test_layout_matches_structure(layout):
+    dtype = dtype_of(layout)
+
+    assert dtype.itemsize == sizeof(layout)
+    assert dtype.names == tuple(field[0] for field in layout._fields_)
+    for name, ctype, *_ in layout._fields_:
+        assert dtype.fields[name][1] == getattr(layout, name).offset, name
+        assert dtype.fields[name][0].itemsize == sizeof(ctype), name
+
+
+@pytest.mark.parametrize("layout", STRUCTURES, ids=name_of)
+def test_records_share_bytes(layout):
+    raw = bytearray(range(256)) * (2 * sizeof(layout) // 256 + 1)
+    records = frombuffer(layout, raw, count=2)
+
+    assert records.tobytes() == bytes(raw[:2 * sizeof(layout)])
+    assert bytes(records[1].tobytes()) == bytes(layout.from_buffer(raw, sizeof(layout)))
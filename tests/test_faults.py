@@ -0,0 +1,55 @@
+#! /usr/bin/env python3
+
+"""Проверка привязки ошибок модулей к групповому обмену."""
+
+from __future__ import annotations
+
+import contextlib
+
+import pytest
+
+from fbus.client import FBUS, FBusError
+from fbus.faults import FaultInjector, Latency, fixed
+from fbus.protocol import FBUS_ADAPTER, FBUS_GROUP_ID_MIN, FIO_MODULE_TYPE
+from fbus.simulator import Simulator
+
+GROUP = FBUS_GROUP_ID_MIN
+RACK = [FIO_MODULE_TYPE.DIM718, FIO_MODULE_TYPE.AIM724]
+
+
+@pytest.fixture()
+def injector():
+    return FaultInjector(Simulator({1: RACK, 2: RACK}),
+                         latencies=[Latency(fixed(1.0), ["fbusProcessGroup"], [1])],
+                         delay=lambda wait: None)
+
+
+def open_bus(injector: FaultInjector, port: int) -> FBUS:
+    bus = FBUS(injector)
+    bus.fbusInitialize()
+    bus.fbusOpen(adapter=FBUS_ADAPTER.TCP, port=port)
+    bus.fbusRescan()
+    return bus
+
+
+def delayed(injector: FaultInjector, bus: FBUS) -> bool:
+    before = injector.delayed
+    with contextlib.suppress(FBusError):
+        bus.fbusProcessGroup(GROUP)
+    return injector.delayed > before
+
+
+def test_groups_are_tracked_per_network(injector):
+    first = open_bus(injector, 1)
+    second = open_bus(injector, 2)
+    first.fbusAssignNodeToGroup(1, GROUP, 0, 0, 0, 0)
+    second.fbusAssignNodeToGroup(0, GROUP, 0, 0, 0, 0)
+
+    assert delayed(injector, first)
+    assert not delayed(injector, second)
+
+    second.fbusClose()
+    assert delayed(injector, first)
+
+    first.fbusDeleteGroup(GROUP)
+    assert not delayed(injector, first)
@@ -0,0 +1,101 @@
+#! /usr/bin/env python3
+
+"""Проверка кольцевого буфера истории входных данных модулей."""
+
+from __future__ import annotations
+
+from ctypes import sizeof
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from fbus.client import FBUS                                    # noqa: E402
+from fbus.device.aim724 import AIM724_INPUTS                    # noqa: E402
+from fbus.device.dim718 import DIM718_INPUTS                    # noqa: E402
+from fbus.history import History, NodeHistory                   # noqa: E402
+from fbus.image import ProcessImage                             # noqa: E402
+from fbus.protocol import FBUS_ADAPTER, FIO_MODULE_TYPE         # noqa: E402
+from fbus.simulator import Simulator                            # noqa: E402
+
+RACK = [FIO_MODULE_TYPE.AIM724, FIO_MODULE_TYPE.DIM718] * 2
+LAYOUTS = {0: AIM724_INPUTS, 1: DIM718_INPUTS, 3: DIM718_INPUTS}
+
+
+@pytest.fixture()
+def simulator():
+    return Simulator({1: RACK})
+
+
+@pytest.fixture()
+def image(simulator):
+    bus = FBUS(simulator)
+    bus.fbusInitialize()
+    bus.fbusOpen(adapter=FBUS_ADAPTER.TCP, port=1)
+    yield ProcessImage.from_rescan(bus)
+
+    bus.fbusClose()
+    bus.fbusDeInitialize()
+
+
+def record(simulator: Simulator, cycle: int) -> None:
+    """Записать во входные данные модулей значения, зависящие от цикла."""
+
+    nodes = simulator.networks[1].nodes
+    nodes[0].inputs[:sizeof(AIM724_INPUTS)] = bytes(AIM724_INPUTS(0, cycle, -cycle, 25.0))
+    nodes[1].inputs[:sizeof(DIM718_INPUTS)] = bytes(DIM718_INPUTS(0, cycle & 0xFF, cycle * 10))
+    nodes[3].inputs[:sizeof(DIM718_INPUTS)] = bytes(DIM718_INPUTS(0, ~cycle & 0xFF))
+
+
+def test_ring_wraps_around(simulator, image):
+    history = History(image, LAYOUTS, capacity=4)
+
+    for cycle in range(1, 11):
+        record(simulator, cycle)
+        image.exchange()
+        history.append(cycle * 0.5)
+
+    node = history.nodes[1]
+    assert (node.count, node.size) == (10, 4)
+
+    times, states = history.window(1, "channelsStates")
+    assert times.tolist() == [3.5, 4.0, 4.5, 5.0]
+    assert states.tolist() == [7, 8, 9, 10]
+    assert history.window(1, "firstHalfDutyState_PWM0", last=2)[1].tolist() == [90, 100]
+    assert history.window(3, "channelsStates", last=1)[1].tolist() == [~10 & 0xFF]
+    assert history.window(0, "channel1")[1].tolist() == [-7.0, -8.0, -9.0, -10.0]
+    assert history.window(0, "channel0", last=100)[1].size == 4
+
+    times, values = history.since(0, "channel0", 4.5)
+    assert times.tolist() == [4.5, 5.0]
+    assert values.tolist() == [9.0, 10.0]
+
+
+def test_window_is_a_view():
+    node = NodeHistory(DIM718_INPUTS, capacity=3)
+    for cycle in range(5):
+        node.append(float(cycle), bytes(DIM718_INPUTS(0, cycle)))
+
+    window = node.window("channelsStates")
+    assert window.tolist() == [2, 3, 4]
+    assert np.shares_memory(window, node.columns["channelsStates"])
+
+    node.clear()
+    assert node.size == 0
+    assert node.window("channelsStates").size == 0
+
+    node.append(7.0, bytes(DIM718_INPUTS(0, 1)))
+    assert node.times().tolist() == [7.0]
+
+
+def test_capacity_from_memory_budget(image):
+    row = sum(NodeHistory.row_size(layout) for layout in LAYOUTS.values())
+    history = History(image, LAYOUTS, max_bytes=100 * 2 * row)
+
+    assert history.capacity == 100
+    assert history.nbytes <= 100 * 2 * row
+
+    with pytest.raises(ValueError):
+        History(image, LAYOUTS)
+    with pytest.raises(ValueError):
+        History(image, LAYOUTS, max_bytes=row)
@@ -0,0 +1,116 @@
+#! /usr/bin/env python3
+
+"""Проверка образа процесса и группового обмена на виртуальной сети."""
+
+from __future__ import annotations
+
+import pytest
+
+from fbus.client import FBUS, FBusError
+from fbus.image import GROUP_DATA_LENGTH_MAX, NodeLayout, ProcessImage, pack_groups
+from fbus.protocol import FBUS_ADAPTER, FBUS_GROUP_ID_MIN, FIO_MODULE_TYPE
+from fbus.simulator import Simulator
+
+RACK = [FIO_MODULE_TYPE.AIM724, FIO_MODULE_TYPE.DIM718, FIO_MODULE_TYPE.NIM741,
+        FIO_MODULE_TYPE.DIM764] * 8
+
+
+@pytest.fixture()
+def simulator():
+    return Simulator({1: RACK})
+
+
+@pytest.fixture()
+def bus(simulator):
+    bus = FBUS(simulator)
+    bus.fbusInitialize()
+    bus.fbusOpen(adapter=FBUS_ADAPTER.TCP, port=1)
+    yield bus
+
+    bus.fbusClose()
+    bus.fbusDeInitialize()
+
+
+def fill(simulator: Simulator, seed: int) -> None:
+    """Заполнить входные данные модулей сети 1 различающимися байтами."""
+
+    for net_id, node in enumerate(simulator.networks[1].nodes):
+        node.inputs[:] = bytes((seed + net_id + index) & 0xFF for index in range(len(node.inputs)))
+
+
+def test_pack_groups():
+    layout = pack_groups([(0, 200, 10), (1, 60, 0), (2, 50, 100)], max_length=255)
+
+    assert layout == [NodeLayout(0, FBUS_GROUP_ID_MIN, 0, 200, 0, 10),
+                      NodeLayout(1, FBUS_GROUP_ID_MIN + 1, 200, 60, 10, 0),
+                      NodeLayout(2, FBUS_GROUP_ID_MIN + 1, 260, 50, 10, 100)]
+
+    with pytest.raises(FBusError):
+        pack_groups([(0, 256, 0)], max_length=255)
+
+
+def test_layout_matches_group_configuration(bus, simulator):
+    image = ProcessImage.from_rescan(bus)
+    nodes = simulator.networks[1].nodes
+
+    assert [node.net_id for node in image.layout] == [net_id for net_id, node in enumerate(nodes)
+                                                      if node.inputs or node.outputs]
+    assert len(image.inputs) == sum(len(node.inputs) for node in nodes)
+    assert len(image.outputs) == sum(len(node.outputs) for node in nodes)
+    assert len(image.groups) > 1
+
+    for group_id in image.groups:
+        members = [node for node in image.layout if node.group_id == group_id]
+        input_base, output_base = members[0].input_offset, members[0].output_offset
+        assert sum(node.input_length for node in members) <= GROUP_DATA_LENGTH_MAX
+        assert sum(node.output_length for node in members) <= GROUP_DATA_LENGTH_MAX
+
+        for node in members:
+            assert node.input_length == len(nodes[node.net_id].inputs)
+            assert node.output_length == len(nodes[node.net_id].outputs)
+
+            conf = bus.fbusGetNodeCommonParameters(node.net_id).GroupConf
+            assert conf.GroupID == group_id
+            assert conf.InputPacketDataOffset == node.input_offset - input_base
+            assert conf.InputModuleDataLength == node.input_length
+            assert conf.OutputPacketDataOffset == node.output_offset - output_base
+            assert conf.OutputModuleDataLength == node.output_length
+
+
+def test_exchange_round_trip(bus, simulator):
+    image = ProcessImage.from_rescan(bus)
+    nodes = simulator.networks[1].nodes
+    fill(simulator, 1)
+    image.outputs[:] = bytes(index & 0xFF for index in range(len(image.outputs)))
+
+    image.exchange()
+
+    for node in image.layout:
+        inputs = image.inputs[node.input_offset:node.input_offset + node.input_length]
+        outputs = image.outputs[node.output_offset:node.output_offset + node.output_length]
+        assert inputs == nodes[node.net_id].inputs
+        assert outputs == nodes[node.net_id].outputs
+
+
+def test_exchange_group(bus, simulator):
+    image = ProcessImage.from_rescan(bus)
+    nodes = simulator.networks[1].nodes
+    fill(simulator, 1)
+    image.exchange()
+    before = bytes(image.inputs)
+    written = [bytes(node.outputs) for node in nodes]
+
+    group_id = image.groups[1]
+    fill(simulator, 100)
+    image.outputs[:] = b"\xa5" * len(image.outputs)
+    image.exchange_group(group_id)
+
+    for node in image.layout:
+        inputs = image.inputs[node.input_offset:node.input_offset + node.input_length]
+        outputs = nodes[node.net_id].outputs
+        if node.group_id == group_id:
+            assert inputs == nodes[node.net_id].inputs
+            assert outputs == b"\xa5" * node.output_length
+        else:
+            assert inputs == before[node.input_offset:node.input_offset + node.input_length]
+            assert outputs == written[node.net_id]
@@ -0,0 +1,95 @@
+#! /usr/bin/env python3
+
+"""Проверка гистограмм задержек и статистики вызовов функций FBUS API."""
+
+from __future__ import annotations
+
+from itertools import count
+
+import pytest
+
+from fbus.client import FBUS, FBusError
+from fbus.device.dim718 import DIM718_INPUTS
+from fbus.metrics import HISTOGRAM_PRECISION, Histogram, Metrics
+from fbus.protocol import FBUS_ADAPTER, FBUS_RESULT, FIO_MODULE_TYPE
+from fbus.simulator import Simulator
+
+EXACT = 1 << HISTOGRAM_PRECISION
+
+
+def bucket(value: int) -> tuple[int, int]:
+    """Номер интервала значения и верхняя граница интервала."""
+
+    histogram = Histogram()
+    histogram.record(value)
+    index = len(histogram.counts) - 1
+    return index, Histogram._highest(index)
+
+
+def test_bucket_boundaries():
+    assert [bucket(value) for value in (0, 1, EXACT - 1)] == [(0, 0), (1, 1), (EXACT - 1, EXACT - 1)]
+    assert bucket(EXACT) == bucket(EXACT + 1) == (EXACT, EXACT + 1)
+    assert bucket(EXACT + 2) == (EXACT + 1, EXACT + 3)
+    assert bucket(2 * EXACT - 1)[1] == 2 * EXACT - 1
+    assert bucket(2 * EXACT) == (EXACT + EXACT // 2, 2 * EXACT + 3)
+
+    # Интервалы смежные, а их относительная ширина не больше 2^-(precision-1)
+    previous = -1
+    for value in range(0, 1 << 16):
+        _, highest = bucket(value)
+        if highest != previous:     # Новый интервал начинается сразу за предыдущим
+            assert value == previous + 1
+        assert highest - value < max(value >> (HISTOGRAM_PRECISION - 1), 1)
+        previous = highest
+
+
+def test_percentiles():
+    histogram = Histogram()
+    assert (histogram.percentile(0.5), histogram.mean) == (0, 0.0)
+
+    for value in range(1, 101):
+        histogram.record(value)
+    assert [histogram.percentile(q) for q in (0.0, 0.5, 0.99, 1.0)] == [1, 50, 99, 100]
+    assert (histogram.min, histogram.max, histogram.mean) == (1, 100, 50.5)
+
+    large = Histogram()
+    for value in (10_000, 1_000_000, 1_000_001):
+        large.record(value)
+    assert 1_000_000 <= large.percentile(0.5) <= 1_000_000 * (1 + 2 ** -(HISTOGRAM_PRECISION - 1))
+    assert large.percentile(1.0) == 1_000_001
+
+    histogram.merge(large)
+    assert (histogram.count, histogram.min, histogram.max) == (103, 1, 1_000_001)
+    assert large.summary() == (3, large.percentile(0.5), 1_000_001, 1_000_001, large.mean)
+
+
+def test_call_statistics():
+    ticks = count(0, 1000)
+    metrics = Metrics(clock=lambda: next(ticks))
+    bus = FBUS(Simulator({1: [FIO_MODULE_TYPE.DIM718] * 3}))
+    bus.fbusInitialize()
+    bus.fbusOpen(adapter=FBUS_ADAPTER.TCP, port=1)
+    try:
+        bus.fbusRescan()
+        assert bus.instrument(metrics) is metrics
+        for net_id in (0, 1, 1):
+            bus.fbusReadInputs(net_id, DIM718_INPUTS)
+        with pytest.raises(FBusError) as error:
+            bus.fbusReadInputs(7, DIM718_INPUTS)
+
+        snapshot = metrics.snapshot()
+        assert snapshot.functions["fbusReadInputs"].summary() == (4, 1000, 1000, 1000, 1000.0)
+        assert {net_id: histogram.count for net_id, histogram in snapshot.nodes.items()} == {
+            0: 1, 1: 2, 7: 1}
+        assert snapshot.results["fbusReadInputs"] == {FBUS_RESULT.OK: 3, error.value.result: 1}
+        assert snapshot.summary()["results"]["fbusReadInputs"]["OK"] == 3
+
+        assert metrics.snapshot(reset=True).functions["fbusReadInputs"].count == 4
+        assert metrics.snapshot().functions == {}
+
+        bus.uninstrument()
+        bus.fbusReadInputs(0, DIM718_INPUTS)
+        assert metrics.snapshot().functions == {}
+    finally:
+        bus.fbusClose()
+        bus.fbusDeInitialize()
@@ -0,0 +1,193 @@
+#! /usr/bin/env python3
+
+"""Проверка моделей поведения модулей виртуальной сети."""
+
+from __future__ import annotations
+
+from random import Random
+
+import pytest
+
+from fbus.client import FBUS, FBusError
+from fbus.device.aim720 import AIM720_INPUTS
+from fbus.device.aim724 import AIM724_INPUTS
+from fbus.device.dim714 import (DIM714_CONFIGURATION, DIM714_COUNTER_DIRECTION,
+                                DIM714_COUNTER_MODE, DIM714_INPUTS)
+from fbus.device.dim718 import DIM718_INPUTS, DIM718_OUTPUTS
+from fbus.device.dim764 import DIM764_INPUTS, DIM764_OUTPUTS
+from fbus.device.nim74x import NIM74X_INPUTS, NIM74X_OUTPUTS
+from fbus.models import (AnalogInput, Counter, OutputReadback, PulseCounter, SerialPort,
+                         constant, generate_networks, model_for, ramp, sine, square)
+from fbus.protocol import FBUS_ADAPTER, FIO_MODULE_TYPE
+from fbus.registry import layouts_of
+from fbus.simulator import SimNode, Simulator
+
+FAMILIES = {
+    FIO_MODULE_TYPE.AIM720: AnalogInput, FIO_MODULE_TYPE.AIM792: AnalogInput,
+    FIO_MODULE_TYPE.DIM714: Counter, FIO_MODULE_TYPE.DIM762: Counter,
+    FIO_MODULE_TYPE.DIM764: PulseCounter, FIO_MODULE_TYPE.DIM718: OutputReadback,
+    FIO_MODULE_TYPE.AIM730: OutputReadback, FIO_MODULE_TYPE.NIM742: SerialPort,
+}
+
+
+def defined_types() -> list[FIO_MODULE_TYPE]:
+    types = []
+    for module_type in FIO_MODULE_TYPE:
+        try:
+            layouts_of(module_type)
+        except FBusError:
+            continue
+        types.append(module_type)
+
+    return types
+
+
+class Clock:
+    """Управляемые часы виртуальной сети."""
+
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture()
+def clock():
+    return Clock()
+
+
+@pytest.fixture()
+def open_bus():
+    buses = []
+
+    def open_bus(simulator: Simulator) -> FBUS:
+        bus = FBUS(simulator)
+        bus.fbusInitialize()
+        bus.fbusOpen(adapter=FBUS_ADAPTER.TCP, port=1)
+        bus.fbusRescan()
+        buses.append(bus)
+        return bus
+
+    yield open_bus
+
+    for bus in buses:
+        bus.fbusClose()
+        bus.fbusDeInitialize()
+
+
+@pytest.mark.parametrize("module_type", defined_types(), ids=lambda module_type: module_type.name)
+def test_model_for_every_type(module_type):
+    node = model_for(module_type, Random(1), serial=7)
+
+    assert isinstance(node, FAMILIES.get(module_type, SimNode))
+    assert (node.type, node.serial) == (module_type, 7)
+    assert node.description().InputsSize == len(node.inputs)
+    node.update(1.0)
+
+
+def test_generate_networks():
+    networks = generate_networks(3, nodes=5, seed=42)
+    again = generate_networks(3, nodes=5, seed=42)
+
+    assert list(networks) == [1, 2, 3]
+    assert [node.type for node in networks[2]] == [node.type for node in again[2]]
+    assert [node.serial for rack in networks.values() for node in rack] == list(range(1, 16))
+
+    digital = generate_networks(1, nodes=10, types=[FIO_MODULE_TYPE.DIM718], seed=1)
+    assert all(isinstance(node, OutputReadback) for node in digital[1])
+
+    for count in (0, 101):
+        with pytest.raises(ValueError):
+            generate_networks(count)
+
+
+def test_waveforms():
+    assert constant(3.0)(100.0) == 3.0
+    assert sine(2.0, 1.0, offset=1.0)(0.25) == pytest.approx(3.0)
+    assert [ramp(0.0, 10.0, 2.0)(now) for now in (0.0, 1.0, 2.5)] == [0.0, 5.0, 2.5]
+    assert [square(-1.0, 1.0, 1.0)(now) for now in (0.1, 0.6, 1.1)] == [1.0, -1.0, 1.0]
+
+
+def test_analog_codes_are_clamped(clock, open_bus):
+    coded = AnalogInput(FIO_MODULE_TYPE.AIM720, {"voltageInput0": ramp(0.0, 10.0, 1.0),
+                                                 "voltageInput1": constant(20.0),
+                                                 "voltageInput2": constant(-5.0)},
+                        scale=(0.0, 10.0, 0xFFF))
+    raw = AnalogInput(FIO_MODULE_TYPE.AIM720, {"voltageInput0": constant(-3.0),
+                                               "currentInput0": constant(1234.4)})
+    physical = AnalogInput(FIO_MODULE_TYPE.AIM724, {"channel0": constant(-2.5)})
+    bus = open_bus(Simulator({1: [coded, raw, physical]}, clock=clock))
+
+    clock.now = 0.25
+    inputs = bus.fbusReadInputs(0, AIM720_INPUTS)
+    assert (inputs.voltageInput0, inputs.voltageInput1, inputs.voltageInput2) == (1024, 0xFFF, 0)
+
+    inputs = bus.fbusReadInputs(1, AIM720_INPUTS)
+    assert (inputs.voltageInput0, inputs.currentInput0) == (0, 1234)
+    assert bus.fbusReadInputs(2, AIM724_INPUTS).channel0 == -2.5
+
+
+def test_counter_limits(clock, open_bus):
+    counter = Counter(FIO_MODULE_TYPE.DIM714, rates=(10.0, 10.0))
+    bus = open_bus(Simulator({1: [counter]}, clock=clock))
+    config = DIM714_CONFIGURATION(enableCounting=1)
+    config.countingParameters[0].direction = DIM714_COUNTER_DIRECTION.DOWNWARDCOUNT
+    config.countingParameters[0].countingMode = DIM714_COUNTER_MODE.CONTINUOUSUPDATE
+    config.countingParameters[0].presetValue = 5
+    config.countingParameters[1].countingMode = DIM714_COUNTER_MODE.CYCLICUPDATE
+    config.countingParameters[1].presetValue = 0xFFFA
+    bus.fbusSetNodeSpecificParameters(0, config)
+    bus.fbusWriteConfig(0)
+
+    clock.now = 1.0
+    assert (bus.fbusReadInputs(0, DIM714_INPUTS).counter0, counter.COUNTER_MAX) == (5, 0xFFFF)
+    clock.now = 1.3
+    inputs = bus.fbusReadInputs(0, DIM714_INPUTS)
+    assert (inputs.counter0, inputs.counter1) == (2, 0xFFFD)
+    clock.now = 2.0
+    inputs = bus.fbusReadInputs(0, DIM714_INPUTS)
+    assert (inputs.counter0, inputs.counter1) == (0, 4)     # Остановка и переход через ноль
+
+    bus.fbusWriteConfig(0)                                  # Счет начинается заново
+    clock.now = 2.1
+    assert bus.fbusReadInputs(0, DIM714_INPUTS).counter0 == 5
+
+
+def test_pulse_counter_reset(clock, open_bus):
+    node = PulseCounter(rates=(100.0,) * 8)
+    for channel in node._config.channelsConfig[:2]:
+        channel.inputMode = PulseCounter.COUNTER_MODE
+    bus = open_bus(Simulator({1: [node]}, clock=clock))
+
+    bus.fbusReadInputs(0, DIM764_INPUTS)
+    clock.now = 0.5
+    assert list(bus.fbusReadInputs(0, DIM764_INPUTS).values) == [50, 50] + [0] * 6
+
+    bus.fbusWriteOutputs(0, DIM764_OUTPUTS(control=9, resetCounters=1))
+    clock.now = 0.75
+    inputs = bus.fbusReadInputs(0, DIM764_INPUTS)
+    assert (inputs.controlState, inputs.values[0]) == (9, 25)
+
+
+def test_readback_and_serial_loopback(clock, open_bus):
+    bus = open_bus(Simulator({1: [OutputReadback(FIO_MODULE_TYPE.DIM718),
+                                  SerialPort(FIO_MODULE_TYPE.NIM741)]}, clock=clock))
+
+    bus.fbusWriteOutputs(0, DIM718_OUTPUTS(0xA5, 100, 200))
+    inputs = bus.fbusReadInputs(0, DIM718_INPUTS)
+    assert (inputs.channelsStates, inputs.firstHalfDutyState_PWM0,
+            inputs.secondHalfDutyState_PWM0) == (0xA5, 100, 200)
+
+    outputs = NIM74X_OUTPUTS(Control=SerialPort.TRANSMIT, tx_Control=1, tx_Length=3)
+    outputs.tx_Data[:3] = b"abc"
+    bus.fbusWriteOutputs(1, outputs)
+    assert bus.fbusReadInputs(1, NIM74X_INPUTS).FIFOLength == 3
+
+    bus.fbusWriteOutputs(1, outputs)                        # tx_Control не изменился
+    assert bus.fbusReadInputs(1, NIM74X_INPUTS).FIFOLength == 3
+
+    bus.fbusWriteOutputs(1, NIM74X_OUTPUTS(Control=SerialPort.RECEIVE, tx_Control=2))
+    inputs = bus.fbusReadInputs(1, NIM74X_INPUTS)
+    assert (inputs.rx_Control, inputs.rx_Length, inputs.FIFOLength) == (2, 3, 0)
+    assert bytes(inputs.rx_Data[:3]) == b"abc"
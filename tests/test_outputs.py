@@ -0,0 +1,118 @@
+#! /usr/bin/env python3
+
+"""Проверка кэша выходных данных модулей на виртуальной сети."""
+
+from __future__ import annotations
+
+import pytest
+
+from fbus.client import FBUS
+from fbus.outputs import OutputCache
+from fbus.protocol import FBUS_ADAPTER, FIO_MODULE_TYPE
+from fbus.simulator import Simulator
+
+RACK = [FIO_MODULE_TYPE.DIM718, FIO_MODULE_TYPE.NIM741]
+
+
+@pytest.fixture()
+def simulator():
+    simulator = Simulator({1: RACK})
+    for node in simulator.networks[1].nodes:
+        node.outputs[:] = b"\xff" * len(node.outputs)     # Текущее состояние выходов модулей
+    return simulator
+
+
+@pytest.fixture()
+def bus(simulator):
+    bus = FBUS(simulator)
+    bus.fbusInitialize()
+    bus.fbusOpen(adapter=FBUS_ADAPTER.TCP, port=1)
+    bus.fbusRescan()
+    yield bus
+
+    bus.fbusClose()
+    bus.fbusDeInitialize()
+
+
+def outputs(simulator: Simulator, net_id: int) -> bytes:
+    return bytes(simulator.networks[1].nodes[net_id].outputs)
+
+
+def test_partial_write_keeps_other_outputs(bus, simulator):
+    cache = OutputCache(bus)
+    cache.write(0, b"\x01\x02", offset=2)
+
+    assert outputs(simulator, 0) == b"\xff" * 17     # До commit() ничего не передается
+    assert cache.commit() == 1
+    assert outputs(simulator, 0) == b"\xff\xff\x01\x02" + b"\xff" * 13
+    assert cache.get(0) == b"\x00\x00\x01\x02"
+
+
+def test_writes_are_merged(bus, simulator):
+    cache = OutputCache(bus)
+    cache.write(1, b"\x01", offset=4)
+    cache.write(1, b"\x02\x03", offset=5)
+    cache.write(1, b"\x04", offset=4)
+    cache.write(0, b"\x05")
+
+    assert cache.commit() == 2
+    assert outputs(simulator, 1)[3:8] == b"\xff\x04\x02\x03\xff"
+    assert outputs(simulator, 0)[:2] == b"\x05\xff"
+    assert (cache.writes, cache.transactions, cache.saved) == (4, 2, 2)
+
+
+def test_unwritten_gap_is_not_sent(bus, simulator):
+    cache = OutputCache(bus)
+    cache.write(1, b"\x01\x02", offset=0)
+    cache.write(1, b"\x03", offset=5)
+
+    assert cache.commit() == 2
+    assert outputs(simulator, 1)[:7] == b"\x01\x02\xff\xff\xff\x03\xff"
+    assert cache.saved == 0
+
+
+def test_unchanged_data_is_skipped(bus, simulator):
+    cache = OutputCache(bus)
+    cache.write(0, b"\x01\x02")
+    cache.commit()
+    simulator.networks[1].nodes[0].outputs[0] = 0xAA    # Изменение выходов не через кэш
+
+    cache.write(0, b"\x01")
+    cache.write(0, b"\x02", offset=1)
+    assert cache.commit() == 0
+    assert outputs(simulator, 0)[:2] == b"\xaa\x02"
+    assert (cache.writes, cache.transactions, cache.saved) == (3, 1, 2)
+
+    cache.write(0, b"\x03")
+    assert cache.writes - cache.saved - cache.transactions == 1     # Еще не передана
+    assert cache.commit() == 1
+    assert outputs(simulator, 0)[:2] == b"\x03\x02"
+
+
+def test_forced_refresh(bus, simulator):
+    cache = OutputCache(bus, refresh=0.0)
+    assert cache.commit() == 0                          # Нечего обновлять
+
+    cache.write(0, b"\x01\x02", offset=1)
+    cache.write(0, b"\x03", offset=4)
+    assert cache.commit() == 2
+    simulator.networks[1].nodes[0].outputs[:] = bytes(17)
+
+    assert cache.commit() == 2
+    assert outputs(simulator, 0)[:6] == b"\x00\x01\x02\x00\x03\x00"
+    assert (cache.transactions, cache.refreshes, cache.saved) == (4, 2, 0)
+
+
+def test_invalidate_resends(bus, simulator):
+    cache = OutputCache(bus)
+    cache.write(1, b"\x07", offset=3)
+    cache.commit()
+    simulator.networks[1].nodes[1].outputs[3] = 0
+
+    assert cache.commit() == 0
+    cache.invalidate(1)
+    assert cache.commit() == 1
+    assert outputs(simulator, 1)[3] == 7
+
+    cache.reset_statistics()
+    assert (cache.writes, cache.transactions, cache.refreshes, cache.saved) == (0, 0, 0, 0)
@@ -0,0 +1,83 @@
+#! /usr/bin/env python3
+
+"""Проверка разбиения модулей на группы обмена."""
+
+from __future__ import annotations
+
+import warnings
+
+import pytest
+
+from fbus.client import FBUS, FBusError
+from fbus.image import read_node_sizes
+from fbus.partition import GROUP_COUNT_MAX, partition
+from fbus.protocol import FBUS_ADAPTER, FBUS_GROUP_ID_MIN, FIO_MODULE_TYPE
+from fbus.simulator import Simulator
+
+RACK = [FIO_MODULE_TYPE.AIM724, FIO_MODULE_TYPE.DIM718, FIO_MODULE_TYPE.NIM741,
+        FIO_MODULE_TYPE.DIM764] * 4
+
+
+def test_plan_is_applied_on_simulator():
+    simulator = Simulator({1: RACK})
+    bus = FBUS(simulator)
+    bus.fbusInitialize()
+    bus.fbusOpen(adapter=FBUS_ADAPTER.TCP, port=1)
+    sizes = read_node_sizes(bus, bus.fbusRescan())
+    periods = {net_id: 0.01 if net_id % 2 else 0.1 for net_id, _, _ in sizes}
+
+    with warnings.catch_warnings():
+        warnings.simplefilter("error")
+        plan = partition((net_id, inputs, outputs, periods[net_id])
+                         for net_id, inputs, outputs in sizes)
+
+    assert sorted(node.net_id for node in plan.layout) == [net_id for net_id, _, _ in sizes]
+    assert [group.group_id for group in plan.groups] == \
+           list(range(FBUS_GROUP_ID_MIN, FBUS_GROUP_ID_MIN + len(plan.groups)))
+    for group in plan.groups:
+        assert group.period == min(periods[net_id] for net_id in group.net_ids)
+    assert 0 < plan.load < 1
+    assert plan.load == pytest.approx(sum(group.bus_time / group.period for group in plan.groups))
+    assert f"total load: {plan.load * 100:.2f} %" in plan.report()
+
+    image = plan.apply(bus)
+    nodes = simulator.networks[1].nodes
+    for node in nodes:
+        node.inputs[:] = bytes(range(len(node.inputs)))
+    image.exchange()
+    for node in image.layout:
+        assert image.inputs[node.input_offset:node.input_offset + node.input_length] == \
+               nodes[node.net_id].inputs
+
+    bus.fbusClose()
+    bus.fbusDeInitialize()
+
+
+def test_overload_warnings():
+    with pytest.warns(RuntimeWarning) as record:
+        partition([(0, 100, 100, 0.0005), (1, 10, 0, 0.0005)])
+
+    messages = [str(warning.message) for warning in record]
+    assert any(message.startswith(f"Group {FBUS_GROUP_ID_MIN:#x}") for message in messages)
+    assert any(message.startswith("Bus load") for message in messages)
+
+
+def test_group_count_is_a_constraint():
+    nodes = [(net_id, 10, 10, 0.001 * 10 ** net_id) for net_id in range(4)]
+    assert len(partition(nodes).groups) == 4
+
+    plan = partition(nodes, max_groups=2)
+    assert len(plan.groups) == 2
+    assert sorted(node.net_id for node in plan.layout) == list(range(4))
+
+
+def test_group_limit_error():
+    nodes = [(net_id, 200, 0, 0.01) for net_id in range(GROUP_COUNT_MAX + 1)]
+    with pytest.raises(FBusError, match="do not fit"):
+        partition(nodes)
+
+    with pytest.raises(FBusError, match="do not fit"):
+        partition(nodes[:3], max_groups=2)
+
+    with pytest.raises(FBusError):
+        partition(nodes[:1], max_groups=GROUP_COUNT_MAX + 1)
@@ -0,0 +1,84 @@
+#! /usr/bin/env python3
+
+"""Проверка записи трассы вызовов и ее воспроизведения."""
+
+from __future__ import annotations
+
+from ctypes import byref, c_int, c_size_t, c_uint8, sizeof
+from io import BytesIO
+
+from fbus.client import FBUS, Backend, FBusDevice
+from fbus.image import ProcessImage
+from fbus.protocol import FBUS_ADAPTER, FIO_MODULE_DESC, FIO_MODULE_TYPE
+from fbus.recorder import Recorder, Replay, read_trace
+from fbus.simulator import Simulator
+
+RACK = [FIO_MODULE_TYPE.AIM724, FIO_MODULE_TYPE.DIM718] * 4
+
+
+class Trace(BytesIO):
+    def close(self) -> None:    # Содержимое нужно после закрытия Recorder
+        pass
+
+
+def exchange(bus: FBUS, cycles: int) -> list[bytes]:
+    bus.fbusInitialize()
+    bus.fbusOpen(adapter=FBUS_ADAPTER.TCP, port=1)
+    image = ProcessImage.from_rescan(bus)
+
+    snapshots = []
+    for number in range(cycles):
+        image.outputs[:] = bytes([number]) * len(image.outputs)
+        image.exchange()
+        snapshots.append(bytes(image.inputs))
+
+    bus.fbusClose()
+    bus.fbusDeInitialize()
+    return snapshots
+
+
+def test_trace_is_flushed_and_replayed():
+    trace = Trace()
+    with Recorder(trace, Simulator({1: RACK}), buffer_size=4096) as recorder:
+        expected = exchange(FBUS(recorder), 50)
+
+    records = read_trace(trace.getvalue())
+    assert len(records) == recorder.calls
+    assert records[0].name == "fbusInitialize"
+    assert records[-1].name == "fbusDeInitialize"
+
+    read = [record for record in records if record.name == "fbusGroup_getNodeInputs"]
+    assert read and all(len(record.buffers[5]) == record.arguments[5] for record in read)
+
+    replay = Replay(trace.getvalue())
+    assert exchange(FBUS(replay), 50) == expected
+    assert replay.done
+
+
+class Constant(Backend):
+    """Бэкенд, все функции которого завершаются успешно без действий."""
+
+    def functions(self) -> dict:
+        return {name: lambda *arguments: True for name in FBusDevice._functions_}
+
+
+def test_ctypes_arguments_are_recorded():
+    trace = Trace()
+    descr = FIO_MODULE_DESC(Type=FIO_MODULE_TYPE.DIM718, SerialNumber=12)
+    major, minor = c_int(2), c_int(4)
+    data = (c_uint8 * 8)(*range(8))
+
+    with Recorder(trace, Constant()) as recorder:
+        functions = recorder.functions()
+        functions["fbusProcessGroup"](c_size_t(3), c_uint8(0x81))
+        functions["fbusGetVersion"](byref(major), byref(minor))
+        functions["fbusGetNodeDescription"](c_size_t(3), c_uint8(5), descr, sizeof(descr))
+        functions["fbusReadInputs"](c_size_t(3), 1, byref(data, 2), 0, c_size_t(4))
+
+    process, version, description, inputs = read_trace(trace.getvalue())
+    assert process.arguments == (3, 0x81)
+    assert version.buffers == {0: bytes(major), 1: bytes(minor)}
+    assert description.arguments[:2] == (3, 5)
+    assert description.buffers == {2: bytes(descr)}
+    assert inputs.arguments == (3, 1, 4, 0, 4)
+    assert inputs.buffers == {2: bytes(range(2, 6))}
@@ -0,0 +1,98 @@
+#! /usr/bin/env python3
+
+"""Проверка соответствия типов модулей структурам из fbus.device."""
+
+from __future__ import annotations
+
+from ctypes import sizeof
+
+import pytest
+
+from fbus import registry
+from fbus.client import FBUS, FBusError
+from fbus.device.dim718 import DIM718_CONFIGURATION, DIM718_INPUTS, DIM718_OUTPUTS
+from fbus.device.nim74x import NIM74X_INPUTS
+from fbus.protocol import FBUS_ADAPTER, FIO_MODULE_DESC, FIO_MODULE_TYPE
+from fbus.registry import check_sizes, layouts_for, layouts_of, register_device
+from fbus.simulator import SimNode, Simulator
+
+UNDEFINED = {FIO_MODULE_TYPE.UNKNOWN, FIO_MODULE_TYPE.AIM732}
+
+
+def description(module_type: int, inputs: int, outputs: int) -> FIO_MODULE_DESC:
+    descr = FIO_MODULE_DESC()
+    descr.Type = module_type
+    descr.TypeName = FIO_MODULE_TYPE(module_type).name.encode()
+    descr.InputsSize = inputs
+    descr.OutputsSize = outputs
+    return descr
+
+
+@pytest.mark.parametrize("module_type", sorted(set(FIO_MODULE_TYPE) - UNDEFINED),
+                         ids=lambda module_type: module_type.name)
+def test_every_type_has_layouts(module_type):
+    layouts = layouts_of(module_type)
+
+    assert layouts.inputs is not None or layouts.outputs is not None
+    for layout in (layouts.inputs, layouts.outputs, layouts.configuration):
+        assert layout is None or layout.__module__ == layouts.module
+
+
+@pytest.mark.parametrize("module_type", sorted(UNDEFINED), ids=lambda module_type: module_type.name)
+def test_undefined_types_raise(module_type):
+    with pytest.raises(FBusError):
+        layouts_of(module_type)
+    with pytest.raises(FBusError):
+        layouts_of(0xFFFF)
+
+
+def test_shared_and_registered_modules():
+    assert layouts_of(FIO_MODULE_TYPE.NIM742).inputs is NIM74X_INPUTS
+    assert layouts_of(FIO_MODULE_TYPE.AIM72503).module == "fbus.device.aim725"
+
+    register_device(0xFFFF, "fbus.device.dim718", "DIM718")
+    try:
+        assert layouts_of(0xFFFF).configuration is DIM718_CONFIGURATION
+    finally:
+        del registry._modules[0xFFFF]
+        layouts_of.cache_clear()
+    with pytest.raises(FBusError):
+        layouts_of(0xFFFF)
+
+
+def test_size_checks():
+    sizes = sizeof(DIM718_INPUTS), sizeof(DIM718_OUTPUTS)
+    assert layouts_for(description(FIO_MODULE_TYPE.DIM718, *sizes)).inputs is DIM718_INPUTS
+
+    with pytest.raises(FBusError, match="DIM718_INPUTS size"):
+        layouts_for(description(FIO_MODULE_TYPE.DIM718, sizes[0] + 1, sizes[1]))
+    with pytest.raises(FBusError, match="DIM718_OUTPUTS size"):
+        check_sizes(layouts_of(FIO_MODULE_TYPE.DIM718), description(FIO_MODULE_TYPE.DIM718,
+                                                                     sizes[0], 0))
+
+
+def test_read_node_inputs():
+    undefined = SimNode(FIO_MODULE_TYPE.DIM718)
+    undefined.type = FIO_MODULE_TYPE.AIM732
+    resized = SimNode(FIO_MODULE_TYPE.DIM718)
+    resized.inputs = bytearray(sizeof(DIM718_INPUTS) + 2)
+    simulator = Simulator({1: [FIO_MODULE_TYPE.DIM718, undefined, resized]})
+    simulator.networks[1].nodes[0].inputs[:] = bytes(DIM718_INPUTS(0, 0x81, 500))
+
+    bus = FBUS(simulator)
+    bus.fbusInitialize()
+    bus.fbusOpen(adapter=FBUS_ADAPTER.TCP, port=1)
+    try:
+        bus.fbusRescan()
+        inputs = bus.fbusReadNodeInputs(0)
+        assert isinstance(inputs, DIM718_INPUTS)
+        assert (inputs.channelsStates, inputs.firstHalfDutyState_PWM0) == (0x81, 500)
+        assert bus.fbusGetNodeLayouts(0) is bus.fbusGetNodeLayouts(0)
+
+        with pytest.raises(FBusError, match="No device layouts"):
+            bus.fbusReadNodeInputs(1)
+        with pytest.raises(FBusError, match="does not match"):
+            bus.fbusReadNodeInputs(2)
+    finally:
+        bus.fbusClose()
+        bus.fbusDeInitialize()
@@ -0,0 +1,107 @@
+#! /usr/bin/env python3
+
+"""Проверка пересчета кодов аналоговых модулей в физические величины."""
+
+from __future__ import annotations
+
+from ctypes import sizeof
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from fbus.client import FBUS, FBusError                         # noqa: E402
+from fbus.device.aim720 import (AIM720_CONFIGURATION, AIM720_INPUTS,  # noqa: E402
+                                AIM720_RANGE)
+from fbus.device.aim792 import (AIM792_CONFIGURATION, AIM792_INPUTS,  # noqa: E402
+                                AIM792_RANGE)
+from fbus.image import ProcessImage                             # noqa: E402
+from fbus.protocol import FBUS_ADAPTER, FIO_MODULE_TYPE         # noqa: E402
+from fbus.scaling import NodeScale, Scaler, get_scale           # noqa: E402
+from fbus.simulator import Simulator                            # noqa: E402
+
+RANGES_792 = [AIM792_RANGE.V0_5, AIM792_RANGE.V0_10, AIM792_RANGE.VDIFF5,
+              AIM792_RANGE.VDIFF10] * 2
+
+
+def configure(bus: FBUS) -> None:
+    """Назначить диапазоны каналов в конфигурации сети."""
+
+    bus.fbusSetNodeSpecificParameters(0, AIM720_CONFIGURATION(inputsRange=AIM720_RANGE.VM10_10))
+    config = AIM792_CONFIGURATION()
+    config.channelRanges[:] = RANGES_792
+    bus.fbusSetNodeSpecificParameters(1, config)
+
+
+@pytest.fixture()
+def simulator():
+    return Simulator({1: [FIO_MODULE_TYPE.AIM720, FIO_MODULE_TYPE.AIM792]})
+
+
+@pytest.fixture()
+def bus(simulator):
+    bus = FBUS(simulator)
+    bus.fbusInitialize()
+    bus.fbusOpen(adapter=FBUS_ADAPTER.TCP, port=1)
+    yield bus
+
+    bus.fbusClose()
+    bus.fbusDeInitialize()
+
+
+def test_codes_to_units(bus, simulator):
+    nodes = simulator.networks[1].nodes
+    nodes[0].inputs[:sizeof(AIM720_INPUTS)] = bytes(AIM720_INPUTS(0, 0, 0x800, 0xFFFF))
+    aim792 = AIM792_INPUTS()
+    aim792.values[:] = [0, 0xFFFF, 0, 0x8000, 0xFFFF, 0, 0xFFFF, 0x4000]
+    nodes[1].inputs[:sizeof(AIM792_INPUTS)] = bytes(aim792)
+    image = ProcessImage.from_rescan(bus)
+    configure(bus)
+    image.exchange()
+    scaler = Scaler(bus)
+
+    # Действительны 12 младших разрядов кода AIM720
+    values = scaler.decode(0, image.inputs, image.nodes[0].input_offset, 1)
+    assert scaler.node(0).units == ["V"] * 3
+    assert values.shape == (1, 3)
+    assert values[0] == pytest.approx([-10.0, -10.0 + 0x800 * 20 / 0xFFF, 10.0])
+
+    values = scaler.decode(1, image.inputs, image.nodes[1].input_offset, 1)[0]
+    assert values == pytest.approx([0.0, 10.0, -5.0, -10.0 + 0x8000 * 20 / 0xFFFF,
+                                    5.0, 0.0, 5.0, -10.0 + 0x4000 * 20 / 0xFFFF])
+
+    assert scaler.convert(1, np.array([0xFFFF, 0]), channel=2) == pytest.approx([5.0, -5.0])
+
+
+def test_encode_round_trip(bus):
+    bus.fbusRescan()
+    configure(bus)
+    node = Scaler(bus).node(1)
+    values = np.array([[0.0, 3.3, -4.99, 7.5, 5.0, 10.0, 0.001, -10.0]])
+
+    codes = node.encode(values)
+    assert codes.dtype == np.uint32
+    assert np.abs(node.convert(codes) - values).max() <= node.gain.max() / 2
+
+    # Значения вне диапазона ограничиваются шкалой
+    assert node.encode(np.array([-1.0, 11.0]), channel=1).tolist() == [0, 0xFFFF]
+    assert node.encode(np.array([-20.0, 20.0]), channel=3).tolist() == [0, 0xFFFF]
+
+
+def test_cached_ranges_and_errors(bus):
+    bus.fbusRescan()
+    configure(bus)
+    scaler = Scaler(bus)
+    assert scaler.node(0).specs[0].low == -10.0
+
+    bus.fbusSetNodeSpecificParameters(0, AIM720_CONFIGURATION(inputsRange=AIM720_RANGE.V0_5))
+    assert scaler.node(0).specs[0].low == -10.0
+    scaler.invalidate(0)
+    assert (scaler.node(0).specs[0].low, scaler.node(0).specs[0].high) == (0.0, 5.0)
+
+    with pytest.raises(FBusError):
+        get_scale(FIO_MODULE_TYPE.DIM718)
+    with pytest.raises(FBusError):
+        NodeScale(get_scale(FIO_MODULE_TYPE.AIM720), [AIM720_RANGE.V0_5] * 2)
+    with pytest.raises(FBusError):
+        NodeScale(get_scale(FIO_MODULE_TYPE.AIM720), [0, 1, 7])
@@ -0,0 +1,59 @@
+#! /usr/bin/env python3
+
+"""Проверка планирования тактов многочастотного планировщика."""
+
+from __future__ import annotations
+
+from time import sleep
+
+import pytest
+
+from fbus.client import FBusError
+from fbus.scheduler import HYPERPERIOD_MAX, Scheduler
+
+
+def test_long_hyperperiod_is_rejected():
+    scheduler = Scheduler(None)
+    scheduler.add("fast", 0.0013, lambda: None)
+    scheduler.add("coprime", 0.0017, lambda: None)     # 221 такт
+
+    with pytest.raises(FBusError, match="Hyperperiod .* is too long"):
+        scheduler.add("slow", 1.7003, lambda: None)
+
+    assert [task.name for task in scheduler.tasks] == ["fast", "coprime"]
+    assert scheduler.hyperperiod == 13 * 17 <= HYPERPERIOD_MAX
+
+
+def test_empty_ticks_are_skipped():
+    scheduler = Scheduler(None)
+    scheduler.add("even", 0.002, lambda: None)
+    scheduler.add("third", 0.003, lambda: None)
+    assert not all(scheduler._slots)
+
+    ticks = []
+    cycle = scheduler.cycle
+    scheduler.cycle = lambda tick: (ticks.append(tick), cycle(tick))
+    scheduler.run(cycles=10)
+
+    assert len(ticks) == 10
+    assert all(scheduler._slots[tick % scheduler.hyperperiod] for tick in ticks)
+
+
+def test_overdue_tasks_run_after_overrun():
+    scheduler = Scheduler(None)
+    stall = [0.05]
+
+    def fast() -> None:
+        if stall:
+            sleep(stall.pop())
+
+    scheduler.add("fast", 0.002, fast)
+    tasks = [scheduler.add(f"slow {number}", 0.02, lambda: None) for number in range(4)]
+
+    scheduler.run(cycles=2)
+
+    assert scheduler.overruns
+    assert scheduler.missed > 0
+    overdue = [task for task in tasks if task.overdue]
+    assert overdue
+    assert all(task.runs >= 1 for task in overdue)
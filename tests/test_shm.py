@@ -0,0 +1,134 @@
+#! /usr/bin/env python3
+
+"""Проверка публикации образа процесса в разделяемую память."""
+
+from __future__ import annotations
+
+import multiprocessing
+
+import pytest
+
+from fbus.client import FBUS, FBusError
+from fbus.device.dim718 import DIM718_INPUTS, DIM718_OUTPUTS
+from fbus.image import NodeLayout, ProcessImage
+from fbus.protocol import FBUS_ADAPTER, FIO_MODULE_TYPE
+from fbus.shm import SharedImageReader, SharedImageWriter
+from fbus.simulator import Simulator
+
+RACK = [FIO_MODULE_TYPE.AIM724, FIO_MODULE_TYPE.DIM718, FIO_MODULE_TYPE.NIM741] * 4
+
+
+@pytest.fixture()
+def simulator():
+    return Simulator({1: RACK})
+
+
+@pytest.fixture()
+def bus(simulator):
+    bus = FBUS(simulator)
+    bus.fbusInitialize()
+    bus.fbusOpen(adapter=FBUS_ADAPTER.TCP, port=1)
+    yield bus
+
+    bus.fbusClose()
+    bus.fbusDeInitialize()
+
+
+@pytest.fixture()
+def writer():
+    layout = [NodeLayout(net_id, 0x80, net_id * 36, 36, 0, 0) for net_id in range(16)]
+    writer = SharedImageWriter(ProcessImage(None, layout))
+    yield writer
+
+    writer.close()
+
+
+def test_round_trip(bus, simulator):
+    nodes = simulator.networks[1].nodes
+    for net_id, node in enumerate(nodes):
+        node.inputs[:] = bytes((net_id + index) & 0xFF for index in range(len(node.inputs)))
+    image = ProcessImage.from_rescan(bus)
+    image.outputs[:] = bytes(index & 0xFF for index in range(len(image.outputs)))
+    image.exchange()
+
+    writer = SharedImageWriter(image, types={net_id: node.type for net_id, node in enumerate(nodes)})
+    reader = SharedImageReader(writer.name)
+    try:
+        assert writer.publish() == 1
+        cycle, _, data = reader.read()
+        assert (cycle, data) == (1, bytes(image.inputs))
+
+        for node in image.layout:
+            entry = reader.nodes[node.net_id]
+            assert entry.type == nodes[node.net_id].type
+            assert (entry.input_offset, entry.input_length) == (node.input_offset, node.input_length)
+
+        inputs = reader.input_structure(1, DIM718_INPUTS)
+        assert bytes(inputs) == nodes[1].inputs[:len(bytes(inputs))]
+        outputs = reader.output_structure(1, DIM718_OUTPUTS)
+        assert bytes(outputs) == nodes[1].outputs[:len(bytes(outputs))]
+
+        inputs.diagnostics ^= 0xFF          # Копия: сегмент не изменяется
+        assert reader.read()[2] == bytes(image.inputs)
+
+        pytest.importorskip("numpy")
+        array = reader.input_array(1, DIM718_INPUTS)
+        assert not array.flags.writeable
+        assert array["diagnostics"][0] == nodes[1].inputs[0]
+        del array
+    finally:
+        reader.close()
+        writer.close()
+
+
+def test_write_in_progress(writer):
+    reader = SharedImageReader(writer.name)
+    try:
+        sequence = reader.begin()
+        writer.publish()
+        assert not reader.valid(sequence)
+        assert reader.valid(reader.begin())
+
+        writer.header.sequence += 1         # Писатель "завис" внутри publish()
+        with pytest.raises(FBusError):
+            reader.begin(timeout=0.01)
+        writer.header.sequence += 1
+        assert reader.begin() == writer.header.sequence
+    finally:
+        reader.close()
+
+
+def publish(writer: SharedImageWriter, stop) -> None:
+    """Процесс записи образа, заполненного одинаковыми байтами."""
+
+    image = writer.image
+    cycle = 0
+    while not stop.is_set():
+        cycle += 1
+        image.inputs[:] = bytes([cycle & 0xFF]) * len(image.inputs)
+        writer.publish()
+
+
+def test_no_torn_reads(writer):
+    if "fork" not in multiprocessing.get_all_start_methods():
+        pytest.skip("writer process requires fork")
+
+    context = multiprocessing.get_context("fork")
+    stop = context.Event()
+    process = context.Process(target=publish, args=(writer, stop))
+    reader = SharedImageReader(writer.name)
+    process.start()
+    try:
+        cycles = set()
+        torn = 0
+        while len(cycles) < 200:
+            cycle, _, data = reader.read()
+            cycles.add(cycle)
+            if data.count(data[0]) != len(data):
+                torn += 1
+    finally:
+        stop.set()
+        process.join()
+        reader.close()
+
+    assert torn == 0
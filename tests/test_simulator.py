@@ -0,0 +1,55 @@
+#! /usr/bin/env python3
+
+"""Проверка бэкенда "sim" с общей для процесса виртуальной сетью."""
+
+from __future__ import annotations
+
+import pytest
+
+from fbus.client import FBUS, FBusError, get_backend
+from fbus.protocol import FBUS_ADAPTER, FIO_MODULE_TYPE
+from fbus.simulator import DEFAULT_RACK, SIM_NETWORKS_ENV, parse_networks, shared_simulator
+
+
+@pytest.fixture()
+def shared(monkeypatch):
+    def make(spec: str | None = None):
+        if spec is None:
+            monkeypatch.delenv(SIM_NETWORKS_ENV, raising=False)
+        else:
+            monkeypatch.setenv(SIM_NETWORKS_ENV, spec)
+        shared_simulator.cache_clear()
+        return get_backend("sim")
+
+    yield make
+    shared_simulator.cache_clear()
+
+
+def test_parse_networks():
+    assert parse_networks("1=DIM718, aim724*2; 3=") == {
+        1: [FIO_MODULE_TYPE.DIM718, FIO_MODULE_TYPE.AIM724, FIO_MODULE_TYPE.AIM724], 3: []}
+
+    with pytest.raises(FBusError, match="XIM1"):
+        parse_networks("1=XIM1")
+
+
+def test_default_topology_answers(shared):
+    simulator = shared()
+    assert get_backend("sim") is simulator
+
+    bus = FBUS("sim")
+    bus.fbusInitialize()
+    bus.fbusOpen(adapter=FBUS_ADAPTER.TCP, port=1)
+    bus.fbusRescan()
+
+    assert bus.fbusGetNodesCount() == len(DEFAULT_RACK)
+    assert bus.fbusGetNodeDescription(0).Type == DEFAULT_RACK[0]
+    bus.fbusClose()
+    bus.fbusDeInitialize()
+
+
+def test_topology_from_environment(shared):
+    simulator = shared("1=NIM741*2")
+
+    assert [node.type for node in simulator.networks[1].nodes] == [FIO_MODULE_TYPE.NIM741] * 2
+    assert list(simulator.networks) == [1]
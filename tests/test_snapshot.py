@@ -0,0 +1,95 @@
+#! /usr/bin/env python3
+
+"""Проверка многобуферного образа входных данных."""
+
+from __future__ import annotations
+
+from ctypes import Structure, c_uint8, c_uint32
+from threading import Event, Thread
+
+import pytest
+
+from fbus.snapshot import SnapshotBuffer
+
+SIZE = 64
+
+
+class RECORD(Structure):
+    _fields_ = [("first", c_uint8), ("value", c_uint32)]
+    _pack_ = 1
+
+
+def test_publish_and_read():
+    snapshots = SnapshotBuffer(SIZE)
+    snapshots.back[:] = b"\x01" * SIZE
+    published = snapshots.publish(timestamp=1.5)
+
+    assert snapshots.latest() is published
+    assert (published.sequence, published.timestamp) == (1, 1.5)
+    assert bytes(published.data) == b"\x01" * SIZE
+    with pytest.raises(TypeError):
+        published.data[0] = 2
+
+    copy = snapshots.read()
+    assert copy.data == b"\x01" * SIZE and copy.sequence == 1
+
+
+def test_structure_is_a_copy():
+    snapshots = SnapshotBuffer(SIZE)
+    snapshots.publish_from(bytes([7, 1, 0, 0, 0]) + bytes(SIZE - 5))
+    snapshot = snapshots.latest()
+
+    record = snapshot.structure(RECORD)
+    assert (record.first, record.value) == (7, 1)
+    record.first = 0
+
+    assert snapshot.data[0] == 7
+    assert snapshots.read().structure(RECORD).first == 7
+
+
+def test_size_mismatch_raises():
+    snapshots = SnapshotBuffer(SIZE)
+
+    with pytest.raises(ValueError):
+        snapshots.publish_from(bytes(SIZE + 1))
+    with pytest.raises(ValueError):
+        snapshots.publish_from(bytes(SIZE - 1))
+
+    assert snapshots.sequence == 0
+    assert len(snapshots.back) == SIZE
+
+
+def test_slot_reuse_invalidates_snapshot():
+    snapshots = SnapshotBuffer(SIZE, count=3)
+    first = snapshots.publish_from(bytes(SIZE))
+
+    snapshots.publish_from(bytes(SIZE))
+    assert first.valid()
+    snapshots.publish_from(bytes(SIZE))     # Буфер первой версии снова задний
+    assert not first.valid()
+
+
+def test_concurrent_reads_are_consistent():
+    snapshots = SnapshotBuffer(SIZE)
+    stop = Event()
+    torn: list[int] = []
+
+    def reader() -> None:
+        while not stop.is_set():
+            data = snapshots.read().data
+            if data.count(data[0]) != SIZE:
+                torn.append(snapshots.sequence)
+
+    readers = [Thread(target=reader) for _ in range(4)]
+    for thread in readers:
+        thread.start()
+    for number in range(20000):
+        back = snapshots.back
+        for index in range(0, SIZE, 16):
+            back[index:index + 16] = bytes([number & 0xFF]) * 16
+        snapshots.publish()
+    stop.set()
+    for thread in readers:
+        thread.join()
+
+    assert torn == []
@@ -0,0 +1,95 @@
+#! /usr/bin/env python3
+
+"""Проверка синхронизированного сбора данных на виртуальной сети."""
+
+from __future__ import annotations
+
+from typing import Callable
+
+import pytest
+
+from fbus.client import FBUS, _value
+from fbus.image import ProcessImage
+from fbus.protocol import FBUS_ADAPTER, FBUS_MULTICAST_ID, FBUS_UNDEFINED_SYNC_ID, FIO_MODULE_TYPE
+from fbus.simulator import Simulator
+from fbus.sync import SyncAcquisition
+
+RACK = [FIO_MODULE_TYPE.AIM724, FIO_MODULE_TYPE.DIM718, FIO_MODULE_TYPE.DIM764] * 3
+SYNC_ID = 5
+
+
+class LoggingSimulator(Simulator):
+    """Виртуальная сеть, запоминающая вызовы fbusWriteConfig и fbusSendSync."""
+
+    def __init__(self, *args: object) -> None:
+        super().__init__(*args)
+        self.calls: list[tuple[str, int]] = []
+
+    def functions(self) -> dict[str, Callable[..., bool]]:
+        functions = super().functions()
+        for name in ("fbusWriteConfig", "fbusSendSync"):
+            functions[name] = self._logged(name, functions[name])
+        return functions
+
+    def _logged(self, name: str, func: Callable[..., bool]) -> Callable[..., bool]:
+        def call(*arguments: object) -> bool:
+            self.calls.append((name, _value(arguments[1])))
+            return func(*arguments)
+
+        return call
+
+
+@pytest.fixture()
+def simulator():
+    return LoggingSimulator({1: RACK})
+
+
+@pytest.fixture()
+def acquisition(simulator):
+    bus = FBUS(simulator)
+    bus.fbusInitialize()
+    bus.fbusOpen(adapter=FBUS_ADAPTER.TCP, port=1)
+    image = ProcessImage.from_rescan(bus)
+    simulator.calls.clear()
+    yield SyncAcquisition(bus, image, SYNC_ID)
+
+    bus.fbusClose()
+    bus.fbusDeInitialize()
+
+
+def sync_ids(simulator: Simulator, acquisition: SyncAcquisition) -> set[tuple[int, int]]:
+    nodes = simulator.networks[1].nodes
+    return {(nodes[net_id].common.InputSync, nodes[net_id].common.OutputSync)
+            for net_id in acquisition.image.nodes}
+
+
+def test_configure_writes_once_and_release_restores(simulator, acquisition):
+    acquisition.configure()
+
+    assert simulator.calls == [("fbusWriteConfig", FBUS_MULTICAST_ID)]
+    assert sync_ids(simulator, acquisition) == {(SYNC_ID, SYNC_ID)}
+
+    simulator.calls.clear()
+    acquisition.release()
+
+    assert simulator.calls == [("fbusWriteConfig", FBUS_MULTICAST_ID)]
+    assert sync_ids(simulator, acquisition) == {(FBUS_UNDEFINED_SYNC_ID, FBUS_UNDEFINED_SYNC_ID)}
+
+
+def test_configure_inputs_only(simulator, acquisition):
+    acquisition.configure(outputs=False)
+
+    assert sync_ids(simulator, acquisition) == {(SYNC_ID, FBUS_UNDEFINED_SYNC_ID)}
+
+
+def test_cycle_sends_sync_before_exchange(simulator, acquisition):
+    acquisition.configure()
+    simulator.calls.clear()
+
+    first = acquisition.cycle()
+    second = acquisition.cycle()
+
+    assert simulator.calls == [("fbusSendSync", SYNC_ID)] * 2
+    assert (first.sequence, second.sequence) == (1, 2)
+    assert acquisition.last is second
+    assert list(acquisition.latencies) == [first.latency, second.latency]
@@ -0,0 +1,200 @@
+#! /usr/bin/env python3
+
+"""Проверка многопоточного доступа к общему клиенту FBUS (бэкенд sim)."""
+
+from __future__ import annotations
+
+import sys
+from threading import Barrier, Thread
+from time import sleep
+from typing import Callable
+
+import pytest
+
+from fbus.client import FBUS, FBusDevice, FBusError, _value
+from fbus.protocol import FBUS_ADAPTER, FIO_MODULE_TYPE
+from fbus.simulator import Simulator
+
+THREADS = 8
+CALLS = 300
+
+RACK = [FIO_MODULE_TYPE.DIM718, FIO_MODULE_TYPE.AIM724] * (THREADS // 2)
+
+# Сети с различающимися составами для проверки нескольких дескрипторов
+RACKS = {1: [FIO_MODULE_TYPE.DIM718] * 3,
+         2: [FIO_MODULE_TYPE.AIM724] * 5,
+         3: [FIO_MODULE_TYPE.NIM741] * 2,
+         4: [FIO_MODULE_TYPE.DIM764] * 7}
+
+# Функции, первый аргумент которых - дескриптор сети
+_HANDLE_FUNCTIONS = frozenset(name for name, prototype in FBusDevice._functions_.items()
+                              if prototype._argtypes_ and name != "fbusOpen")
+
+
+class CheckedSimulator(Simulator):
+    """Виртуальная сеть, считающая одновременные вызовы функций FBUS API
+    с одним сетевым идентификатором, которые libfbus не допускает.
+    """
+
+    def __init__(self, *args: object) -> None:
+        super().__init__(*args)
+        self.active: dict[int, int] = {}
+        self.overlaps = 0
+
+    def functions(self) -> dict[str, Callable[..., bool]]:
+        return {name: self._exclusive(func) if name in _HANDLE_FUNCTIONS else func
+                for name, func in super().functions().items()}
+
+    def _exclusive(self, func: Callable[..., bool]) -> Callable[..., bool]:
+        def call(*arguments: object) -> bool:
+            hnet = _value(arguments[0])
+            self.active[hnet] = self.active.get(hnet, 0) + 1
+            if self.active[hnet] > 1:
+                self.overlaps += 1
+            try:
+                sleep(0)
+                return func(*arguments)
+            finally:
+                self.active[hnet] -= 1
+
+        return call
+
+
+@pytest.fixture()
+def simulator():
+    interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)     # Частое переключение потоков
+
+    simulator = CheckedSimulator({1: RACK})
+    yield simulator
+
+    sys.setswitchinterval(interval)
+
+
+@pytest.fixture()
+def bus(simulator):
+    bus = FBUS(simulator)
+    bus.fbusInitialize()
+    bus.fbusOpen(adapter=FBUS_ADAPTER.TCP, port=1)
+    bus.fbusRescan()
+    yield bus
+
+    bus.fbusClose()
+    bus.fbusDeInitialize()
+
+
+def hammer(worker: Callable[[int], None]) -> list[str]:
+    """Выполнить worker(номер потока) одновременно в THREADS потоках.
+    Возвращает сообщения об ошибках.
+    """
+
+    failures: list[str] = []
+    barrier = Barrier(THREADS)
+
+    def run(number: int) -> None:
+        barrier.wait()
+        try:
+            for _ in range(CALLS):
+                worker(number)
+        except (AssertionError, FBusError) as err:
+            failures.append(f"thread {number}: {err!r}")
+
+    threads = [Thread(target=run, args=(number,)) for number in range(THREADS)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    return failures
+
+
+def test_descriptions_are_not_mixed(bus, simulator):
+    nodes = simulator.networks[1].nodes
+
+    def worker(number: int) -> None:
+        descr = bus.fbusGetNodeDescription(number)
+        assert descr.SerialNumber == nodes[number].serial
+        assert descr.Type == nodes[number].type
+
+    assert hammer(worker) == []
+    assert simulator.overlaps == 0
+
+
+def test_errors_name_the_called_function(bus, simulator):
+    requests = [("fbusReadConfig", lambda: bus.fbusReadConfig(100)),
+                ("fbusReset", lambda: bus.fbusReset(100)),
+                ("fbusGetNodeDescription", lambda: bus.fbusGetNodeDescription(100))]
+
+    def worker(number: int) -> None:
+        name, request = requests[number % len(requests)]
+        with pytest.raises(FBusError) as info:
+            request()
+        assert str(info.value).startswith(name)
+
+    assert hammer(worker) == []
+    assert simulator.overlaps == 0
+
+
+def test_locked_sequence_is_not_interleaved(bus, simulator):
+    node = simulator.networks[1].nodes[0]
+    length = len(node.outputs)
+
+    def worker(number: int) -> None:
+        pattern = bytearray([number + 1]) * length
+        if number % 2:
+            bus.fbusWriteOutputsFrom(0, pattern)
+            return
+
+        with bus.lock:
+            bus.fbusWriteOutputsFrom(0, pattern)
+            sleep(0)
+            assert node.outputs == pattern
+
+    assert hammer(worker) == []
+    assert simulator.overlaps == 0
+
+
+def test_handles_are_not_mixed():
+    interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)
+    simulator = CheckedSimulator(RACKS)
+    simulator.fbusInitialize()
+
+    buses: dict[int, FBUS] = {}
+    ports = list(RACKS)
+
+    def worker(number: int) -> None:
+        port = ports[number % len(ports)]
+        if port not in buses and number < len(ports):
+            bus = FBUS(simulator)
+            bus.fbusOpen(adapter=FBUS_ADAPTER.TCP, port=port)
+            bus.fbusRescan()
+            buses[port] = bus
+        while port not in buses:
+            sleep(0)
+
+        bus = buses[port]
+        nodes = simulator.networks[port].nodes
+        net_id = number % len(nodes)
+        assert bus.fbusGetNodesCount() == len(nodes)
+        descr = bus.fbusGetNodeDescription(net_id)
+        assert descr.SerialNumber == nodes[net_id].serial
+        assert descr.Type == nodes[net_id].type
+
+        with pytest.raises(FBusError) as info:
+            bus.fbusReadConfig(len(nodes))      # Первый отсутствующий в этой сети модуль
+        assert str(info.value).startswith("fbusReadConfig")
+
+    try:
+        assert hammer(worker) == []
+    finally:
+        sys.setswitchinterval(interval)
+
+    handles = [bus._hnet.value for bus in buses.values()]
+    assert sorted(buses) == ports
+    assert len(set(handles)) == len(ports)
+    assert simulator.overlaps == 0
+
+    for bus in buses.values():
+        bus.fbusClose()
+    assert not simulator._handles